@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
 from datetime import datetime, date, timedelta
 import bcrypt
@@ -7,18 +8,32 @@ import plotly.express as px
 import plotly.graph_objects as go
 import warnings
 import time
+import heapq
 import json
+import math
+import re
+import secrets
+import shutil
 import streamlit.components.v1 as components
 import psycopg2
-from psycopg2.extras import RealDictCursor
+import psycopg2.pool
+from psycopg2.extras import Json, execute_values
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import defaultdict, deque
+import threading
 import plotly.io as pio
 import sqlalchemy
 from sqlalchemy import create_engine
 from sqlalchemy.engine import URL
 from supabase import create_client, Client
 import requests
-from PIL import Image
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from PIL import Image, ImageOps
 import io
+import tempfile
+import zipfile
 
 # Suppress warnings
 warnings.filterwarnings("ignore", message="The behavior of DatetimeProperties.to_pydatetime is deprecated")
@@ -40,44 +55,33 @@ st.set_page_config(
 # -----------------------------------------------------------------------------
 SESSION_TIMEOUT = 3600  # 1 hour
 
+ROLE_NAMES = {
+    "admin": "Administrator",
+    "pho_supervisor": "PHO Supervisor",
+    "pho": "PHO"
+}
+
+SESSION_DEFAULTS = {
+    "authentication_status": None,
+    "username": None,
+    "name": None,
+    "role": None,
+    "login_time": None,
+    "last_activity": None,
+    "session_token": None,
+    "edit_record": None,
+    "edit_key": None,
+    "verify_record": None,
+    "verify_key": None,
+    "show_waste_details": None,
+    "waste_details_key": None,
+}
+
 def init_session_state():
-    defaults = {
-        "authentication_status": None,
-        "username": None,
-        "name": None,
-        "role": None,
-        "login_time": None,
-        "last_activity": None,
-        "mess_form_data": {},
-        "waste_form_data": {},
-        "session_token": None,
-        "persistent_auth": None,
-        "persistent_username": None,
-        "persistent_name": None,
-        "persistent_role": None,
-        "edit_record": None,
-        "edit_key": None,
-        "verify_record": None,
-        "verify_key": None,
-        "show_waste_details": None,
-        "waste_details_key": None,
-    }
-    for k, v in defaults.items():
-        if k not in st.session_state:
-            st.session_state[k] = v
-
-def preserve_session_state():
-    if "persistent_auth" in st.session_state and st.session_state.persistent_auth:
-        st.session_state.authentication_status = st.session_state.persistent_auth
-    if "persistent_username" in st.session_state and st.session_state.persistent_username:
-        st.session_state.username = st.session_state.persistent_username
-    if "persistent_name" in st.session_state and st.session_state.persistent_name:
-        st.session_state.name = st.session_state.persistent_name
-    if "persistent_role" in st.session_state and st.session_state.persistent_role:
-        st.session_state.role = st.session_state.persistent_role
+    for k, v in SESSION_DEFAULTS.items():
+        st.session_state.setdefault(k, v)
 
 def generate_session_token():
-    import secrets
     return secrets.token_urlsafe(32)
 
 def is_session_active():
@@ -89,7 +93,6 @@ def update_activity_time():
     st.session_state['last_activity'] = time.time()
 
 def check_session_validity():
-    preserve_session_state()
     if st.session_state.get('authentication_status'):
         if st.session_state.get('last_activity') is None:
             update_activity_time()
@@ -103,100 +106,168 @@ def check_session_validity():
 def clear_session_state():
     keys_to_clear = [
         "authentication_status", "username", "name", "role", "login_time",
-        "last_activity", "session_token", "persistent_auth", "persistent_username",
-        "persistent_name", "persistent_role"
+        "last_activity", "session_token"
     ]
     for key in keys_to_clear:
         if key in st.session_state:
             del st.session_state[key]
 
-def save_form_data(form_key, data):
-    st.session_state[form_key] = data
-
-def load_form_data(form_key, default=None):
-    if form_key in st.session_state:
-        return st.session_state[form_key]
-    return default if default is not None else {}
-
-def clear_form_data(form_key):
-    if form_key in st.session_state:
-        del st.session_state[form_key]
+def clear_form_data(widget_keys):
+    """Reset form widgets to their defaults on the next run by dropping their keyed state"""
+    for key in widget_keys:
+        st.session_state.pop(key, None)
 
 
 # -----------------------------------------------------------------------------
 # 🏨 DYNAMIC HOSTEL LIST (NEW)
 # -----------------------------------------------------------------------------
+DEFAULT_HOSTELS = ["2", "10", "12-13-14", "11", "18"]
+
+# Hostels only change when supervisor accounts are added or removed, and both
+# paths clear this cache, so it can live for an hour between widget reruns
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_supervisor_hostels():
+    """Fetch all unique hostels from pho_supervisor users; raises so failures are not cached"""
+    with db_cursor() as cursor:
+        cursor.execute("SELECT DISTINCT username FROM users WHERE role = %s", ('pho_supervisor',))
+        rows = cursor.fetchall()
+    hostels = {get_hostel_from_username(row[0]) for row in rows} - {""}
+    return sorted(hostels) if hostels else DEFAULT_HOSTELS
+
 def get_dynamic_hostels():
-    """Fetch all unique hostels from PHO and pho_supervisor users."""
-    users = get_all_users()
-    hostels = set()
-    for u in users:
-        if u['role'] in ['pho_supervisor']:
-            hostel = get_hostel_from_username(u['username'])
-            if hostel:
-                hostels.add(hostel)
-    return sorted(list(hostels)) if hostels else ["2", "10", "12-13-14", "11", "18"]
+    """Fetch all unique hostels from pho_supervisor users."""
+    try:
+        return fetch_supervisor_hostels()
+    except Exception as e:
+        st.error(f"Error getting hostels: {e}")
+        return DEFAULT_HOSTELS
 
 # -----------------------------------------------------------------------------
 # 🗄️ DATABASE CONNECTION AND SETUP
 # -----------------------------------------------------------------------------
+class PreparingConnection(psycopg2.extensions.connection):
+    """Connection that remembers which server-side prepared statements it already holds"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+@st.cache_resource(show_spinner=False)
+def get_db_pool():
+    """Create one thread-safe connection pool per server process"""
+    db = st.secrets["connections"]["postgresql"]
+    return psycopg2.pool.ThreadedConnectionPool(
+        minconn=1,
+        maxconn=10,
+        host=db["host"],
+        database=db["database"],
+        user=db["username"],
+        password=db["password"],
+        port=db["port"],
+        sslmode='require',
+        connection_factory=PreparingConnection
+    )
+
 def get_db_connection():
-    """Get database connection using environment variables"""
+    """Borrow a connection from the pool; hand it back with release_db_connection()"""
     try:
         # Fallback to Streamlit secrets (Streamlit Cloud)
         if hasattr(st, 'secrets') and 'connections' in st.secrets:
-            conn = psycopg2.connect(
-                host=st.secrets["connections"]["postgresql"]["host"],
-                database=st.secrets["connections"]["postgresql"]["database"],
-                user=st.secrets["connections"]["postgresql"]["username"],
-                password=st.secrets["connections"]["postgresql"]["password"],
-                port=st.secrets["connections"]["postgresql"]["port"],
-                sslmode='require'
-            )
-        else:
-            st.error("No database configuration found!")
-            return None
-        return conn
+            return get_db_pool().getconn()
+        st.error("No database configuration found!")
+        return None
     except Exception as e:
         st.error(f"Database connection failed: {e}")
         return None
 
+def release_db_connection(conn):
+    """Return a borrowed connection to the pool (rolls back any open transaction)"""
+    try:
+        get_db_pool().putconn(conn)
+    except Exception:
+        conn.close()
+
+def execute_prepared(cursor, name, sql, params):
+    """Run a hot query through PREPARE/EXECUTE so the server parses and plans it once per connection
+
+    ``sql`` uses the usual %s placeholders; they become $1..$n in the prepared statement.
+    """
+    conn = cursor.connection
+    if name not in conn.prepared_statements:
+        counter = iter(range(1, len(params) + 1))
+        cursor.execute(f"PREPARE {name} AS " + re.sub(r"%s", lambda _: f"${next(counter)}", sql))
+        conn.prepared_statements.add(name)
+    cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+
+@contextmanager
+def db_cursor(cursor_factory=None):
+    """Yield a cursor on a pooled connection, committing on success and rolling back on error"""
+    conn = get_db_connection()
+    if not conn:
+        raise psycopg2.OperationalError("No database connection available")
+    try:
+        with conn.cursor(cursor_factory=cursor_factory) as cursor:
+            yield cursor
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        release_db_connection(conn)
+
+@st.cache_resource(show_spinner=False)
+def create_sqlalchemy_engine():
+    """Build the shared SQLAlchemy engine once per server process"""
+    db = st.secrets.connections.postgresql
+    url = URL.create(
+        drivername="postgresql",
+        username=db.username,
+        password=db.password,
+        host=db.host,
+        port=int(db.port),
+        database=db.database
+    )
+    return create_engine(
+        url,
+        pool_size=5,
+        max_overflow=10,
+        pool_pre_ping=True,
+        pool_recycle=1800
+    )
+
 def get_sqlalchemy_engine():
-    """Get SQLAlchemy engine for pandas operations using URL.create()"""
+    """Get SQLAlchemy engine for pandas operations"""
     try:
-        from sqlalchemy.engine import URL
-        
         if hasattr(st, 'secrets') and 'connections' in st.secrets:
-            url = URL.create(
-                drivername="postgresql",
-                username=st.secrets.connections.postgresql.username,
-                password=st.secrets.connections.postgresql.password,
-                host=st.secrets.connections.postgresql.host,
-                port=int(st.secrets.connections.postgresql.port),
-                database=st.secrets.connections.postgresql.database
-            )
-        else:
-            return None
-        
-        engine = create_engine(url)
-        return engine
+            return create_sqlalchemy_engine()
+        return None
     except Exception as e:
         st.error(f"SQLAlchemy engine creation failed: {e}")
         return None
 
-    
+
+SUPABASE_SECRET_KEYS = ("SUPABASE_URL", "SUPABASE_ANON_KEY")
+
+def has_supabase_config():
+    """Check once at startup that the storage credentials are configured"""
+    try:
+        return all(st.secrets.get(key) for key in SUPABASE_SECRET_KEYS)
+    except Exception:
+        return False
+
+@st.cache_resource(show_spinner=False)
+def create_supabase_client():
+    """Build the Supabase client once per server process"""
+    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_ANON_KEY"])
+
+@st.cache_resource(show_spinner=False)
+def supabase_project_ref():
+    """Project ref (the subdomain of SUPABASE_URL), parsed once per server process"""
+    return st.secrets.get("SUPABASE_URL", "").removeprefix("https://").split(".")[0]
 
 def get_supabase_client():
     """Get Supabase client for storage operations"""
     try:
-        url = st.secrets["SUPABASE_URL"]
-        key = st.secrets["SUPABASE_ANON_KEY"]
-        
-        if not url or not key:
-            st.error("Supabase credentials not found!")
-            return None
-            
-        return create_client(url, key)
+        return create_supabase_client()
     except Exception as e:
         st.error(f"Supabase client creation failed: {e}")
         return None
@@ -209,218 +280,483 @@ def get_hostel_from_username(username: str) -> str:
         return hostel_part.replace("_", "-")
     return ""
 
+# All schema DDL, sent to the server as a single statement batch
+SCHEMA_DDL = """
+    -- Users table
+    CREATE TABLE IF NOT EXISTS users (
+        id SERIAL PRIMARY KEY,
+        username VARCHAR(50) UNIQUE NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        password_hash VARCHAR(255) NOT NULL,
+        role VARCHAR(20) NOT NULL CHECK (role IN ('admin', 'pho_supervisor', 'pho')),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS ix_users_role ON users (role);
+
+    -- Mess waste submissions
+    CREATE TABLE IF NOT EXISTS mess_waste_submissions (
+        submission_id SERIAL PRIMARY KEY,
+        submission_date DATE NOT NULL DEFAULT CURRENT_DATE,
+        collection_time TIME,
+        hostel VARCHAR(20) NOT NULL,
+        breakfast_students INTEGER DEFAULT 0,
+        breakfast_student_waste DECIMAL(10,2) DEFAULT 0,
+        breakfast_counter_waste DECIMAL(10,2) DEFAULT 0,
+        breakfast_vegetable_peels DECIMAL(10,2) DEFAULT 0,
+        lunch_students INTEGER DEFAULT 0,
+        lunch_student_waste DECIMAL(10,2) DEFAULT 0,
+        lunch_counter_waste DECIMAL(10,2) DEFAULT 0,
+        lunch_vegetable_peels DECIMAL(10,2) DEFAULT 0,
+        snacks_students INTEGER DEFAULT 0,
+        snacks_student_waste DECIMAL(10,2) DEFAULT 0,
+        snacks_counter_waste DECIMAL(10,2) DEFAULT 0,
+        snacks_vegetable_peels DECIMAL(10,2) DEFAULT 0,
+        dinner_students INTEGER DEFAULT 0,
+        dinner_student_waste DECIMAL(10,2) DEFAULT 0,
+        dinner_counter_waste DECIMAL(10,2) DEFAULT 0,
+        dinner_vegetable_peels DECIMAL(10,2) DEFAULT 0,
+        mess_dry_waste DECIMAL(10,2) DEFAULT 0,
+        total_students INTEGER GENERATED ALWAYS AS (
+            breakfast_students + lunch_students + snacks_students + dinner_students
+        ) STORED,
+        total_mess_waste DECIMAL(10,2) GENERATED ALWAYS AS (
+            breakfast_student_waste + breakfast_counter_waste + breakfast_vegetable_peels +
+            lunch_student_waste + lunch_counter_waste + lunch_vegetable_peels +
+            snacks_student_waste + snacks_counter_waste + snacks_vegetable_peels +
+            dinner_student_waste + dinner_counter_waste + dinner_vegetable_peels +
+            mess_dry_waste
+        ) STORED,
+        remarks TEXT,
+        image_paths TEXT,
+        submitted_by VARCHAR(50) NOT NULL,
+        submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'verified', 'rejected')),
+        verified_by VARCHAR(50),
+        verified_at TIMESTAMP
+    );
+
+    -- Convert totals on older tables into generated columns (values are recomputed from the same fields)
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'mess_waste_submissions' AND column_name = 'total_students' AND is_generated = 'NEVER'
+        ) THEN
+            ALTER TABLE mess_waste_submissions
+                DROP COLUMN total_students,
+                ADD COLUMN total_students INTEGER GENERATED ALWAYS AS (
+                    breakfast_students + lunch_students + snacks_students + dinner_students
+                ) STORED;
+        END IF;
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'mess_waste_submissions' AND column_name = 'total_mess_waste' AND is_generated = 'NEVER'
+        ) THEN
+            ALTER TABLE mess_waste_submissions
+                DROP COLUMN total_mess_waste,
+                ADD COLUMN total_mess_waste DECIMAL(10,2) GENERATED ALWAYS AS (
+                    breakfast_student_waste + breakfast_counter_waste + breakfast_vegetable_peels +
+                    lunch_student_waste + lunch_counter_waste + lunch_vegetable_peels +
+                    snacks_student_waste + snacks_counter_waste + snacks_vegetable_peels +
+                    dinner_student_waste + dinner_counter_waste + dinner_vegetable_peels +
+                    mess_dry_waste
+                ) STORED;
+        END IF;
+    END $$;
+
+    -- The PHO queue lists pending rows newest first; verified history stays out of the index
+    CREATE INDEX IF NOT EXISTS ix_mess_waste_pending
+    ON mess_waste_submissions (submission_date DESC, hostel) WHERE status = 'pending';
+
+    -- A supervisor's own history (My Submissions), served from the index alone
+    CREATE INDEX IF NOT EXISTS ix_mess_waste_submitter
+    ON mess_waste_submissions (submitted_by, status, submission_date DESC)
+    INCLUDE (hostel, total_mess_waste, submitted_at, verified_at);
+
+    -- Hostel waste submissions
+    CREATE TABLE IF NOT EXISTS hostel_waste_submissions (
+        submission_id SERIAL PRIMARY KEY,
+        submission_date DATE NOT NULL DEFAULT CURRENT_DATE,
+        collection_time TIME,
+        hostel VARCHAR(20) NOT NULL,
+        dry_waste DECIMAL(10,2) DEFAULT 0,
+        wet_waste DECIMAL(10,2) DEFAULT 0,
+        e_waste DECIMAL(10,2) DEFAULT 0,
+        biomedical_waste DECIMAL(10,2) DEFAULT 0,
+        hazardous_waste DECIMAL(10,2) DEFAULT 0,
+        total_waste DECIMAL(10,2) GENERATED ALWAYS AS (
+            dry_waste + wet_waste + e_waste + biomedical_waste + hazardous_waste
+        ) STORED,
+        remarks TEXT,
+        image_paths TEXT,
+        submitted_by VARCHAR(50) NOT NULL,
+        submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'verified', 'rejected')),
+        verified_by VARCHAR(50),
+        verified_at TIMESTAMP
+    );
+
+    -- Inserts that do not pick a date are stamped with today's (also set on older tables)
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name IN ('mess_waste_submissions', 'hostel_waste_submissions')
+            AND column_name = 'submission_date' AND column_default IS NULL
+        ) THEN
+            ALTER TABLE mess_waste_submissions ALTER COLUMN submission_date SET DEFAULT CURRENT_DATE;
+            ALTER TABLE hostel_waste_submissions ALTER COLUMN submission_date SET DEFAULT CURRENT_DATE;
+        END IF;
+    END $$;
+
+    -- Convert the hostel total on older tables into a generated column as well
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'hostel_waste_submissions' AND column_name = 'total_waste' AND is_generated = 'NEVER'
+        ) THEN
+            ALTER TABLE hostel_waste_submissions
+                DROP COLUMN total_waste,
+                ADD COLUMN total_waste DECIMAL(10,2) GENERATED ALWAYS AS (
+                    dry_waste + wet_waste + e_waste + biomedical_waste + hazardous_waste
+                ) STORED;
+        END IF;
+    END $$;
+    CREATE INDEX IF NOT EXISTS ix_hostel_waste_pending
+    ON hostel_waste_submissions (submission_date DESC, hostel) WHERE status = 'pending';
+    CREATE INDEX IF NOT EXISTS ix_hostel_waste_submitter
+    ON hostel_waste_submissions (submitted_by, status, submission_date DESC)
+    INCLUDE (hostel, total_waste, submitted_at, verified_at);
+
+    -- Master aggregated data with detailed mess waste categories
+    CREATE TABLE IF NOT EXISTS master_waste_data (
+        id SERIAL PRIMARY KEY,
+        date DATE NOT NULL,
+        hostel VARCHAR(20) NOT NULL,
+        total_students INTEGER DEFAULT 0,
+        breakfast_student_waste DECIMAL(10,2) DEFAULT 0,
+        breakfast_counter_waste DECIMAL(10,2) DEFAULT 0,
+        breakfast_vegetable_peels DECIMAL(10,2) DEFAULT 0,
+        lunch_student_waste DECIMAL(10,2) DEFAULT 0,
+        lunch_counter_waste DECIMAL(10,2) DEFAULT 0,
+        lunch_vegetable_peels DECIMAL(10,2) DEFAULT 0,
+        snacks_student_waste DECIMAL(10,2) DEFAULT 0,
+        snacks_counter_waste DECIMAL(10,2) DEFAULT 0,
+        snacks_vegetable_peels DECIMAL(10,2) DEFAULT 0,
+        dinner_student_waste DECIMAL(10,2) DEFAULT 0,
+        dinner_counter_waste DECIMAL(10,2) DEFAULT 0,
+        dinner_vegetable_peels DECIMAL(10,2) DEFAULT 0,
+        mess_dry_waste DECIMAL(10,2) DEFAULT 0,
+        total_mess_waste DECIMAL(10,2) GENERATED ALWAYS AS (
+            breakfast_student_waste + breakfast_counter_waste + breakfast_vegetable_peels +
+            lunch_student_waste + lunch_counter_waste + lunch_vegetable_peels +
+            snacks_student_waste + snacks_counter_waste + snacks_vegetable_peels +
+            dinner_student_waste + dinner_counter_waste + dinner_vegetable_peels +
+            mess_dry_waste
+        ) STORED,
+        total_mess_waste_no_peels DECIMAL(10,2) GENERATED ALWAYS AS (
+            breakfast_student_waste + breakfast_counter_waste +
+            lunch_student_waste + lunch_counter_waste +
+            snacks_student_waste + snacks_counter_waste +
+            dinner_student_waste + dinner_counter_waste +
+            mess_dry_waste
+        ) STORED,
+        per_capita_mess_waste DECIMAL(10,4) GENERATED ALWAYS AS (
+            COALESCE((
+                breakfast_student_waste + breakfast_counter_waste + breakfast_vegetable_peels +
+                lunch_student_waste + lunch_counter_waste + lunch_vegetable_peels +
+                snacks_student_waste + snacks_counter_waste + snacks_vegetable_peels +
+                dinner_student_waste + dinner_counter_waste + dinner_vegetable_peels +
+                mess_dry_waste
+            ) / NULLIF(total_students, 0), 0)
+        ) STORED,
+        per_capita_mess_waste_no_peels DECIMAL(10,4) GENERATED ALWAYS AS (
+            COALESCE((
+                breakfast_student_waste + breakfast_counter_waste +
+                lunch_student_waste + lunch_counter_waste +
+                snacks_student_waste + snacks_counter_waste +
+                dinner_student_waste + dinner_counter_waste +
+                mess_dry_waste
+            ) / NULLIF(total_students, 0), 0)
+        ) STORED,
+        dry_waste DECIMAL(10,2) DEFAULT 0,
+        wet_waste DECIMAL(10,2) DEFAULT 0,
+        e_waste DECIMAL(10,2) DEFAULT 0,
+        biomedical_waste DECIMAL(10,2) DEFAULT 0,
+        hazardous_waste DECIMAL(10,2) DEFAULT 0,
+        total_hostel_waste DECIMAL(10,2) GENERATED ALWAYS AS (
+            dry_waste + wet_waste + e_waste + biomedical_waste + hazardous_waste
+        ) STORED,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Upsert target for the incremental roll-up (also added to tables created without it)
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_master_waste_date_hostel
+    ON master_waste_data (date, hostel);
+    -- Matches the dashboard's ORDER BY date DESC, hostel
+    CREATE INDEX IF NOT EXISTS ix_master_waste_date_desc
+    ON master_waste_data (date DESC, hostel);
+    -- Serves the admin waste tab's hostel + date range filter
+    CREATE INDEX IF NOT EXISTS ix_master_waste_hostel_date
+    ON master_waste_data (hostel, date DESC);
+
+    -- Derive master totals and per-capita figures from the stored components
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'master_waste_data' AND column_name = 'total_mess_waste' AND is_generated = 'NEVER'
+        ) THEN
+            ALTER TABLE master_waste_data
+                DROP COLUMN total_mess_waste,
+                ADD COLUMN total_mess_waste DECIMAL(10,2) GENERATED ALWAYS AS (
+                    breakfast_student_waste + breakfast_counter_waste + breakfast_vegetable_peels +
+                    lunch_student_waste + lunch_counter_waste + lunch_vegetable_peels +
+                    snacks_student_waste + snacks_counter_waste + snacks_vegetable_peels +
+                    dinner_student_waste + dinner_counter_waste + dinner_vegetable_peels +
+                    mess_dry_waste
+                ) STORED;
+        END IF;
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'master_waste_data' AND column_name = 'total_mess_waste_no_peels' AND is_generated = 'NEVER'
+        ) THEN
+            ALTER TABLE master_waste_data
+                DROP COLUMN total_mess_waste_no_peels,
+                ADD COLUMN total_mess_waste_no_peels DECIMAL(10,2) GENERATED ALWAYS AS (
+                    breakfast_student_waste + breakfast_counter_waste +
+                    lunch_student_waste + lunch_counter_waste +
+                    snacks_student_waste + snacks_counter_waste +
+                    dinner_student_waste + dinner_counter_waste +
+                    mess_dry_waste
+                ) STORED;
+        END IF;
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'master_waste_data' AND column_name = 'per_capita_mess_waste' AND is_generated = 'NEVER'
+        ) THEN
+            ALTER TABLE master_waste_data
+                DROP COLUMN per_capita_mess_waste,
+                ADD COLUMN per_capita_mess_waste DECIMAL(10,4) GENERATED ALWAYS AS (
+                    COALESCE((
+                        breakfast_student_waste + breakfast_counter_waste + breakfast_vegetable_peels +
+                        lunch_student_waste + lunch_counter_waste + lunch_vegetable_peels +
+                        snacks_student_waste + snacks_counter_waste + snacks_vegetable_peels +
+                        dinner_student_waste + dinner_counter_waste + dinner_vegetable_peels +
+                        mess_dry_waste
+                    ) / NULLIF(total_students, 0), 0)
+                ) STORED;
+        END IF;
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'master_waste_data' AND column_name = 'per_capita_mess_waste_no_peels' AND is_generated = 'NEVER'
+        ) THEN
+            ALTER TABLE master_waste_data
+                DROP COLUMN per_capita_mess_waste_no_peels,
+                ADD COLUMN per_capita_mess_waste_no_peels DECIMAL(10,4) GENERATED ALWAYS AS (
+                    COALESCE((
+                        breakfast_student_waste + breakfast_counter_waste +
+                        lunch_student_waste + lunch_counter_waste +
+                        snacks_student_waste + snacks_counter_waste +
+                        dinner_student_waste + dinner_counter_waste +
+                        mess_dry_waste
+                    ) / NULLIF(total_students, 0), 0)
+                ) STORED;
+        END IF;
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'master_waste_data' AND column_name = 'total_hostel_waste' AND is_generated = 'NEVER'
+        ) THEN
+            ALTER TABLE master_waste_data
+                DROP COLUMN total_hostel_waste,
+                ADD COLUMN total_hostel_waste DECIMAL(10,2) GENERATED ALWAYS AS (
+                    dry_waste + wet_waste + e_waste + biomedical_waste + hazardous_waste
+                ) STORED;
+        END IF;
+    END $$;
+
+    -- Images table
+    CREATE TABLE IF NOT EXISTS submission_images (
+        id SERIAL PRIMARY KEY,
+        submission_id INTEGER NOT NULL,
+        submission_type VARCHAR(20) NOT NULL CHECK (submission_type IN ('mess_waste', 'hostel_waste')),
+        image_filename VARCHAR(255) NOT NULL,
+        image_url TEXT NOT NULL,
+        file_size INTEGER,
+        uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS ix_submission_images_type_id
+    ON submission_images (submission_type, submission_id);
+
+    -- PHO edits tracking table
+    CREATE TABLE IF NOT EXISTS pho_edits (
+        edit_id SERIAL PRIMARY KEY,
+        submission_id INTEGER NOT NULL,
+        submission_type VARCHAR(20) NOT NULL CHECK (submission_type IN ('mess_waste', 'hostel_waste')),
+        original_data JSONB NOT NULL,
+        edited_data JSONB NOT NULL,
+        edited_by VARCHAR(50) NOT NULL,
+        edited_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        reason TEXT
+    );
+
+    -- Older app-created tables used id/edit_reason; the edit history reads edit_id/reason
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'pho_edits' AND column_name = 'edit_reason'
+        ) THEN
+            ALTER TABLE pho_edits RENAME COLUMN edit_reason TO reason;
+        END IF;
+        IF NOT EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'pho_edits' AND column_name = 'edit_id'
+        ) THEN
+            ALTER TABLE pho_edits RENAME COLUMN id TO edit_id;
+        END IF;
+    END $$;
+    CREATE INDEX IF NOT EXISTS ix_pho_edits_edited_at ON pho_edits (edited_at DESC);
+    CREATE INDEX IF NOT EXISTS ix_pho_edits_submission
+    ON pho_edits (submission_id, submission_type);
+"""
+
 def create_tables():
     """Create all necessary tables with proper connection handling"""
-    conn = get_db_connection()
-    if not conn:
-        return False
-    
     try:
-        cursor = conn.cursor()
-        
-        # Users table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id SERIAL PRIMARY KEY,
-                username VARCHAR(50) UNIQUE NOT NULL,
-                name VARCHAR(100) NOT NULL,
-                password_hash VARCHAR(255) NOT NULL,
-                role VARCHAR(20) NOT NULL CHECK (role IN ('admin', 'pho_supervisor', 'pho')),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Mess waste submissions
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS mess_waste_submissions (
-                id SERIAL PRIMARY KEY,
-                submission_id VARCHAR(100) UNIQUE NOT NULL,
-                submission_date DATE NOT NULL,
-                hostel VARCHAR(20) NOT NULL,
-                breakfast_students INTEGER DEFAULT 0,
-                breakfast_student_waste DECIMAL(10,2) DEFAULT 0,
-                breakfast_counter_waste DECIMAL(10,2) DEFAULT 0,
-                breakfast_vegetable_peels DECIMAL(10,2) DEFAULT 0,
-                lunch_students INTEGER DEFAULT 0,
-                lunch_student_waste DECIMAL(10,2) DEFAULT 0,
-                lunch_counter_waste DECIMAL(10,2) DEFAULT 0,
-                lunch_vegetable_peels DECIMAL(10,2) DEFAULT 0,
-                snacks_students INTEGER DEFAULT 0,
-                snacks_student_waste DECIMAL(10,2) DEFAULT 0,
-                snacks_counter_waste DECIMAL(10,2) DEFAULT 0,
-                snacks_vegetable_peels DECIMAL(10,2) DEFAULT 0,
-                dinner_students INTEGER DEFAULT 0,
-                dinner_student_waste DECIMAL(10,2) DEFAULT 0,
-                dinner_counter_waste DECIMAL(10,2) DEFAULT 0,
-                dinner_vegetable_peels DECIMAL(10,2) DEFAULT 0,
-                mess_dry_waste DECIMAL(10,2) DEFAULT 0,
-                total_students INTEGER DEFAULT 0,
-                total_mess_waste DECIMAL(10,2) DEFAULT 0,
-                remarks TEXT,
-                image_paths TEXT,
-                submitted_by VARCHAR(50) NOT NULL,
-                submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'verified', 'rejected')),
-                verified_by VARCHAR(50),
-                verified_at TIMESTAMP
-            )
-        """)
-        
-        # Hostel waste submissions
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS hostel_waste_submissions (
-                id SERIAL PRIMARY KEY,
-                submission_id VARCHAR(100) UNIQUE NOT NULL,
-                submission_date DATE NOT NULL,
-                hostel VARCHAR(20) NOT NULL,
-                dry_waste DECIMAL(10,2) DEFAULT 0,
-                wet_waste DECIMAL(10,2) DEFAULT 0,
-                e_waste DECIMAL(10,2) DEFAULT 0,
-                biomedical_waste DECIMAL(10,2) DEFAULT 0,
-                hazardous_waste DECIMAL(10,2) DEFAULT 0,
-                total_waste DECIMAL(10,2) DEFAULT 0,
-                remarks TEXT,
-                image_paths TEXT,
-                submitted_by VARCHAR(50) NOT NULL,
-                submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'verified', 'rejected')),
-                verified_by VARCHAR(50),
-                verified_at TIMESTAMP
-            )
-        """)
-        
-        # Master aggregated data with detailed mess waste categories
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS master_waste_data (
-                id SERIAL PRIMARY KEY,
-                date DATE NOT NULL,
-                hostel VARCHAR(20) NOT NULL,
-                total_students INTEGER DEFAULT 0,
-                breakfast_student_waste DECIMAL(10,2) DEFAULT 0,
-                breakfast_counter_waste DECIMAL(10,2) DEFAULT 0,
-                breakfast_vegetable_peels DECIMAL(10,2) DEFAULT 0,
-                lunch_student_waste DECIMAL(10,2) DEFAULT 0,
-                lunch_counter_waste DECIMAL(10,2) DEFAULT 0,
-                lunch_vegetable_peels DECIMAL(10,2) DEFAULT 0,
-                snacks_student_waste DECIMAL(10,2) DEFAULT 0,
-                snacks_counter_waste DECIMAL(10,2) DEFAULT 0,
-                snacks_vegetable_peels DECIMAL(10,2) DEFAULT 0,
-                dinner_student_waste DECIMAL(10,2) DEFAULT 0,
-                dinner_counter_waste DECIMAL(10,2) DEFAULT 0,
-                dinner_vegetable_peels DECIMAL(10,2) DEFAULT 0,
-                total_mess_waste DECIMAL(10,2) DEFAULT 0,
-                total_mess_waste_no_peels DECIMAL(10,2) DEFAULT 0,
-                per_capita_mess_waste DECIMAL(10,4) DEFAULT 0,
-                per_capita_mess_waste_no_peels DECIMAL(10,4) DEFAULT 0,
-                mess_dry_waste DECIMAL(10,2) DEFAULT 0,
-                total_hostel_waste DECIMAL(10,2) DEFAULT 0,
-                dry_waste DECIMAL(10,2) DEFAULT 0,
-                wet_waste DECIMAL(10,2) DEFAULT 0,
-                e_waste DECIMAL(10,2) DEFAULT 0,
-                biomedical_waste DECIMAL(10,2) DEFAULT 0,
-                hazardous_waste DECIMAL(10,2) DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(date, hostel)
-            )
-        """)
-        
-        # Images table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS submission_images (
-                id SERIAL PRIMARY KEY,
-                submission_id VARCHAR(100) NOT NULL,
-                submission_type VARCHAR(20) NOT NULL CHECK (submission_type IN ('mess_waste', 'hostel_waste')),
-                image_filename VARCHAR(255) NOT NULL,
-                image_path VARCHAR(500) NOT NULL,
-                file_size INTEGER,
-                upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # PHO edits tracking table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS pho_edits (
-                id SERIAL PRIMARY KEY,
-                submission_id VARCHAR(100) NOT NULL,
-                submission_type VARCHAR(20) NOT NULL CHECK (submission_type IN ('mess_waste', 'hostel_waste')),
-                original_data JSONB NOT NULL,
-                edited_data JSONB NOT NULL,
-                edited_by VARCHAR(50) NOT NULL,
-                edited_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                edit_reason TEXT
-            )
-        """)
-        
-        conn.commit()
+        with db_cursor() as cursor:
+            cursor.execute(SCHEMA_DDL)
         return True
         
     except Exception as e:
         st.error(f"Error creating tables: {e}")
-        if conn:
-            conn.rollback()
         return False
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 
-def upload_image_to_supabase(file, bucket_name, file_name):
-    """Upload image to Supabase storage"""
+MAX_IMAGE_DIMENSION = 1600
+IMAGE_RECOMPRESS_MIN_BYTES = 300_000
+
+def _prepare_image_payload(file):
+    """Downscale large photos and re-encode them as JPEG; small or unreadable files pass through"""
+    extension = file.name.split('.')[-1] if '.' in file.name else 'jpg'
+    if file.size < IMAGE_RECOMPRESS_MIN_BYTES:
+        return file.getvalue(), file.type, extension
+    try:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image.thumbnail((MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, format="JPEG", quality=80, optimize=True)
+        return buffer.getvalue(), "image/jpeg", "jpg"
+    except Exception:
+        return file.getvalue(), file.type, extension
+
+PREVIEW_SIZE = (200, 200)
+
+def image_preview(file):
+    """Small JPEG thumbnail for the upload preview; falls back to the original file if it cannot be decoded"""
+    try:
+        file.seek(0)
+        image = Image.open(file)
+        # JPEGs decode straight at reduced scale instead of at full resolution
+        image.draft("RGB", PREVIEW_SIZE)
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(PREVIEW_SIZE)
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, format="JPEG", quality=70)
+        return buffer.getvalue()
+    except Exception:
+        return file
+    finally:
+        file.seek(0)
+
+def _upload_to_storage(supabase, file, bucket_name, file_stem):
+    """Compress and upload one file, returning its public URL; raises on failure (safe off the main thread)"""
+    payload, content_type, extension = _prepare_image_payload(file)
+    file_name = f"{file_stem}.{extension}"
+    bucket = supabase.storage.from_(bucket_name)
+    result = bucket.upload(
+        file_name, 
+        payload,
+        file_options={"content-type": content_type}
+    )
+    
+    if hasattr(result, 'error') and result.error:
+        raise RuntimeError(f"Upload failed: {result.error}")
+    
+    # Get public URL
+    return bucket.get_public_url(file_name)
+
+def upload_image_to_supabase(file, bucket_name, file_stem):
+    """Upload image to Supabase storage (the extension is chosen from the encoded payload)"""
     try:
         supabase = get_supabase_client()
         if not supabase:
             return None
-        
-        # Upload file
-        result = supabase.storage.from_(bucket_name).upload(
-            file_name, 
-            file.getvalue(),
-            file_options={"content-type": file.type}
-        )
-        
-        if hasattr(result, 'error') and result.error:
-            st.error(f"Upload failed: {result.error}")
-            return None
-        
-        # Get public URL
-        public_url = supabase.storage.from_(bucket_name).get_public_url(file_name)
-        return public_url
+        return _upload_to_storage(supabase, file, bucket_name, file_stem)
         
     except Exception as e:
         st.error(f"Error uploading image: {e}")
         return None
 
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    """Shared keep-alive HTTP session for fetching stored images and bucket exports"""
+    session = requests.Session()
+    # Sized for the parallel bucket download; transient gateway errors are retried
+    retries = Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+    session.mount("https://", HTTPAdapter(
+        pool_connections=10, pool_maxsize=IMAGE_DOWNLOAD_WORKERS, max_retries=retries
+    ))
+    return session
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def fetch_image_bytes(image_url):
+    """Download an image once and serve repeat renders from memory"""
+    response = get_http_session().get(image_url, timeout=10)
+    response.raise_for_status()
+    return response.content
+
 def display_image_from_supabase(image_url):
     """Display image from Supabase storage"""
     try:
         if image_url and image_url.strip():
-            # Download image from URL
-            response = requests.get(image_url)
-            if response.status_code == 200:
-                image = Image.open(io.BytesIO(response.content))
-                st.image(image, caption="Uploaded Image", use_column_width=True)
-            else:
+            try:
+                content = fetch_image_bytes(image_url.strip())
+            except requests.RequestException:
                 st.warning("Could not load image")
+                return
+            st.image(content, caption="Uploaded Image", use_column_width=True)
     except Exception as e:
         st.warning(f"Error displaying image: {e}")
 
-def display_submission_images(submission_id, submission_type):
-    """Display images for a submission from Supabase storage"""
-    conn = get_db_connection()
-    if not conn:
-        return
-    
+def load_submission_images(submission_ids, submission_type):
+    """Fetch image rows for many submissions in one query, grouped by submission_id"""
+    images_by_id = defaultdict(list)
+    if not submission_ids:
+        return images_by_id
     try:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT image_url, image_filename 
-            FROM submission_images 
-            WHERE submission_id = %s AND submission_type = %s
-        """, (submission_id, submission_type))
-        
-        images = cursor.fetchall()
+        with db_cursor() as cursor:
+            cursor.execute("""
+                SELECT submission_id, image_url, image_filename 
+                FROM submission_images 
+                WHERE submission_type = %s AND submission_id = ANY(%s)
+            """, (submission_type, list(submission_ids)))
+            for submission_id, image_url, filename in cursor.fetchall():
+                images_by_id[submission_id].append((image_url, filename))
+    except Exception as e:
+        st.warning(f"Error loading images: {e}")
+    return images_by_id
+
+def display_submission_images(submission_id, submission_type, images=None):
+    """Display images for a submission from Supabase storage
+
+    Pass ``images`` (from load_submission_images) when rendering a list of
+    submissions to avoid one query per submission.
+    """
+    try:
+        if images is None:
+            images = load_submission_images([submission_id], submission_type).get(submission_id, [])
         
         if images:
             st.write("**📸 Uploaded Images:**")
@@ -433,207 +769,176 @@ def display_submission_images(submission_id, submission_type):
         
     except Exception as e:
         st.warning(f"Error loading images: {e}")
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 
 
 def handle_image_uploads(uploaded_files, username, form_type):
-    """Handle image uploads to Supabase storage"""
+    """Handle image uploads to Supabase storage, returning the public URLs"""
     if not uploaded_files:
-        return ""
+        return []
+    
+    supabase = get_supabase_client()
+    if not supabase:
+        return []
     
     image_urls = []
     bucket_name = "mess-images" if form_type == "mess" else "hostel-images"
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     
-    for idx, file in enumerate(uploaded_files):
-        # Generate unique filename
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        file_extension = file.name.split('.')[-1] if '.' in file.name else 'jpg'
-        file_name = f"{username}_{timestamp}_{idx}.{file_extension}"
-        
-        # Upload to Supabase
-        url = upload_image_to_supabase(file, bucket_name, file_name)
-        
-        if url:
-            image_urls.append(url)
+    # Uploads are independent network calls, so run them concurrently; Streamlit
+    # calls stay on the script thread and report results in upload order
+    with ThreadPoolExecutor(max_workers=min(8, len(uploaded_files))) as executor:
+        futures = []
+        for idx, file in enumerate(uploaded_files):
+            # Generate unique filename
+            file_stem = f"{username}_{timestamp}_{idx}"
+            futures.append(executor.submit(_upload_to_storage, supabase, file, bucket_name, file_stem))
+    
+    for file, future in zip(uploaded_files, futures):
+        try:
+            image_urls.append(future.result())
             st.success(f"✅ Uploaded: {file.name}")
-        else:
-            st.error(f"❌ Failed to upload: {file.name}")
+        except Exception as e:
+            st.error(f"❌ Failed to upload: {file.name} ({e})")
     
-    return ','.join(image_urls)
+    return image_urls
+
+def save_submission_images(cursor, submission_type, submission_id, image_urls):
+    """Record uploaded image URLs for a submission in a single multi-row INSERT"""
+    rows = [
+        (submission_type, submission_id, url, url.rsplit('/', 1)[-1])
+        for url in image_urls if url.strip()
+    ]
+    if rows:
+        execute_values(cursor, """
+            INSERT INTO submission_images (submission_type, submission_id, image_url, image_filename)
+            VALUES %s
+        """, rows, page_size=100)
 
 def save_mess_waste_data_with_images(username: str, data: dict, uploaded_files):
     """Save mess waste data with Supabase image uploads"""
-    conn = get_db_connection()
-    if not conn:
-        return False
-    
     try:
-        cursor = conn.cursor()
-        
         # Handle image uploads
         image_urls = handle_image_uploads(uploaded_files, username, "mess")
         
-        # Generate submission ID
-        submission_id = f"MESS_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{username}"
+        with db_cursor() as cursor:
+            # Insert mess waste submission
+            execute_prepared(cursor, "insert_mess_submission", """
+                INSERT INTO mess_waste_submissions (
+                    hostel, submission_date, collection_time,
+                    breakfast_students, breakfast_student_waste, breakfast_counter_waste, breakfast_vegetable_peels,
+                    lunch_students, lunch_student_waste, lunch_counter_waste, lunch_vegetable_peels,
+                    snacks_students, snacks_student_waste, snacks_counter_waste, snacks_vegetable_peels,
+                    dinner_students, dinner_student_waste, dinner_counter_waste, dinner_vegetable_peels,
+                    mess_dry_waste,
+                    remarks, status, submitted_by, submitted_at
+                ) VALUES (
+                    %s, %s, %s,
+                    %s, %s, %s, %s,
+                    %s, %s, %s, %s,
+                    %s, %s, %s, %s,
+                    %s, %s, %s, %s,
+                    %s,
+                    %s, %s, %s, %s
+                ) RETURNING submission_id
+            """, (
+                data['hostel'], data['submission_date'], data['collection_time'],
+                data['breakfast_students'], data['breakfast_student_waste'], data['breakfast_counter_waste'], data['breakfast_vegetable_peels'],
+                data['lunch_students'], data['lunch_student_waste'], data['lunch_counter_waste'], data['lunch_vegetable_peels'],
+                data['snacks_students'], data['snacks_student_waste'], data['snacks_counter_waste'], data['snacks_vegetable_peels'],
+                data['dinner_students'], data['dinner_student_waste'], data['dinner_counter_waste'], data['dinner_vegetable_peels'],
+                data['mess_dry_waste'],
+                data.get('remarks', ''), 'pending', username, datetime.now()
+            ))
+            # The database assigns the id; image rows reference it in the same transaction
+            submission_id = cursor.fetchone()[0]
         
-        # Insert mess waste submission
-        cursor.execute("""
-            INSERT INTO mess_waste_submissions (
-                hostel, submission_date, collection_time,
-                breakfast_students, breakfast_student_waste, breakfast_counter_waste, breakfast_vegetable_peels,
-                lunch_students, lunch_student_waste, lunch_counter_waste, lunch_vegetable_peels,
-                snacks_students, snacks_student_waste, snacks_counter_waste, snacks_vegetable_peels,
-                dinner_students, dinner_student_waste, dinner_counter_waste, dinner_vegetable_peels,
-                mess_dry_waste, total_students, total_mess_waste,
-                remarks, status, submitted_by, submitted_at
-            ) VALUES (
-                %s, %s, %s,
-                %s, %s, %s, %s,
-                %s, %s, %s, %s,
-                %s, %s, %s, %s,
-                %s, %s, %s, %s,
-                %s, %s, %s,
-                %s, %s, %s, %s
-            ) RETURNING submission_id
-        """, (
-            data['hostel'], data['submission_date'], data['collection_time'],
-            data['breakfast_students'], data['breakfast_student_waste'], data['breakfast_counter_waste'], data['breakfast_vegetable_peels'],
-            data['lunch_students'], data['lunch_student_waste'], data['lunch_counter_waste'], data['lunch_vegetable_peels'],
-            data['snacks_students'], data['snacks_student_waste'], data['snacks_counter_waste'], data['snacks_vegetable_peels'],
-            data['dinner_students'], data['dinner_student_waste'], data['dinner_counter_waste'], data['dinner_vegetable_peels'],
-            data['mess_dry_waste'], data['total_students'], data['total_mess_waste'],
-            data.get('remarks', ''), 'pending', username, datetime.now()
-        ))
-        
-        submission_id = cursor.fetchone()[0]
-        
-        # Save image URLs to submission_images table if any images were uploaded
-        if image_urls:
-            for url in image_urls.split(','):
-                if url.strip():
-                    cursor.execute("""
-                        INSERT INTO submission_images (submission_type, submission_id, image_url, image_filename)
-                        VALUES (%s, %s, %s, %s)
-                    """, ('mess_waste', submission_id, url.strip(), url.split('/')[-1]))
+            # Save image URLs to submission_images table if any images were uploaded
+            save_submission_images(cursor, 'mess_waste', submission_id, image_urls)
         
-        conn.commit()
+        clear_submission_caches()
         return True
         
     except Exception as e:
         st.error(f"Error saving mess waste data: {e}")
-        conn.rollback()
         return False
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 def save_hostel_waste_data_with_images(username: str, data: dict, uploaded_files):
     """Save hostel waste data with Supabase image uploads"""
-    conn = get_db_connection()
-    if not conn:
-        return False
-    
     try:
-        cursor = conn.cursor()
-        
         # Handle image uploads
         image_urls = handle_image_uploads(uploaded_files, username, "hostel")
         
-        # Generate submission ID
-        submission_id = f"HOSTEL_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{username}"
+        with db_cursor() as cursor:
+            # Insert hostel waste submission
+            execute_prepared(cursor, "insert_hostel_submission", """
+                INSERT INTO hostel_waste_submissions (
+                    hostel, submission_date, collection_time,
+                    dry_waste, wet_waste, e_waste, biomedical_waste, hazardous_waste,
+                    remarks, status, submitted_by, submitted_at
+                ) VALUES (
+                    %s, %s, %s,
+                    %s, %s, %s, %s, %s,
+                    %s, %s, %s, %s
+                ) RETURNING submission_id
+            """, (
+                data['hostel'], data['submission_date'], data['collection_time'],
+                data['dry_waste'], data['wet_waste'], data['e_waste'], data['biomedical_waste'], data['hazardous_waste'],
+                data.get('remarks', ''), 'pending', username, datetime.now()
+            ))
+            # The database assigns the id; image rows reference it in the same transaction
+            submission_id = cursor.fetchone()[0]
         
-        # Insert hostel waste submission
-        cursor.execute("""
-            INSERT INTO hostel_waste_submissions (
-                hostel, submission_date, collection_time,
-                dry_waste, wet_waste, e_waste, biomedical_waste, hazardous_waste,
-                remarks, status, submitted_by, submitted_at
-            ) VALUES (
-                %s, %s, %s,
-                %s, %s, %s, %s, %s,
-                %s, %s, %s, %s
-            ) RETURNING submission_id
-        """, (
-            data['hostel'], data['submission_date'], data['collection_time'],
-            data['dry_waste'], data['wet_waste'], data['e_waste'], data['biomedical_waste'], data['hazardous_waste'],
-            data.get('remarks', ''), 'pending', username, datetime.now()
-        ))
-        
-        submission_id = cursor.fetchone()[0]
-        
-        # Save image URLs to submission_images table if any images were uploaded
-        if image_urls:
-            for url in image_urls.split(','):
-                if url.strip():
-                    cursor.execute("""
-                        INSERT INTO submission_images (submission_type, submission_id, image_url, image_filename)
-                        VALUES (%s, %s, %s, %s)
-                    """, ('hostel_waste', submission_id, url.strip(), url.split('/')[-1]))
+            # Save image URLs to submission_images table if any images were uploaded
+            save_submission_images(cursor, 'hostel_waste', submission_id, image_urls)
         
-        conn.commit()
+        clear_submission_caches()
         return True
         
     except Exception as e:
         st.error(f"Error saving hostel waste data: {e}")
-        conn.rollback()
         return False
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 
 def create_default_admin():
     """Create default admin user if not exists"""
-    conn = get_db_connection()
-    if not conn:
-        return False
-    
     try:
-        cursor = conn.cursor()
-        
-        # Check if admin exists
-        cursor.execute("SELECT COUNT(*) FROM users WHERE username = 'admin'")
-        count = cursor.fetchone()[0]
-        
-        if count == 0:
-            # Create admin user
-            admin_password = bcrypt.hashpw("admin123".encode(), bcrypt.gensalt()).decode()
+        with db_cursor() as cursor:
+            # Check if admin exists
+            cursor.execute("SELECT 1 FROM users WHERE username = 'admin'")
+            if cursor.fetchone():
+                return True
+        
+        # Hash without holding a pooled connection; bcrypt is deliberately slow
+        admin_password = bcrypt.hashpw("admin123".encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+        with db_cursor() as cursor:
             cursor.execute("""
                 INSERT INTO users (username, name, password_hash, role) 
                 VALUES (%s, %s, %s, %s)
+                ON CONFLICT (username) DO NOTHING
             """, ("admin", "Administrator", admin_password, "admin"))
-            conn.commit()
-            
+        
         return True
         
     except Exception as e:
         st.error(f"Error creating admin user: {e}")
         return False
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 
+def _json_field(value):
+    """JSONB columns arrive already decoded; older text values still need parsing"""
+    return value if isinstance(value, dict) else json.loads(value)
+
 def show_edit_comparison(edit_record):
     """Show side-by-side comparison of original vs edited data"""
     try:
-        # Parse JSON data
-        original = json.loads(edit_record['original_data'])
-        edited = json.loads(edit_record['edited_data'])
+        original = _json_field(edit_record['original_data'])
+        edited = _json_field(edit_record['edited_data'])
+        # Changed keys are computed in SQL by get_pho_edits_data()
+        changed = set(edit_record.get('changed_fields') or [])
         
         # Create expandable section for each edit
-        with st.expander(f"📝 Edit by {edit_record['edited_by']} on {edit_record['edited_at']}", expanded=False):
+        with st.expander(f"📝 Edit by {edit_record['edited_by']} on {edit_record['edited_at_str']}", expanded=False):
             # Show edit reason if provided
             if edit_record.get('reason'):
                 st.info(f"**Reason:** {edit_record['reason']}")
@@ -657,10 +962,10 @@ def show_edit_comparison(edit_record):
                 st.markdown("---")
                 for key, value in edited.items():
                     display_key = key.replace('_', ' ').title()
-                    original_value = original.get(key)
                     
                     # Highlight changes
-                    if value != original_value:
+                    if key in changed:
+                        original_value = original.get(key)
                         if isinstance(value, (int, float)) and isinstance(original_value, (int, float)):
                             diff = value - original_value
                             diff_text = f" ({diff:+.2f})" if diff != 0 else ""
@@ -671,10 +976,7 @@ def show_edit_comparison(edit_record):
                         st.write(f"**{display_key}:** {value}")
             
             # Summary of changes
-            changes = []
-            for key, value in edited.items():
-                if value != original.get(key):
-                    changes.append(key.replace('_', ' ').title())
+            changes = [key.replace('_', ' ').title() for key in edited if key in changed]
             
             if changes:
                 st.markdown("---")
@@ -685,615 +987,691 @@ def show_edit_comparison(edit_record):
     except Exception as e:
         st.error(f"Error displaying edit comparison: {e}")
 
-def get_pho_edits_data():
-    """Get all PHO edits with submission details"""
-    conn = get_db_connection()
-    if not conn:
-        return pd.DataFrame()
+@st.cache_data(ttl=60, show_spinner=False)
+def load_pho_edits(latest_edit_at):
+    """Read the edit history; cached per latest edit timestamp so new edits invalidate it"""
+    engine = get_sqlalchemy_engine()
+    if not engine:
+        return pd.DataFrame(), [], []
     
+    # Get edits with submission details straight into a DataFrame
+    query = """
+        SELECT 
+            pe.edit_id,
+            pe.submission_type,
+            pe.submission_id,
+            pe.original_data,
+            pe.edited_data,
+            pe.edited_by,
+            pe.edited_at,
+            pe.reason,
+            ARRAY(
+                SELECT e.key FROM jsonb_each(pe.edited_data) e
+                WHERE e.value IS DISTINCT FROM pe.original_data -> e.key
+            ) AS changed_fields,
+            CASE 
+                WHEN pe.submission_type = 'mess_waste' THEN mws.hostel
+                WHEN pe.submission_type = 'hostel_waste' THEN hws.hostel
+            END as hostel,
+            CASE 
+                WHEN pe.submission_type = 'mess_waste' THEN mws.submission_date
+                WHEN pe.submission_type = 'hostel_waste' THEN hws.submission_date
+            END as submission_date
+        FROM pho_edits pe
+        LEFT JOIN mess_waste_submissions mws ON pe.submission_type = 'mess_waste' AND pe.submission_id = mws.submission_id
+        LEFT JOIN hostel_waste_submissions hws ON pe.submission_type = 'hostel_waste' AND pe.submission_id = hws.submission_id
+        ORDER BY pe.edited_at DESC
+    """
+    df = pd.read_sql_query(query, engine, parse_dates=['edited_at'])
+    # Derived display values and filter options are computed once per cache entry,
+    # not on every rerun of the edits tab
+    df['edited_at_str'] = df['edited_at'].dt.strftime('%Y-%m-%d %H:%M')
+    hostels = sorted(df['hostel'].dropna().unique().tolist())
+    editors = sorted(df['edited_by'].unique().tolist())
+    return df, hostels, editors
+
+def get_pho_edits_data():
+    """Get all PHO edits with submission details, plus the sorted hostels and editors in them"""
     try:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Get edits with submission details
-        cursor.execute("""
-            SELECT 
-                pe.edit_id,
-                pe.submission_type,
-                pe.submission_id,
-                pe.original_data,
-                pe.edited_data,
-                pe.edited_by,
-                pe.edited_at,
-                pe.reason,
-                CASE 
-                    WHEN pe.submission_type = 'mess_waste' THEN mws.hostel
-                    WHEN pe.submission_type = 'hostel_waste' THEN hws.hostel
-                END as hostel,
-                CASE 
-                    WHEN pe.submission_type = 'mess_waste' THEN mws.submission_date
-                    WHEN pe.submission_type = 'hostel_waste' THEN hws.submission_date
-                END as submission_date
-            FROM pho_edits pe
-            LEFT JOIN mess_waste_submissions mws ON pe.submission_type = 'mess_waste' AND pe.submission_id = mws.submission_id
-            LEFT JOIN hostel_waste_submissions hws ON pe.submission_type = 'hostel_waste' AND pe.submission_id = hws.submission_id
-            ORDER BY pe.edited_at DESC
-        """)
-        
-        edits = cursor.fetchall()
-        return pd.DataFrame([dict(edit) for edit in edits])
+        with db_cursor() as cursor:
+            cursor.execute("SELECT MAX(edited_at) FROM pho_edits")
+            latest_edit_at = cursor.fetchone()[0]
+        return load_pho_edits(latest_edit_at)
         
     except Exception as e:
         st.error(f"Error loading PHO edits: {e}")
-        return pd.DataFrame()
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+        return pd.DataFrame(), [], []
 
 
 # -----------------------------------------------------------------------------
 # 🔐 AUTHENTICATION
 # -----------------------------------------------------------------------------
+@st.cache_data(ttl=60, show_spinner=False)
+def get_user_record(username: str):
+    """Fetch (name, role, password_hash) for a user in one query, or None if unknown"""
+    with db_cursor() as cursor:
+        execute_prepared(cursor, "get_user", "SELECT name, role, password_hash FROM users WHERE username = %s", (username,))
+        return cursor.fetchone()
+
+BCRYPT_ROUNDS = 12
+LOGIN_ATTEMPT_WINDOW = 60  # seconds
+LOGIN_ATTEMPT_LIMIT = 5
+LOGIN_THROTTLE_DELAY = 2  # seconds
+LOGIN_LOG_MAX_USERS = 10_000  # usernames tracked at once in the failed-login log
+
+@st.cache_resource(show_spinner=False)
+def get_failed_login_log():
+    """Process-wide record of recent failed logins per username"""
+    return defaultdict(deque), threading.Lock()
+
+def _prune_failed_logins(attempts, username: str, cutoff: float) -> int:
+    """Drop attempts older than the window; forget the username once none remain. Caller holds the lock"""
+    recent = attempts.get(username)
+    if recent is None:
+        return 0
+    while recent and recent[0] < cutoff:
+        recent.popleft()
+    if not recent:
+        del attempts[username]
+    return len(recent)
+
+def _recent_failed_logins(username: str) -> int:
+    attempts, lock = get_failed_login_log()
+    cutoff = time.time() - LOGIN_ATTEMPT_WINDOW
+    with lock:
+        return _prune_failed_logins(attempts, username, cutoff)
+
+def _record_login_result(username: str, success: bool):
+    attempts, lock = get_failed_login_log()
+    now = time.time()
+    with lock:
+        if success:
+            attempts.pop(username, None)
+            return
+        if username not in attempts and len(attempts) >= LOGIN_LOG_MAX_USERS:
+            # Cycling through usernames must not grow the map without bound: sweep
+            # expired entries, and if it is still full drop the stalest usernames
+            cutoff = now - LOGIN_ATTEMPT_WINDOW
+            for name in list(attempts):
+                _prune_failed_logins(attempts, name, cutoff)
+            if len(attempts) >= LOGIN_LOG_MAX_USERS:
+                stalest = sorted(attempts, key=lambda name: attempts[name][-1])
+                for name in stalest[:len(attempts) - LOGIN_LOG_MAX_USERS + 1]:
+                    del attempts[name]
+        attempts[username].append(now)
+
+@st.cache_resource(show_spinner=False)
+def get_dummy_password_hash() -> bytes:
+    """Hash checked for unknown usernames so a miss costs the same bcrypt time as a hit"""
+    return bcrypt.hashpw(secrets.token_bytes(16), bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
+
 def verify_password(username: str, password: str) -> bool:
-    conn = get_db_connection()
-    if not conn:
-        return False
-    
     try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT password_hash FROM users WHERE username = %s", (username,))
-        result = cursor.fetchone()
-        
-        if result:
-            stored_password = result[0]
-            return bcrypt.checkpw(password.encode(), stored_password.encode())
-        return False
+        # Slow down repeated guesses before spending bcrypt CPU on them
+        if _recent_failed_logins(username) >= LOGIN_ATTEMPT_LIMIT:
+            time.sleep(LOGIN_THROTTLE_DELAY)
+        
+        result = get_user_record(username)
+        if not result:
+            # Unknown user: still run bcrypt so response time does not reveal which usernames exist
+            bcrypt.checkpw(password.encode(), get_dummy_password_hash())
+            valid = False
+        else:
+            valid = bcrypt.checkpw(password.encode(), result[2].encode())
+        _record_login_result(username, valid)
+        return valid
         
     except Exception as e:
         st.error(f"Authentication error: {e}")
         return False
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 def get_user_role(username: str) -> str:
-    conn = get_db_connection()
-    if not conn:
-        return ""
-    
     try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT role FROM users WHERE username = %s", (username,))
-        result = cursor.fetchone()
-        return result[0] if result else ""
+        result = get_user_record(username)
+        return result[1] if result else ""
         
     except Exception as e:
         st.error(f"Error getting user role: {e}")
         return ""
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 def get_user_name(username: str) -> str:
-    conn = get_db_connection()
-    if not conn:
-        return ""
-    
     try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM users WHERE username = %s", (username,))
-        result = cursor.fetchone()
+        result = get_user_record(username)
         return result[0] if result else ""
         
     except Exception as e:
         st.error(f"Error getting user name: {e}")
         return ""
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 # -----------------------------------------------------------------------------
 # 👥 USER MANAGEMENT FUNCTIONS
 # -----------------------------------------------------------------------------
 def add_user(username, name, password, role):
-    conn = get_db_connection()
-    if not conn:
-        return False
-    
     try:
-        cursor = conn.cursor()
-        hashed_password = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
-        
-        cursor.execute("""
-            INSERT INTO users (username, name, password_hash, role) 
-            VALUES (%s, %s, %s, %s)
-        """, (username, name, hashed_password, role))
-        
-        conn.commit()
+        # Hash before checking out a connection; bcrypt is deliberately slow
+        hashed_password = bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+        with db_cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO users (username, name, password_hash, role) 
+                VALUES (%s, %s, %s, %s)
+            """, (username, name, hashed_password, role))
+        fetch_supervisor_hostels.clear()
+        fetch_all_users.clear()
+        get_user_record.clear()
         return True
         
     except Exception as e:
         st.error(f"Error adding user: {e}")
         return False
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 def delete_user(username):
-    conn = get_db_connection()
-    if not conn:
-        return False
-    
     try:
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM users WHERE username = %s", (username,))
-        conn.commit()
+        with db_cursor() as cursor:
+            cursor.execute("DELETE FROM users WHERE username = %s", (username,))
+        fetch_supervisor_hostels.clear()
+        fetch_all_users.clear()
+        get_user_record.clear()
         return True
         
     except Exception as e:
         st.error(f"Error deleting user: {e}")
         return False
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_all_users():
+    """(users frame, usernames) for the admin list; raises so failures are not cached"""
+    with db_cursor() as cursor:
+        cursor.execute("SELECT username, name, role FROM users ORDER BY username")
+        users_df = pd.DataFrame(cursor.fetchall(), columns=["username", "name", "role"])
+    return users_df, tuple(users_df["username"])
 
 def get_all_users():
-    conn = get_db_connection()
-    if not conn:
-        return []
-    
     try:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        cursor.execute("SELECT username, name, role FROM users ORDER BY username")
-        users = cursor.fetchall()
-        return [dict(user) for user in users]
+        return fetch_all_users()
         
     except Exception as e:
         st.error(f"Error getting users: {e}")
-        return []
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+        return pd.DataFrame(), ()
 
 # -----------------------------------------------------------------------------
 # 📦 DATA HELPERS
 # -----------------------------------------------------------------------------
-def ensure_data_structure():
-    """Ensure database tables exist"""
+@st.cache_resource(show_spinner=False)
+def initialize_database():
+    """Run schema setup once per server process; raising keeps failures out of the cache"""
     # Create database tables
     if not create_tables():
-        return False
+        raise RuntimeError("Table creation failed")
     # Create default admin user
     if not create_default_admin():
-        return False
+        raise RuntimeError("Default admin creation failed")
     return True
 
+def ensure_data_structure():
+    """Ensure database tables exist"""
+    try:
+        return initialize_database()
+    except RuntimeError:
+        return False
+
+def clear_submission_caches():
+    """Drop cached submission reads after a submission is saved, edited or reviewed"""
+    query_pending_data_for_pho.clear()
+    load_user_submissions.clear()
 
+def clear_master_caches():
+    """Drop every cached master-table read after the master table changes"""
+    query_master_data.clear()
+    query_master_data_filtered.clear()
+    query_master_aggregates.clear()
+    query_master_date_bounds.clear()
+    export_master_csv.clear()
+
+
+
+MESS_SUBMISSION_COLUMNS = [
+    "hostel", "submission_date", "collection_time",
+    "breakfast_students", "breakfast_student_waste", "breakfast_counter_waste", "breakfast_vegetable_peels",
+    "lunch_students", "lunch_student_waste", "lunch_counter_waste", "lunch_vegetable_peels",
+    "snacks_students", "snacks_student_waste", "snacks_counter_waste", "snacks_vegetable_peels",
+    "dinner_students", "dinner_student_waste", "dinner_counter_waste", "dinner_vegetable_peels",
+    "mess_dry_waste",
+]
+
+# Same columns and values as save_mess_waste_data_with_images, minus the image upload
+MESS_SUBMISSION_INSERT = f"""
+    INSERT INTO mess_waste_submissions 
+    ({", ".join(MESS_SUBMISSION_COLUMNS)}, remarks, status, submitted_by, submitted_at)
+"""
+
+def _mess_submission_row(username, data):
+    return (*[data[col] for col in MESS_SUBMISSION_COLUMNS], data.get('remarks', ''), 'pending', username, datetime.now())
 
 def save_mess_waste_data(username: str, data: dict):
-    """Save mess waste data to PostgreSQL database"""
-    conn = get_db_connection()
-    if not conn:
-        return False
-    
+    """Save mess waste data to PostgreSQL database, returning the new submission_id"""
     try:
-        cursor = conn.cursor()
-        submission_id = str(int(time.time()))
+        row = _mess_submission_row(username, data)
+        with db_cursor() as cursor:
+            execute_prepared(cursor, "insert_mess_waste_data", f"""{MESS_SUBMISSION_INSERT}
+                VALUES ({", ".join(["%s"] * len(row))})
+                RETURNING submission_id
+            """, row)
         
-        cursor.execute("""
-            INSERT INTO mess_waste_submissions 
-            (submission_id, submission_date, hostel, breakfast_students, breakfast_student_waste, 
-             breakfast_counter_waste, breakfast_vegetable_peels, lunch_students, lunch_student_waste, 
-             lunch_counter_waste, lunch_vegetable_peels, snacks_students, snacks_student_waste, 
-             snacks_counter_waste, snacks_vegetable_peels, dinner_students, dinner_student_waste, 
-             dinner_counter_waste, dinner_vegetable_peels, mess_dry_waste, total_students, 
-             total_mess_waste, remarks, image_paths, submitted_by)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            submission_id, data['submission_date'], data['hostel'],
-            data['breakfast_students'], data['breakfast_student_waste'], 
-            data['breakfast_counter_waste'], data['breakfast_vegetable_peels'],
-            data['lunch_students'], data['lunch_student_waste'], 
-            data['lunch_counter_waste'], data['lunch_vegetable_peels'],
-            data['snacks_students'], data['snacks_student_waste'], 
-            data['snacks_counter_waste'], data['snacks_vegetable_peels'],
-            data['dinner_students'], data['dinner_student_waste'], 
-            data['dinner_counter_waste'], data['dinner_vegetable_peels'],
-            data['mess_dry_waste'], data['total_students'], data['total_mess_waste'],
-            data['remarks'], data.get('image_paths', ''), username
-        ))
+            submission_id = cursor.fetchone()[0]
+        clear_submission_caches()
+        return submission_id
         
-        conn.commit()
-        return True
+    except Exception as e:
+        st.error(f"Database error: {e}")
+        return None
+
+def save_mess_waste_data_bulk(username: str, rows: list):
+    """Save many mess waste submissions in one transaction (imports/migrations), returning their ids"""
+    try:
+        values = [_mess_submission_row(username, data) for data in rows]
+        with db_cursor() as cursor:
+            submission_ids = execute_values(cursor, f"""{MESS_SUBMISSION_INSERT}
+                VALUES %s
+                RETURNING submission_id
+            """, values, page_size=100, fetch=True)
+        clear_submission_caches()
+        return [row[0] for row in submission_ids]
         
     except Exception as e:
         st.error(f"Database error: {e}")
-        return False
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+        return None
 
 def save_hostel_waste_data(username: str, data: dict):
-    """Save hostel waste data to PostgreSQL database"""
-    conn = get_db_connection()
-    if not conn:
-        return False
-    
+    """Save hostel waste data to PostgreSQL database, returning the new submission_id"""
     try:
-        cursor = conn.cursor()
-        submission_id = str(int(time.time()))
-        
-        cursor.execute("""
-            INSERT INTO hostel_waste_submissions 
-            (submission_id, submission_date, hostel, dry_waste, wet_waste, e_waste, 
-             biomedical_waste, hazardous_waste, total_waste, remarks, image_paths, submitted_by)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
-            submission_id, data['submission_date'], data['hostel'],
-            data['dry_waste'], data['wet_waste'], data['e_waste'],
-            data['biomedical_waste'], data['hazardous_waste'], data['total_waste'],
-            data['remarks'], data.get('image_paths', ''), username
-        ))
+        with db_cursor() as cursor:
+            execute_prepared(cursor, "insert_hostel_waste_data", """
+                INSERT INTO hostel_waste_submissions 
+                (submission_date, hostel, dry_waste, wet_waste, e_waste, 
+                 biomedical_waste, hazardous_waste, remarks, image_paths, submitted_by)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                RETURNING submission_id
+            """, (
+                data['submission_date'], data['hostel'],
+                data['dry_waste'], data['wet_waste'], data['e_waste'],
+                data['biomedical_waste'], data['hazardous_waste'],
+                data['remarks'], data.get('image_paths', ''), username
+            ))
         
-        conn.commit()
-        return True
+            submission_id = cursor.fetchone()[0]
+        clear_submission_caches()
+        return submission_id
         
     except Exception as e:
         st.error(f"Database error: {e}")
-        return False
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+        return None
 
-@st.cache_data(ttl=300)
-def load_master_data():
-    """Load ALL master waste data without limits"""
+# Master data only changes when a submission is verified or the table is
+# rebuilt, and every such path clears this cache, so the TTL is just a backstop
+@st.cache_data(ttl=24 * 3600, show_spinner=False)
+def query_master_data():
+    """Load ALL master waste data without limits; raises so failures are not cached"""
     engine = get_sqlalchemy_engine()
     if not engine:
-        return pd.DataFrame()
+        raise RuntimeError("Database engine unavailable")
     
+    # Load ALL master data (remove any LIMIT clauses)
+    query = """
+        SELECT * FROM master_waste_data 
+        ORDER BY date DESC, hostel
+    """
+    # Parse dates once here so period and "today" filters compare datetime64 values,
+    # and pin the DECIMAL columns to float64 so pandas never holds them as objects
+    return pd.read_sql_query(query, engine, parse_dates=["date"], dtype=MASTER_FLOAT_DTYPES)
+
+def load_master_data():
     try:
-        # Load ALL master data (remove any LIMIT clauses)
-        query = """
-            SELECT * FROM master_waste_data 
-            ORDER BY date DESC, hostel
-        """
-        df = pd.read_sql(query, engine)
-        return df
+        return query_master_data()
     except Exception as e:
         st.error(f"Error loading master data: {e}")
         return pd.DataFrame()
-    finally:
-        engine.dispose()
-
 
-@st.cache_data(ttl=300)
-def load_pending_data_for_pho():
-    """Load ONLY pending data for PHO verification"""
-    conn = get_db_connection()
-    if not conn:
-        return {}
+@st.cache_data(ttl=120, show_spinner=False)
+def query_master_date_bounds():
+    """Earliest and latest master dates; raises so failures are not cached"""
+    with db_cursor() as cursor:
+        cursor.execute("SELECT MIN(date), MAX(date) FROM master_waste_data")
+        return cursor.fetchone()
+
+def _master_filter_sql(hostel, start, end):
+    """(WHERE clause, params) for the admin hostel/date filter; only the predicates that apply, so the (hostel, date) index is usable"""
+    predicates = {"hostel": "hostel = :hostel", "start": "date >= :start", "end": "date <= :end"}
+    params = {key: value for key, value in (("hostel", hostel), ("start", start), ("end", end)) if value}
+    where = " AND ".join(predicates[key] for key in params)
+    return (f"WHERE {where}" if where else ""), params
+
+@st.cache_data(ttl=120, max_entries=64, show_spinner=False)
+def query_master_data_filtered(hostel=None, start=None, end=None):
+    """Master rows for one hostel and/or date range, filtered by Postgres; raises so failures are not cached"""
+    engine = get_sqlalchemy_engine()
+    if not engine:
+        raise RuntimeError("Database engine unavailable")
     
+    where, params = _master_filter_sql(hostel, start, end)
+    query = sqlalchemy.text(f"SELECT * FROM master_waste_data {where} ORDER BY date DESC, hostel")
+    return pd.read_sql_query(
+        query, engine,
+        params=params,
+        parse_dates=["date"], dtype=MASTER_FLOAT_DTYPES
+    )
+
+@st.cache_data(ttl=120, max_entries=64, show_spinner=False)
+def query_master_aggregates(hostel=None, start=None, end=None):
+    """(row count, mess total, hostel total) for the filter in one round-trip; raises so failures are not cached"""
+    engine = get_sqlalchemy_engine()
+    if not engine:
+        raise RuntimeError("Database engine unavailable")
+    where, params = _master_filter_sql(hostel, start, end)
+    query = sqlalchemy.text(f"""
+        SELECT COUNT(*), COALESCE(SUM(total_mess_waste), 0), COALESCE(SUM(total_hostel_waste), 0)
+        FROM master_waste_data {where}
+    """)
+    with engine.connect() as connection:
+        count, total_mess, total_hostel = connection.execute(query, params).one()
+    return int(count), float(total_mess), float(total_hostel)
+
+def load_master_data_filtered(hostel=None, start=None, end=None):
     try:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Load ONLY pending mess waste
-        cursor.execute("""
-            SELECT * FROM mess_waste_submissions 
-            WHERE status = 'pending' 
-            ORDER BY submission_date DESC, hostel
-        """)
-        mess_pending = cursor.fetchall()
-        
-        # Load ONLY pending hostel waste
+        return query_master_data_filtered(hostel, start, end)
+    except Exception as e:
+        st.error(f"Error loading master data: {e}")
+        return pd.DataFrame()
+
+@st.cache_data(ttl=24 * 3600, max_entries=32, show_spinner=False)
+def export_master_csv(hostel=None):
+    """Master table as CSV bytes, formatted server-side by COPY; raises so failures are not cached"""
+    with db_cursor() as cursor:
+        select = "SELECT * FROM master_waste_data"
+        if hostel:
+            select = cursor.mogrify(select + " WHERE hostel = %s", (hostel,)).decode()
+        buffer = io.BytesIO()
+        cursor.copy_expert(f"COPY ({select} ORDER BY date DESC, hostel) TO STDOUT WITH CSV HEADER", buffer)
+    return buffer.getvalue()
+
+CSV_CHUNK_ROWS = 10_000
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def dataframe_csv(df):
+    """CSV bytes for a download button, rebuilt only when the frame changes"""
+    # Encode in row chunks straight into the buffer, so no intermediate str of
+    # the whole CSV is built alongside its bytes
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False, chunksize=CSV_CHUNK_ROWS, encoding="utf-8")
+    return buffer.getvalue()
+
+
+# Submissions change only when a supervisor submits or a PHO verifies, and both
+# paths clear this cache alongside the pending queue
+@st.cache_data(ttl=60, show_spinner=False)
+def load_user_submissions(username):
+    """Verified and pending submissions of one supervisor; raises so failures are not cached"""
+    with db_cursor() as cursor:
+        # Both statuses in one round trip; the tab splits them
         cursor.execute("""
-            SELECT * FROM hostel_waste_submissions 
+            SELECT 'mess_waste' as type, submission_date as date, hostel, total_mess_waste as total_waste, status, submitted_at, verified_at
+            FROM mess_waste_submissions 
+            WHERE submitted_by = %s AND status IN ('verified', 'pending')
+            UNION ALL
+            SELECT 'hostel_waste' as type, submission_date as date, hostel, total_waste, status, submitted_at, verified_at
+            FROM hostel_waste_submissions 
+            WHERE submitted_by = %s AND status IN ('verified', 'pending')
+            ORDER BY date DESC
+        """, (username, username))
+        return pd.DataFrame(cursor.fetchall(), columns=[column.name for column in cursor.description])
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def query_pending_data_for_pho(data_type):
+    """Pending submissions of one type ('mess_waste' or 'hostel_waste') grouped by hostel and date; raises so failures are not cached"""
+    with db_cursor() as cursor:
+        cursor.execute(f"""
+            SELECT * FROM {SUBMISSION_TABLES[data_type]} 
             WHERE status = 'pending' 
             ORDER BY submission_date DESC, hostel
         """)
-        hostel_pending = cursor.fetchall()
-        
-        # Group by hostel and date
+        # Group by hostel and date; plain tuples plus one zip per row
         data_by_hostel_date = {}
-        
-        # Process only pending mess waste
-        for record in mess_pending:
-            if record['status'] == 'pending':  # Double-check
-                date_str = str(record['submission_date'])
-                key = f"{record['hostel']}_{date_str}_mess_waste"
-                if key not in data_by_hostel_date:
-                    data_by_hostel_date[key] = []
-                record_dict = dict(record)
-                record_dict['data_type'] = 'mess_waste'
-                data_by_hostel_date[key].append(record_dict)
-        
-        # Process only pending hostel waste
-        for record in hostel_pending:
-            if record['status'] == 'pending':  # Double-check
-                date_str = str(record['submission_date'])
-                key = f"{record['hostel']}_{date_str}_hostel_waste"
-                if key not in data_by_hostel_date:
-                    data_by_hostel_date[key] = []
-                record_dict = dict(record)
-                record_dict['data_type'] = 'hostel_waste'
-                data_by_hostel_date[key].append(record_dict)
+        columns = [desc[0] for desc in cursor.description]
+        for row in cursor.fetchall():
+            record = dict(zip(columns, row))
+            record['data_type'] = data_type
+            key = f"{record['hostel']}_{record['submission_date']}_{data_type}"
+            data_by_hostel_date.setdefault(key, []).append(record)
         
         return data_by_hostel_date
-        
+
+def load_pending_data_for_pho(data_type):
+    """Load ONLY pending data of one submission type for PHO verification"""
+    try:
+        return query_pending_data_for_pho(data_type)
     except Exception as e:
         st.error(f"Error loading pending data: {e}")
         return {}
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 
+HOSTEL_WASTE_COLUMNS = ["dry_waste", "wet_waste", "e_waste", "biomedical_waste", "hazardous_waste", "total_waste"]
 
 def aggregate_hostel_waste_collections(records):
     """Aggregate multiple hostel waste collections into totals"""
     if not records:
         return {}
     
-    totals = {
-        'dry_waste': 0,
-        'wet_waste': 0,
-        'e_waste': 0,
-        'biomedical_waste': 0,
-        'hazardous_waste': 0,
-        'total_waste': 0,
+    # Cast once and reduce column-wise instead of coercing each field per record
+    sums = pd.DataFrame(records).reindex(columns=HOSTEL_WASTE_COLUMNS, fill_value=0).fillna(0).astype("float64").sum()
+    first = records[0]
+    return {
+        **{col: float(sums[col]) for col in HOSTEL_WASTE_COLUMNS},
         'collection_count': len(records),
-        'submitted_by': records[0].get('submitted_by', 'N/A'),
-        'submitted_at': records[0].get('submitted_at', 'N/A'),
-        'hostel': records[0].get('hostel', 'N/A'),
-        'submission_date': records[0].get('submission_date', 'N/A')
+        'submitted_by': first.get('submitted_by', 'N/A'),
+        'submitted_at': first.get('submitted_at', 'N/A'),
+        'hostel': first.get('hostel', 'N/A'),
+        'submission_date': first.get('submission_date', 'N/A')
     }
-    
-    for record in records:
-        totals['dry_waste'] += float(record.get('dry_waste', 0))
-        totals['wet_waste'] += float(record.get('wet_waste', 0))
-        totals['e_waste'] += float(record.get('e_waste', 0))
-        totals['biomedical_waste'] += float(record.get('biomedical_waste', 0))
-        totals['hazardous_waste'] += float(record.get('hazardous_waste', 0))
-        totals['total_waste'] += float(record.get('total_waste', 0))
-    
-    return totals
+
+def _dumps_record(record):
+    # Submission rows carry dates, times and Decimals; store those as their text form
+    return json.dumps(record, default=str)
 
 def save_pho_edit(submission_id, submission_type, original_data, edited_data, pho_username, edit_reason=""):
     """Save PHO edit to tracking table"""
-    conn = get_db_connection()
-    if not conn:
-        return False
-    
     try:
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO pho_edits 
-            (submission_id, submission_type, original_data, edited_data, edited_by, edit_reason)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """, (
-            submission_id, submission_type, 
-            json.dumps(original_data), json.dumps(edited_data), 
-            pho_username, edit_reason
-        ))
-        conn.commit()
-        return True
+        with db_cursor() as cursor:
+            execute_prepared(cursor, "insert_pho_edit", """
+                INSERT INTO pho_edits 
+                (submission_id, submission_type, original_data, edited_data, edited_by, reason)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, (
+                submission_id, submission_type, 
+                Json(original_data, dumps=_dumps_record), Json(edited_data, dumps=_dumps_record), 
+                pho_username, edit_reason
+            ))
+            return True
     except Exception as e:
         st.error(f"Error saving PHO edit: {e}")
         return False
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
-def approve_submission(record_data, pho_username):
-    """Approve submission and move to verified status"""
-    conn = get_db_connection()
-    if not conn:
-        return False
+MEALS = ("breakfast", "lunch", "snacks", "dinner")
+
+MEAL_WASTE_COLUMNS = [
+    f"{meal}_{kind}" for meal in MEALS for kind in ("student_waste", "counter_waste", "vegetable_peels")
+]
+
+MEAL_LABELS = {"breakfast": "🌅 Breakfast", "lunch": "🌞 Lunch", "snacks": "🍪 Snacks", "dinner": "🌙 Dinner"}
+
+# Per-meal form inputs: (column suffix, label, minimum and default value, step)
+MEAL_INPUT_FIELDS = [
+    ("students", "👥 Students Count", 0, 1),
+    ("student_waste", "🍽️ Students' Waste (kg)", 0.0, 0.1),
+    ("counter_waste", "🍲 Counter Waste (kg)", 0.0, 0.1),
+    ("vegetable_peels", "🥬 Vegetable Peels (kg)", 0.0, 0.1),
+]
+
+# Master columns that accumulate per (date, hostel) as submissions are verified
+# (mess totals and per-capita figures are generated columns derived from these)
+MASTER_MESS_SUM_COLUMNS = ["total_students"] + MEAL_WASTE_COLUMNS + ["mess_dry_waste"]
+# (total_hostel_waste is generated from these)
+MASTER_HOSTEL_SUM_COLUMNS = ["dry_waste", "wet_waste", "e_waste", "biomedical_waste", "hazardous_waste"]
+
+MASTER_FLOAT_DTYPES = dict.fromkeys(
+    MASTER_MESS_SUM_COLUMNS[1:]
+    + ["total_mess_waste", "total_mess_waste_no_peels", "per_capita_mess_waste", "per_capita_mess_waste_no_peels"]
+    + MASTER_HOSTEL_SUM_COLUMNS + ["total_hostel_waste"],
+    "float64",
+)
+
+SUBMISSION_TABLES = {
+    "mess_waste": "mess_waste_submissions",
+    "hostel_waste": "hostel_waste_submissions",
+}
+
+def _accumulate_set_clause(columns):
+    return ",\n                ".join(f"{col} = m.{col} + EXCLUDED.{col}" for col in columns)
+
+def _mess_totals_sql(source):
+    """SELECT summing the mess submissions in `source` into master columns per (date, hostel)"""
+    students = " + ".join(f"{meal}_students" for meal in MEALS)
+    sums = ",\n                ".join(f"SUM({col}) AS {col}" for col in MEAL_WASTE_COLUMNS + ["mess_dry_waste"])
+    return f"""
+            SELECT submission_date AS date, hostel,
+                SUM({students}) AS total_students,
+                {sums}
+            FROM {source}
+            GROUP BY submission_date, hostel"""
+
+def _hostel_totals_sql(source):
+    """SELECT summing the hostel submissions in `source` into master columns per (date, hostel)"""
+    return f"""
+            SELECT submission_date AS date, hostel,
+                {", ".join(f"SUM({col}) AS {col}" for col in MASTER_HOSTEL_SUM_COLUMNS)}
+            FROM {source}
+            GROUP BY submission_date, hostel"""
+
+def _master_upsert_sql_mess():
+    """Upsert that folds the mess rows in the `verified` CTE into their master rows"""
+    return f"""
+        INSERT INTO master_waste_data AS m
+        (date, hostel, {", ".join(MASTER_MESS_SUM_COLUMNS)})
+        SELECT date, hostel, {", ".join(MASTER_MESS_SUM_COLUMNS)}
+        FROM ({_mess_totals_sql("verified")}) t
+        ON CONFLICT (date, hostel) 
+        DO UPDATE SET 
+            {_accumulate_set_clause(MASTER_MESS_SUM_COLUMNS)}
+    """
+
+def _master_upsert_sql_hostel():
+    """Upsert that folds the hostel rows in the `verified` CTE into their master rows"""
+    return f"""
+        INSERT INTO master_waste_data AS m
+        (date, hostel, {", ".join(MASTER_HOSTEL_SUM_COLUMNS)})
+        SELECT date, hostel, {", ".join(MASTER_HOSTEL_SUM_COLUMNS)}
+        FROM ({_hostel_totals_sql("verified")}) t
+        ON CONFLICT (date, hostel) 
+        DO UPDATE SET 
+            {_accumulate_set_clause(MASTER_HOSTEL_SUM_COLUMNS)}
+    """
+
+MASTER_UPSERTS = {
+    "mess_waste": _master_upsert_sql_mess,
+    "hostel_waste": _master_upsert_sql_hostel,
+}
+
+def _submission_type(record):
+    return "mess_waste" if "breakfast_students" in record else "hostel_waste"
+
+def verify_submissions(records, pho_username):
+    """Mark submissions verified and fold them into master data in one transaction"""
+    ids_by_type = defaultdict(list)
+    for record in records:
+        ids_by_type[_submission_type(record)].append(record['submission_id'])
     
     try:
-        cursor = conn.cursor()
-        timestamp = datetime.now()
-        
-        if 'breakfast_students' in record_data:
-            # Update mess waste submission
-            cursor.execute("""
-                UPDATE mess_waste_submissions 
-                SET status = 'verified', verified_by = %s, verified_at = %s
-                WHERE submission_id = %s
-            """, (pho_username, timestamp, record_data['submission_id']))
-            
-            # Add to master data
-            add_to_master_file_mess(record_data)
-            
-        else:
-            # Update hostel waste submission
-            cursor.execute("""
-                UPDATE hostel_waste_submissions 
-                SET status = 'verified', verified_by = %s, verified_at = %s
-                WHERE submission_id = %s
-            """, (pho_username, timestamp, record_data['submission_id']))
-            
-            # Add to master data
-            add_to_master_file_hostel(record_data)
-        
-        conn.commit()
-        
-        # Clear cache
-        load_pending_data_for_pho.clear()
-        load_master_data.clear()
+        with db_cursor() as cursor:
+            timestamp = datetime.now()
+            for submission_type, ids in ids_by_type.items():
+                # The UPDATE feeds the master upsert directly, so only rows that
+                # were still pending get counted and each type is one round-trip
+                cursor.execute(f"""
+                    WITH verified AS (
+                        UPDATE {SUBMISSION_TABLES[submission_type]} 
+                        SET status = 'verified', verified_by = %s, verified_at = %s
+                        WHERE submission_id = ANY(%s) AND status = 'pending'
+                        RETURNING *
+                    )
+                    {MASTER_UPSERTS[submission_type]()}
+                """, (pho_username, timestamp, ids))
         
+        # Clear cache once the transaction has committed
+        clear_submission_caches()
+        clear_master_caches()
         return True
         
     except Exception as e:
         st.error(f"Error approving submission: {e}")
         return False
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+
+def approve_submission(record_data, pho_username):
+    """Approve submission and move to verified status"""
+    return verify_submissions([record_data], pho_username)
 
 def approve_all_collections(records, pho_username):
     """Approve all collections for a hostel-date combination"""
-    for record in records:
-        approve_submission(record, pho_username)
+    return verify_submissions(records, pho_username)
 
-def add_to_master_file_mess(data):
-    """Add verified mess waste data to master file with detailed breakdown"""
-    conn = get_db_connection()
-    if not conn:
-        return
+def rebuild_master_data():
+    """Recompute master_waste_data from all verified submissions in one set-based statement"""
+    mess_cols = MASTER_MESS_SUM_COLUMNS
+    hostel_cols = MASTER_HOSTEL_SUM_COLUMNS
     
     try:
-        cursor = conn.cursor()
-        
-        # Calculate totals
-        total_students = (
-            data.get("breakfast_students", 0) + data.get("lunch_students", 0) + 
-            data.get("snacks_students", 0) + data.get("dinner_students", 0)
-        )
-        
-        total_mess_waste = (
-            data.get("breakfast_student_waste", 0) + data.get("breakfast_counter_waste", 0) + 
-            data.get("breakfast_vegetable_peels", 0) + data.get("lunch_student_waste", 0) + 
-            data.get("lunch_counter_waste", 0) + data.get("lunch_vegetable_peels", 0) + 
-            data.get("snacks_student_waste", 0) + data.get("snacks_counter_waste", 0) + 
-            data.get("snacks_vegetable_peels", 0) + data.get("dinner_student_waste", 0) + 
-            data.get("dinner_counter_waste", 0) + data.get("dinner_vegetable_peels", 0) +
-            data.get("mess_dry_waste", 0)
-        )
-        
-        total_mess_waste_no_peels = (
-            data.get("breakfast_student_waste", 0) + data.get("breakfast_counter_waste", 0) + 
-            data.get("lunch_student_waste", 0) + data.get("lunch_counter_waste", 0) + 
-            data.get("snacks_student_waste", 0) + data.get("snacks_counter_waste", 0) + 
-            data.get("dinner_student_waste", 0) + data.get("dinner_counter_waste", 0) +
-            data.get("mess_dry_waste", 0)
-        )
-        
-        # Handle zero student count
-        per_capita_mess_waste = total_mess_waste / total_students if total_students > 0 else 0
-        per_capita_mess_waste_no_peels = total_mess_waste_no_peels / total_students if total_students > 0 else 0
-        
-        # Insert or update master data with detailed breakdown
-        cursor.execute("""
-            INSERT INTO master_waste_data 
-            (date, hostel, total_students, 
-             breakfast_student_waste, breakfast_counter_waste, breakfast_vegetable_peels,
-             lunch_student_waste, lunch_counter_waste, lunch_vegetable_peels,
-             snacks_student_waste, snacks_counter_waste, snacks_vegetable_peels,
-             dinner_student_waste, dinner_counter_waste, dinner_vegetable_peels,
-             total_mess_waste, total_mess_waste_no_peels, per_capita_mess_waste, 
-             per_capita_mess_waste_no_peels, mess_dry_waste)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (date, hostel) 
-            DO UPDATE SET 
-                total_students = EXCLUDED.total_students,
-                total_mess_waste = EXCLUDED.total_mess_waste,
-                total_mess_waste_no_peels = EXCLUDED.total_mess_waste_no_peels,
-                per_capita_mess_waste = EXCLUDED.per_capita_mess_waste,
-                per_capita_mess_waste_no_peels = EXCLUDED.per_capita_mess_waste_no_peels,
-                breakfast_student_waste = EXCLUDED.breakfast_student_waste,
-                breakfast_counter_waste = EXCLUDED.breakfast_counter_waste,
-                breakfast_vegetable_peels = EXCLUDED.breakfast_vegetable_peels,
-                lunch_student_waste = EXCLUDED.lunch_student_waste,
-                lunch_counter_waste = EXCLUDED.lunch_counter_waste,
-                lunch_vegetable_peels = EXCLUDED.lunch_vegetable_peels,
-                snacks_student_waste = EXCLUDED.snacks_student_waste,
-                snacks_counter_waste = EXCLUDED.snacks_counter_waste,
-                snacks_vegetable_peels = EXCLUDED.snacks_vegetable_peels,
-                dinner_student_waste = EXCLUDED.dinner_student_waste,
-                dinner_counter_waste = EXCLUDED.dinner_counter_waste,
-                dinner_vegetable_peels = EXCLUDED.dinner_vegetable_peels,
-                mess_dry_waste = EXCLUDED.mess_dry_waste
-        """, (
-            data.get("submission_date"), data.get("hostel"),
-            total_students, 
-            data.get("breakfast_student_waste", 0), data.get("breakfast_counter_waste", 0), data.get("breakfast_vegetable_peels", 0),
-            data.get("lunch_student_waste", 0), data.get("lunch_counter_waste", 0), data.get("lunch_vegetable_peels", 0),
-            data.get("snacks_student_waste", 0), data.get("snacks_counter_waste", 0), data.get("snacks_vegetable_peels", 0),
-            data.get("dinner_student_waste", 0), data.get("dinner_counter_waste", 0), data.get("dinner_vegetable_peels", 0),
-            total_mess_waste, total_mess_waste_no_peels, per_capita_mess_waste, per_capita_mess_waste_no_peels,
-            data.get("mess_dry_waste", 0)
-        ))
-        
-        conn.commit()
+        with db_cursor() as cursor:
+            cursor.execute("DELETE FROM master_waste_data")
+            cursor.execute(f"""
+                WITH mess AS ({_mess_totals_sql("mess_waste_submissions WHERE status = 'verified'")}
+                ), hostel AS ({_hostel_totals_sql("hostel_waste_submissions WHERE status = 'verified'")}
+                )
+                INSERT INTO master_waste_data (
+                    date, hostel, {", ".join(mess_cols)},
+                    {", ".join(hostel_cols)}
+                )
+                SELECT
+                    COALESCE(m.date, h.date), COALESCE(m.hostel, h.hostel),
+                    {", ".join(f"COALESCE(m.{col}, 0)" for col in mess_cols)},
+                    {", ".join(f"COALESCE(h.{col}, 0)" for col in hostel_cols)}
+                FROM mess m
+                FULL JOIN hostel h ON m.date = h.date AND m.hostel = h.hostel
+            """)
+            rows = cursor.rowcount
+        clear_master_caches()
+        return rows
         
     except Exception as e:
-        st.error(f"Error adding to master file: {e}")
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+        st.error(f"Error rebuilding master data: {e}")
+        return None
 
-def add_to_master_file_hostel(data):
-    """Add verified hostel waste data to master file"""
-    conn = get_db_connection()
-    if not conn:
-        return
+# Dashboard functions
+def slice_dates(dataframe, start, end=None):
+    """Rows with start <= date (<= end).
+
+    Master frames arrive newest first (query_master_data orders by date DESC) and
+    row subsets keep that order, so the bounds are found by binary search and the
+    result is a positional slice rather than a boolean-masked copy.
+    """
+    dates = dataframe["date"]
+    if not dates.is_monotonic_decreasing:
+        mask = dates >= start if end is None else dates.between(start, end)
+        return dataframe[mask]
     
-    try:
-        cursor = conn.cursor()
-        
-        total_hostel_waste = (
-            data.get("dry_waste", 0) + data.get("wet_waste", 0) + 
-            data.get("e_waste", 0) + data.get("biomedical_waste", 0) + 
-            data.get("hazardous_waste", 0)
-        )
-        
-        # Insert or update master data
-        cursor.execute("""
-            INSERT INTO master_waste_data 
-            (date, hostel, total_hostel_waste, dry_waste, wet_waste, e_waste, 
-             biomedical_waste, hazardous_waste)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (date, hostel) 
-            DO UPDATE SET 
-                total_hostel_waste = EXCLUDED.total_hostel_waste,
-                dry_waste = EXCLUDED.dry_waste,
-                wet_waste = EXCLUDED.wet_waste,
-                e_waste = EXCLUDED.e_waste,
-                biomedical_waste = EXCLUDED.biomedical_waste,
-                hazardous_waste = EXCLUDED.hazardous_waste
-        """, (
-            data.get("submission_date"), data.get("hostel"),
-            total_hostel_waste, data.get("dry_waste", 0), data.get("wet_waste", 0),
-            data.get("e_waste", 0), data.get("biomedical_waste", 0), data.get("hazardous_waste", 0)
-        ))
-        
-        conn.commit()
-        
-    except Exception as e:
-        st.error(f"Error adding to master file: {e}")
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+    oldest_first = dates.values[::-1]
+    n = len(oldest_first)
+    first = 0 if end is None else n - np.searchsorted(oldest_first, np.datetime64(end), side="right")
+    last = n - np.searchsorted(oldest_first, np.datetime64(start), side="left")
+    return dataframe.iloc[first:last]
 
-# Dashboard functions
 def apply_period_filter(dataframe, period):
     if dataframe.empty or period == "all_time":
         return dataframe
@@ -1312,84 +1690,63 @@ def apply_period_filter(dataframe, period):
         else:
             return dataframe
         
-        return dataframe[dataframe["date"] >= start_date]
+        return slice_dates(dataframe, start_date)
     except Exception:
         return dataframe
 
+KPI_COLUMNS = ["total_mess_waste", "total_hostel_waste", "total_students", "total_mess_waste_no_peels"]
+
+def _kpis_from_sums(sums, suffix):
+    students = sums["total_students"]
+    return {
+        f"total_waste_{suffix}": sums["total_mess_waste"] + sums["total_hostel_waste"],
+        f"total_mess_waste_{suffix}": sums["total_mess_waste"],
+        f"per_capita_mess_waste_{suffix}": sums["total_mess_waste"] / students if students > 0 else 0,
+        f"per_capita_mess_waste_no_peels_{suffix}": sums["total_mess_waste_no_peels"] / students if students > 0 else 0,
+    }
+
 def calculate_kpis(dataframe, period_filter="all_time"):
-    if dataframe.empty:
-        return {
-            "total_waste_all_time": 0,
-            "total_mess_waste_all_time": 0,
-            "per_capita_mess_waste_all_time": 0,
-            "per_capita_mess_waste_no_peels_all_time": 0,
-            "total_waste_today": 0,
-            "total_mess_waste_today": 0,
-            "per_capita_mess_waste_today": 0,
-            "per_capita_mess_waste_no_peels_today": 0
-        }
-    
     try:
         filtered_df = apply_period_filter(dataframe, period_filter)
-        if filtered_df.empty:
-            return {
-                "total_waste_all_time": 0,
-                "total_mess_waste_all_time": 0,
-                "per_capita_mess_waste_all_time": 0,
-                "per_capita_mess_waste_no_peels_all_time": 0,
-                "total_waste_today": 0,
-                "total_mess_waste_today": 0,
-                "per_capita_mess_waste_today": 0,
-                "per_capita_mess_waste_no_peels_today": 0
-            }
+        # One column-wise reduction per slice; missing columns count as zero
+        period_sums = filtered_df.reindex(columns=KPI_COLUMNS, fill_value=0).sum()
         
         today = pd.to_datetime(datetime.now().date())
-        today_data = dataframe[dataframe["date"] == today] if 'date' in dataframe.columns else pd.DataFrame()
-        
-        # Calculate metrics
-        total_mess_waste_period = filtered_df["total_mess_waste"].sum() if "total_mess_waste" in filtered_df.columns else 0
-        total_hostel_waste_period = filtered_df["total_hostel_waste"].sum() if "total_hostel_waste" in filtered_df.columns else 0
-        total_waste_period = total_mess_waste_period + total_hostel_waste_period
-        
-        total_students = filtered_df["total_students"].sum() if "total_students" in filtered_df.columns else 0
-        per_capita_mess_waste_period = total_mess_waste_period / total_students if total_students > 0 else 0
+        today_data = slice_dates(dataframe, today, today) if 'date' in dataframe.columns else dataframe.iloc[0:0]
+        today_sums = today_data.reindex(columns=KPI_COLUMNS, fill_value=0).sum()
         
-        total_mess_waste_no_peels_period = filtered_df["total_mess_waste_no_peels"].sum() if "total_mess_waste_no_peels" in filtered_df.columns else 0
-        per_capita_mess_waste_no_peels_period = total_mess_waste_no_peels_period / total_students if total_students > 0 else 0
-        
-        # Today's metrics
-        total_mess_waste_today = today_data["total_mess_waste"].sum() if not today_data.empty and "total_mess_waste" in today_data.columns else 0
-        total_hostel_waste_today = today_data["total_hostel_waste"].sum() if not today_data.empty and "total_hostel_waste" in today_data.columns else 0
-        total_waste_today = total_mess_waste_today + total_hostel_waste_today
-        
-        students_today = today_data["total_students"].sum() if not today_data.empty and "total_students" in today_data.columns else 0
-        per_capita_mess_waste_today = total_mess_waste_today / students_today if students_today > 0 else 0
-        
-        total_mess_waste_no_peels_today = today_data["total_mess_waste_no_peels"].sum() if not today_data.empty and "total_mess_waste_no_peels" in today_data.columns else 0
-        per_capita_mess_waste_no_peels_today = total_mess_waste_no_peels_today / students_today if students_today > 0 else 0
-        
-        return {
-            "total_waste_all_time": total_waste_period,
-            "total_mess_waste_all_time": total_mess_waste_period,
-            "per_capita_mess_waste_all_time": per_capita_mess_waste_period,
-            "per_capita_mess_waste_no_peels_all_time": per_capita_mess_waste_no_peels_period,
-            "total_waste_today": total_waste_today,
-            "total_mess_waste_today": total_mess_waste_today,
-            "per_capita_mess_waste_today": per_capita_mess_waste_today,
-            "per_capita_mess_waste_no_peels_today": per_capita_mess_waste_no_peels_today
-        }
+        return {**_kpis_from_sums(period_sums, "all_time"), **_kpis_from_sums(today_sums, "today")}
     except Exception as e:
         st.error(f"Error calculating KPIs: {str(e)}")
-        return {
-            "total_waste_all_time": 0,
-            "total_mess_waste_all_time": 0,
-            "per_capita_mess_waste_all_time": 0,
-            "per_capita_mess_waste_no_peels_all_time": 0,
-            "total_waste_today": 0,
-            "total_mess_waste_today": 0,
-            "per_capita_mess_waste_today": 0,
-            "per_capita_mess_waste_no_peels_today": 0
-        }
+        zeros = dict.fromkeys(KPI_COLUMNS, 0)
+        return {**_kpis_from_sums(zeros, "all_time"), **_kpis_from_sums(zeros, "today")}
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def prep_chart_data(df, metric):
+    """Date-sorted rows with a value for `metric`; pass only the plotted columns to keep hashing cheap"""
+    # float32 is ample for plotting and halves the cached/serialised chart frame
+    return df[df[metric].notna()].astype({metric: "float32"}).sort_values('date')
+
+SUMMARY_COLUMNS = ["date", "total_mess_waste", "total_hostel_waste", "total_students"]
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def summarize_dashboard(df):
+    """Summary statistics for the dashboard; callers pass only SUMMARY_COLUMNS to keep hashing cheap"""
+    summary = {"records": len(df)}
+    targets = {key: col for key, col in (("mess", "total_mess_waste"), ("hostel", "total_hostel_waste")) if col in df.columns}
+    agg_spec = {col: ["mean", "max", "min"] for col in targets.values()}
+    if "total_mess_waste" in df.columns and "total_students" in df.columns:
+        agg_spec["total_students"] = ["sum"]
+    if agg_spec:
+        # One agg call covers every statistic; cells an aggregation was not asked for are NaN
+        stats = df.agg(agg_spec)
+        for key, col in targets.items():
+            summary[key] = {name: float(stats.at[name, col]) for name in ("mean", "max", "min")}
+        if "total_students" in agg_spec:
+            summary["students"] = int(stats.at["sum", "total_students"])
+    if "date" in df.columns and not df.empty:
+        summary["date_range"] = (df["date"].min().strftime('%Y-%m-%d'), df["date"].max().strftime('%Y-%m-%d'))
+    return summary
 
 def show_dashboard_content(df, title_prefix=""):
     """Show dashboard content with KPIs and charts"""
@@ -1510,13 +1867,9 @@ def show_dashboard_content(df, title_prefix=""):
                     key=f"{title_prefix}_chart_type"
                 )
             
-            # Ensure data is sorted by date before plotting
-            chart_df = filtered_df.copy()
-            chart_df = chart_df.sort_values('date')
-            
             # Create charts based on selected metric
-            if chart_type == "Mess Waste" and "total_mess_waste" in chart_df.columns:
-                chart_data = chart_df.dropna(subset=['total_mess_waste'])
+            if chart_type == "Mess Waste" and "total_mess_waste" in filtered_df.columns:
+                chart_data = prep_chart_data(filtered_df[['date', 'hostel', 'total_mess_waste']], 'total_mess_waste')
                 
                 if not chart_data.empty:
                     fig_line = px.line(
@@ -1537,8 +1890,8 @@ def show_dashboard_content(df, title_prefix=""):
                 else:
                     st.info("No mess waste data available for the selected filters.")
                     
-            elif chart_type == "Hostel Waste" and "total_hostel_waste" in chart_df.columns:
-                chart_data = chart_df.dropna(subset=['total_hostel_waste'])
+            elif chart_type == "Hostel Waste" and "total_hostel_waste" in filtered_df.columns:
+                chart_data = prep_chart_data(filtered_df[['date', 'hostel', 'total_hostel_waste']], 'total_hostel_waste')
                 
                 if not chart_data.empty:
                     fig_line = px.line(
@@ -1559,8 +1912,8 @@ def show_dashboard_content(df, title_prefix=""):
                 else:
                     st.info("No hostel waste data available for the selected filters.")
                     
-            elif chart_type == "Per Capita Mess Waste" and "per_capita_mess_waste" in chart_df.columns:
-                chart_data = chart_df.dropna(subset=['per_capita_mess_waste'])
+            elif chart_type == "Per Capita Mess Waste" and "per_capita_mess_waste" in filtered_df.columns:
+                chart_data = prep_chart_data(filtered_df[['date', 'hostel', 'per_capita_mess_waste']], 'per_capita_mess_waste')
                 
                 if not chart_data.empty:
                     fig_line = px.line(
@@ -1589,14 +1942,16 @@ def show_dashboard_content(df, title_prefix=""):
             with col1:
                 # UPDATED: Donut chart for mess waste categories (student waste, counter waste, vegetable peels)
                 if "total_mess_waste" in filtered_df.columns:
-                    # Calculate totals for mess waste categories from FILTERED data
-                    student_waste_cols = ['breakfast_student_waste', 'lunch_student_waste', 'snacks_student_waste', 'dinner_student_waste']
-                    counter_waste_cols = ['breakfast_counter_waste', 'lunch_counter_waste', 'snacks_counter_waste', 'dinner_counter_waste']
-                    vegetable_peels_cols = ['breakfast_veg_peels', 'lunch_veg_peels', 'snacks_vegetable_peels', 'dinner_vegetable_peels']
-                    
-                    total_students_waste = sum(filtered_df[col].sum() for col in student_waste_cols if col in filtered_df.columns)
-                    total_counter_waste = sum(filtered_df[col].sum() for col in counter_waste_cols if col in filtered_df.columns)
-                    total_vegetable_peels = sum(filtered_df[col].sum() for col in vegetable_peels_cols if col in filtered_df.columns)
+                    # Calculate totals for mess waste categories from FILTERED data in one
+                    # reduction: columns are meal-major, so fold the meals into (student, counter, peels)
+                    category_totals = (
+                        filtered_df.reindex(columns=MEAL_WASTE_COLUMNS, fill_value=0.0)
+                        .to_numpy(dtype=np.float64, na_value=0.0)
+                        .sum(axis=0)
+                        .reshape(len(MEALS), -1)
+                        .sum(axis=0)
+                    )
+                    total_students_waste, total_counter_waste, total_vegetable_peels = category_totals
                     
                     if total_students_waste > 0 or total_counter_waste > 0 or total_vegetable_peels > 0:
                         mess_category_data = pd.DataFrame({
@@ -1628,25 +1983,28 @@ def show_dashboard_content(df, title_prefix=""):
                 st.markdown("### 📊 Summary Statistics")
                 st.markdown(f"**Filter Applied:** {selected_hostel} | {selected_period}")
                 
-                if "total_mess_waste" in filtered_df.columns:
+                summary = summarize_dashboard(filtered_df[[col for col in SUMMARY_COLUMNS if col in filtered_df.columns]])
+                
+                if "mess" in summary:
+                    mess = summary["mess"]
                     st.write(f"**Mess Waste Statistics:**")
-                    st.write(f"- Average Daily: {filtered_df['total_mess_waste'].mean():.2f} kg")
-                    st.write(f"- Maximum Daily: {filtered_df['total_mess_waste'].max():.2f} kg")
-                    st.write(f"- Minimum Daily: {filtered_df['total_mess_waste'].min():.2f} kg")
-                    st.write(f"- Total Records: {len(filtered_df)}")
-                    if 'total_students' in filtered_df.columns:
-                        st.write(f"- Total Students Served: {filtered_df['total_students'].sum():,}")
+                    st.write(f"- Average Daily: {mess['mean']:.2f} kg")
+                    st.write(f"- Maximum Daily: {mess['max']:.2f} kg")
+                    st.write(f"- Minimum Daily: {mess['min']:.2f} kg")
+                    st.write(f"- Total Records: {summary['records']}")
+                    if "students" in summary:
+                        st.write(f"- Total Students Served: {summary['students']:,}")
                 
-                if "total_hostel_waste" in filtered_df.columns:
+                if "hostel" in summary:
+                    hostel = summary["hostel"]
                     st.write(f"**Hostel Waste Statistics:**")
-                    st.write(f"- Average Daily: {filtered_df['total_hostel_waste'].mean():.2f} kg")
-                    st.write(f"- Maximum Daily: {filtered_df['total_hostel_waste'].max():.2f} kg")
-                    st.write(f"- Minimum Daily: {filtered_df['total_hostel_waste'].min():.2f} kg")
+                    st.write(f"- Average Daily: {hostel['mean']:.2f} kg")
+                    st.write(f"- Maximum Daily: {hostel['max']:.2f} kg")
+                    st.write(f"- Minimum Daily: {hostel['min']:.2f} kg")
                 
                 # Show date range of filtered data
-                if 'date' in filtered_df.columns and not filtered_df.empty:
-                    date_range_start = filtered_df['date'].min().strftime('%Y-%m-%d')
-                    date_range_end = filtered_df['date'].max().strftime('%Y-%m-%d')
+                if "date_range" in summary:
+                    date_range_start, date_range_end = summary["date_range"]
                     st.write(f"**Date Range:** {date_range_start} to {date_range_end}")
         else:
             st.warning("No data available for charts with the selected filters.")
@@ -1658,40 +2016,90 @@ def show_dashboard_content(df, title_prefix=""):
 # -----------------------------------------------------------------------------
 # SUPABASE STORAGE
 # -----------------------------------------------------------------------------
+BUCKET_LIST_PAGE_SIZE = 100
+
+@st.cache_data(ttl=60, show_spinner=False)
+def list_bucket_files(bucket_name):
+    """Every file entry in the bucket, paged (storage.list returns at most one page); raises on failure"""
+    storage = get_supabase_client().storage.from_(bucket_name)
+    files = []
+    while True:
+        page = storage.list(None, {
+            "limit": BUCKET_LIST_PAGE_SIZE,
+            "offset": len(files),
+            "sortBy": {"column": "name", "order": "asc"}
+        })
+        if hasattr(page, 'error') and page.error:
+            raise RuntimeError(f"Error accessing bucket: {page.error}")
+        files.extend(page)
+        if len(page) < BUCKET_LIST_PAGE_SIZE:
+            return [file for file in files if isinstance(file, dict)]
+
+RECENT_FILES_SHOWN = 5
+
+@st.cache_data(ttl=60, show_spinner=False)
+def summarize_bucket(bucket_name):
+    """(total bytes, file count, most recent files) in one pass over the listing; raises so failures are not cached"""
+    total_size = 0
+    entries = []
+    for file in list_bucket_files(bucket_name):
+        size = (file.get('metadata') or {}).get('size', 0) or 0
+        total_size += size
+        entries.append({
+            'name': file.get('name', ''),
+            'size': size,
+            'created': file.get('created_at') or ''
+        })
+    # Only the newest few are shown, so a bounded heap beats sorting the whole bucket
+    recent_files = heapq.nlargest(RECENT_FILES_SHOWN, entries, key=lambda x: x['created'])
+    return total_size, len(entries), recent_files
+
 def get_supabase_storage_usage(bucket_name):
-    """Get storage usage from Supabase bucket"""
+    """Get storage usage from Supabase bucket as (total bytes, file count, recent files)"""
     try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return 0, []
-        
-        # List all files in bucket
-        files = supabase.storage.from_(bucket_name).list()
-        
-        if hasattr(files, 'error') and files.error:
-            st.error(f"Error accessing bucket: {files.error}")
-            return 0, []
-        
-        total_size = 0
-        file_list = []
-        
-        for file in files:
-            if isinstance(file, dict):
-                size = file.get('metadata', {}).get('size', 0) or 0
-                total_size += size
-                file_list.append({
-                    'name': file.get('name', ''),
-                    'size': size,
-                    'created': file.get('created_at', ''),
-                    'updated': file.get('updated_at', '')
-                })
-        
-        return total_size, file_list
+        if not get_supabase_client():
+            return 0, 0, []
+        return summarize_bucket(bucket_name)
         
     except Exception as e:
         st.error(f"Error getting storage usage: {e}")
-        return 0, []
+        return 0, 0, []
     
+IMAGE_DOWNLOAD_WORKERS = 16
+ZIP_SPOOL_MAX_BYTES = 64 * 1024 * 1024
+
+COMPRESSED_IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.webp', '.gif'}
+
+def _zip_compression(file_name):
+    ext = os.path.splitext(file_name)[1].lower()
+    return zipfile.ZIP_STORED if ext in COMPRESSED_IMAGE_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+DOWNLOAD_SPOOL_MAX_BYTES = 1024 * 1024
+
+def _download_public_file(storage, file_name):
+    """Stream one stored file into a spooled temp file so each worker holds at most ~1 MB; None if unavailable"""
+    spool = None
+    try:
+        with get_http_session().get(storage.get_public_url(file_name), timeout=30, stream=True) as response:
+            if response.status_code != 200:
+                return file_name, None
+            spool = tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_MAX_BYTES, mode='w+b')
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_BYTES):
+                spool.write(chunk)
+    except requests.RequestException:
+        # A timeout or dropped connection skips this file like a missing one,
+        # instead of discarding the whole archive
+        if spool is not None:
+            spool.close()
+        return file_name, None
+    except Exception:
+        if spool is not None:
+            spool.close()
+        raise
+    spool.seek(0)
+    return file_name, spool
+
 def download_supabase_images(bucket_name):
     """Download all images from Supabase bucket as ZIP"""
     try:
@@ -1699,35 +2107,31 @@ def download_supabase_images(bucket_name):
         if not supabase:
             return None
         
-        import zipfile
-        import io
-        import requests
-        
-        # Create ZIP file in memory
-        zip_buffer = io.BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            # Get all files in bucket
-            files = supabase.storage.from_(bucket_name).list()
-            
-            if hasattr(files, 'error') and files.error:
-                st.error(f"Error accessing bucket: {files.error}")
-                return None
+        storage = supabase.storage.from_(bucket_name)
+        file_names = [f['name'] for f in list_bucket_files(bucket_name) if f.get('name')]
+        
+        # Build the ZIP in a spooled file: small archives stay in memory, large bucket
+        # exports spill to disk instead of growing the heap. Images are already
+        # compressed, so they are stored as-is; anything else is deflated
+        with tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_MAX_BYTES, mode='w+b') as zip_buffer:
+            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                if file_names:
+                    # Downloads are network-bound, so fetch them concurrently;
+                    # ZipFile is not thread-safe, so writes stay on this thread
+                    with ThreadPoolExecutor(max_workers=min(IMAGE_DOWNLOAD_WORKERS, len(file_names))) as executor:
+                        futures = [executor.submit(_download_public_file, storage, name) for name in file_names]
+                        for future in as_completed(futures):
+                            file_name, spool = future.result()
+                            if spool is None:
+                                continue
+                            entry_info = zipfile.ZipInfo(file_name, date_time=time.localtime()[:6])
+                            entry_info.compress_type = _zip_compression(file_name)
+                            with spool, zip_file.open(entry_info, 'w', force_zip64=True) as entry:
+                                shutil.copyfileobj(spool, entry, DOWNLOAD_CHUNK_BYTES)
             
-            for file in files:
-                if isinstance(file, dict):
-                    file_name = file.get('name', '')
-                    if file_name:
-                        # Get public URL
-                        public_url = supabase.storage.from_(bucket_name).get_public_url(file_name)
-                        
-                        # Download file content
-                        response = requests.get(public_url)
-                        if response.status_code == 200:
-                            zip_file.writestr(file_name, response.content)
-        
-        zip_buffer.seek(0)
-        return zip_buffer.getvalue()
+            # st.download_button needs the payload as bytes
+            zip_buffer.seek(0)
+            return zip_buffer.read()
         
     except Exception as e:
         st.error(f"Error creating ZIP file: {e}")
@@ -1742,22 +2146,26 @@ def delete_supabase_images(bucket_name, file_names=None):
         
         if file_names is None:
             # Delete all files
-            files = supabase.storage.from_(bucket_name).list()
-            if hasattr(files, 'error') and files.error:
-                st.error(f"Error accessing bucket: {files.error}")
-                return False
-            
-            file_names = [file.get('name', '') for file in files if isinstance(file, dict) and file.get('name')]
+            file_names = [file['name'] for file in list_bucket_files(bucket_name) if file.get('name')]
         
         if not file_names:
             st.info("No files to delete")
             return True
         
-        # Delete files
-        result = supabase.storage.from_(bucket_name).remove(file_names)
-        
-        if hasattr(result, 'error') and result.error:
-            st.error(f"Error deleting files: {result.error}")
+        # Delete in bounded batches so one request never carries the whole bucket;
+        # the batches are independent round-trips, so send them concurrently
+        storage = supabase.storage.from_(bucket_name)
+        batches = [file_names[i:i + BUCKET_LIST_PAGE_SIZE] for i in range(0, len(file_names), BUCKET_LIST_PAGE_SIZE)]
+        try:
+            with ThreadPoolExecutor(max_workers=min(IMAGE_DOWNLOAD_WORKERS, len(batches))) as executor:
+                results = list(executor.map(storage.remove, batches))
+        finally:
+            list_bucket_files.clear()
+            summarize_bucket.clear()
+        
+        errors = [result.error for result in results if hasattr(result, 'error') and result.error]
+        if errors:
+            st.error(f"Error deleting files: {errors[0]}")
             return False
         
         return True
@@ -1780,20 +2188,12 @@ def show_login_form():
             username = st.text_input("Username")
             password = st.text_input("Password", type="password")
             if st.form_submit_button("Login", use_container_width=True):
-                conn = get_db_connection()
-                if not conn:
-                    st.error("Cannot connect to DB.")
-                    return
-                cur = conn.cursor()
-                cur.execute("SELECT username, name, password_hash, role FROM users WHERE username=%s", (username,))
-                user = cur.fetchone()
-                cur.close()
-                conn.close()
-                if user and bcrypt.checkpw(password.encode('utf-8'), user[2].encode('utf-8')):
+                if verify_password(username, password):
+                    name, role, _ = get_user_record(username)
                     st.session_state["authentication_status"] = True
-                    st.session_state["username"] = user[0]
-                    st.session_state["name"] = user[1]
-                    st.session_state["role"] = user[3]
+                    st.session_state["username"] = username
+                    st.session_state["name"] = name
+                    st.session_state["role"] = role
                     st.success("Login successful!")
                     st.rerun()
                 else:
@@ -1802,6 +2202,28 @@ def show_login_form():
 # -----------------------------------------------------------------------------
 # 🗑️ WASTE COLLECTOR FORM - UPDATED: Auto-hostel selection and image clearing
 # -----------------------------------------------------------------------------
+# Widget keys of the supervisor forms; Streamlit keeps their values across reruns
+MESS_FORM_KEYS = [
+    "mess_submission_date",
+    *[f"{meal}_{field}" for meal in MEALS for field, *_ in MEAL_INPUT_FIELDS],
+    "mess_dry_waste",
+    "mess_remarks"
+]
+HOSTEL_FORM_KEYS = [
+    "waste_submission_date", "waste_dry_waste", "waste_wet_waste", "waste_e_waste",
+    "waste_biomedical_waste", "waste_hazardous_waste", "waste_remarks"
+]
+
+TABLE_PAGE_SIZE = 200
+
+def dataframe_page(df, key, page_size=TABLE_PAGE_SIZE):
+    """Slice of `df` for the page picked under the table; short frames are returned whole"""
+    if len(df) <= page_size:
+        return df
+    pages = -(-len(df) // page_size)
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1, key=key)
+    return df.iloc[(page - 1) * page_size:page * page_size]
+
 def show_pho_supervisor_form(username: str):
     
     # UPDATED: Get hostel from username
@@ -1815,187 +2237,30 @@ def show_pho_supervisor_form(username: str):
     with tab1:
         st.subheader("📝 Daily Mess Waste Submission (All 4 Meals)")
         
-        # Auto-save indicator
-        if st.session_state.get('mess_form_data'):
-            st.info("💾 Form data auto-saved")
-        
-        # Load saved form data
-        saved_data = load_form_data('mess_form_data', {
-            'submission_date': date.today(),
-            'hostel': user_hostel if user_hostel else '2',
-            'breakfast_students': 0,
-            'breakfast_student_waste': 0.0,
-            'breakfast_counter_waste': 0.0,
-            'breakfast_vegetable_peels': 0.0,
-            'lunch_students': 0,
-            'lunch_student_waste': 0.0,
-            'lunch_counter_waste': 0.0,
-            'lunch_vegetable_peels': 0.0,
-            'snacks_students': 0,
-            'snacks_student_waste': 0.0,
-            'snacks_counter_waste': 0.0,
-            'snacks_vegetable_peels': 0.0,
-            'dinner_students': 0,
-            'dinner_student_waste': 0.0,
-            'dinner_counter_waste': 0.0,
-            'dinner_vegetable_peels': 0.0,
-            'mess_dry_waste': 0.0,
-            'remarks': ''
-        })
-        
         col1, col2 = st.columns(2)
         with col1:
             submission_date = st.date_input(
                 "📅 Submission Date",
-                value=saved_data.get('submission_date', date.today()),
+                value=date.today(),
                 key="mess_submission_date"
             )
         
         st.markdown("---")
         
-        # Breakfast Section
-        st.markdown("### 🌅 Breakfast")
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            breakfast_students = st.number_input(
-                "👥 Students Count",
-                min_value=0,
-                step=1,
-                value=saved_data.get('breakfast_students', 0),
-                key="breakfast_students"
-            )
-        with col2:
-            breakfast_student_waste = st.number_input(
-                "🍽️ Students' Waste (kg)",
-                min_value=0.0,
-                step=0.1,
-                value=saved_data.get('breakfast_student_waste', 0.0),
-                key="breakfast_student_waste"
-            )
-        with col3:
-            breakfast_counter_waste = st.number_input(
-                "🍲 Counter Waste (kg)",
-                min_value=0.0,
-                step=0.1,
-                value=saved_data.get('breakfast_counter_waste', 0.0),
-                key="breakfast_counter_waste"
-            )
-        with col4:
-            breakfast_vegetable_peels = st.number_input(
-                "🥬 Vegetable Peels (kg)",
-                min_value=0.0,
-                step=0.1,
-                value=saved_data.get('breakfast_vegetable_peels', 0.0),
-                key="breakfast_vegetable_peels"
-            )
-        
-        # Lunch Section
-        st.markdown("### 🌞 Lunch")
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            lunch_students = st.number_input(
-                "👥 Students Count",
-                min_value=0,
-                step=1,
-                value=saved_data.get('lunch_students', 0),
-                key="lunch_students"
-            )
-        with col2:
-            lunch_student_waste = st.number_input(
-                "🍽️ Students' Waste (kg)",
-                min_value=0.0,
-                step=0.1,
-                value=saved_data.get('lunch_student_waste', 0.0),
-                key="lunch_student_waste"
-            )
-        with col3:
-            lunch_counter_waste = st.number_input(
-                "🍲 Counter Waste (kg)",
-                min_value=0.0,
-                step=0.1,
-                value=saved_data.get('lunch_counter_waste', 0.0),
-                key="lunch_counter_waste"
-            )
-        with col4:
-            lunch_vegetable_peels = st.number_input(
-                "🥬 Vegetable Peels (kg)",
-                min_value=0.0,
-                step=0.1,
-                value=saved_data.get('lunch_vegetable_peels', 0.0),
-                key="lunch_vegetable_peels"
-            )
-        
-        # Snacks Section
-        st.markdown("### 🍪 Snacks")
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            snacks_students = st.number_input(
-                "👥 Students Count",
-                min_value=0,
-                step=1,
-                value=saved_data.get('snacks_students', 0),
-                key="snacks_students"
-            )
-        with col2:
-            snacks_student_waste = st.number_input(
-                "🍽️ Students' Waste (kg)",
-                min_value=0.0,
-                step=0.1,
-                value=saved_data.get('snacks_student_waste', 0.0),
-                key="snacks_student_waste"
-            )
-        with col3:
-            snacks_counter_waste = st.number_input(
-                "🍲 Counter Waste (kg)",
-                min_value=0.0,
-                step=0.1,
-                value=saved_data.get('snacks_counter_waste', 0.0),
-                key="snacks_counter_waste"
-            )
-        with col4:
-            snacks_vegetable_peels = st.number_input(
-                "🥬 Vegetable Peels (kg)",
-                min_value=0.0,
-                step=0.1,
-                value=saved_data.get('snacks_vegetable_peels', 0.0),
-                key="snacks_vegetable_peels"
-            )
-        
-        # Dinner Section
-        st.markdown("### 🌙 Dinner")
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            dinner_students = st.number_input(
-                "👥 Students Count",
-                min_value=0,
-                step=1,
-                value=saved_data.get('dinner_students', 0),
-                key="dinner_students"
-            )
-        with col2:
-            dinner_student_waste = st.number_input(
-                "🍽️ Students' Waste (kg)",
-                min_value=0.0,
-                step=0.1,
-                value=saved_data.get('dinner_student_waste', 0.0),
-                key="dinner_student_waste"
-            )
-        with col3:
-            dinner_counter_waste = st.number_input(
-                "🍲 Counter Waste (kg)",
-                min_value=0.0,
-                step=0.1,
-                value=saved_data.get('dinner_counter_waste', 0.0),
-                key="dinner_counter_waste"
-            )
-        with col4:
-            dinner_vegetable_peels = st.number_input(
-                "🥬 Vegetable Peels (kg)",
-                min_value=0.0,
-                step=0.1,
-                value=saved_data.get('dinner_vegetable_peels', 0.0),
-                key="dinner_vegetable_peels"
-            )
+        # One row of inputs per meal; keys match the submission columns
+        meal_values = {}
+        for meal in MEALS:
+            st.markdown(f"### {MEAL_LABELS[meal]}")
+            for col, (field, label, min_value, step) in zip(st.columns(len(MEAL_INPUT_FIELDS)), MEAL_INPUT_FIELDS):
+                key = f"{meal}_{field}"
+                with col:
+                    meal_values[key] = st.number_input(
+                        label,
+                        min_value=min_value,
+                        step=step,
+                        value=min_value,
+                        key=key
+                    )
         
         # NEW: Mess Dry Waste Section
         st.markdown("### 🗑️ Additional Mess Waste")
@@ -2005,7 +2270,7 @@ def show_pho_supervisor_form(username: str):
                 "🗑️ Mess Dry Waste (kg)",
                 min_value=0.0,
                 step=0.1,
-                value=saved_data.get('mess_dry_waste', 0.0),
+                value=0.0,
                 key="mess_dry_waste",
                 help="Additional dry waste generated in mess operations"
             )
@@ -2028,40 +2293,13 @@ def show_pho_supervisor_form(username: str):
             cols = st.columns(min(len(uploaded_files), 3))  # Show max 3 images per row
             for idx, uploaded_file in enumerate(uploaded_files):
                 with cols[idx % 3]:
-                    st.image(uploaded_file, caption=uploaded_file.name, width=200)
+                    st.image(image_preview(uploaded_file), caption=uploaded_file.name, width=200)
                     st.write(f"Size: {uploaded_file.size} bytes")
         
-        # Auto-save form data (UPDATED: Include mess dry waste)
-        current_form_data = {
-            'submission_date': submission_date,
-            'hostel': user_hostel,
-            'breakfast_students': breakfast_students,
-            'breakfast_student_waste': breakfast_student_waste,
-            'breakfast_counter_waste': breakfast_counter_waste,
-            'breakfast_vegetable_peels': breakfast_vegetable_peels,
-            'lunch_students': lunch_students,
-            'lunch_student_waste': lunch_student_waste,
-            'lunch_counter_waste': lunch_counter_waste,
-            'lunch_vegetable_peels': lunch_vegetable_peels,
-            'snacks_students': snacks_students,
-            'snacks_student_waste': snacks_student_waste,
-            'snacks_counter_waste': snacks_counter_waste,
-            'snacks_vegetable_peels': snacks_vegetable_peels,
-            'dinner_students': dinner_students,
-            'dinner_student_waste': dinner_student_waste,
-            'dinner_counter_waste': dinner_counter_waste,
-            'dinner_vegetable_peels': dinner_vegetable_peels,
-            'mess_dry_waste': mess_dry_waste
-        }
-        save_form_data('mess_form_data', current_form_data)
-        
         # Real-time calculations (UPDATED: Include mess dry waste)
-        total_students = breakfast_students + lunch_students + snacks_students + dinner_students
-        total_mess_waste = (breakfast_student_waste + breakfast_counter_waste + breakfast_vegetable_peels +
-                           lunch_student_waste + lunch_counter_waste + lunch_vegetable_peels +
-                           snacks_student_waste + snacks_counter_waste + snacks_vegetable_peels +
-                           dinner_student_waste + dinner_counter_waste + dinner_vegetable_peels +
-                           mess_dry_waste)
+        total_students = sum(meal_values[f"{meal}_students"] for meal in MEALS)
+        # fsum rounds once, so 0.1 kg steps add up without float artefacts
+        total_mess_waste = math.fsum([*(meal_values[col] for col in MEAL_WASTE_COLUMNS), mess_dry_waste])
         
         # Display metrics (UPDATED: Include mess dry waste)
         st.markdown("---")
@@ -2075,7 +2313,7 @@ def show_pho_supervisor_form(username: str):
         
         remarks = st.text_area(
             "📝 Remarks (optional)",
-            value=saved_data.get('remarks', ''),
+            value='',
             placeholder="Any additional notes about today's mess waste...",
             key="mess_remarks"
         )
@@ -2086,25 +2324,8 @@ def show_pho_supervisor_form(username: str):
                 "submission_date": submission_date.strftime("%Y-%m-%d"),
                 "hostel": user_hostel,
                 "collection_time": datetime.now().strftime("%H:%M:%S"),
-                "breakfast_students": breakfast_students,
-                "breakfast_student_waste": breakfast_student_waste,
-                "breakfast_counter_waste": breakfast_counter_waste,
-                "breakfast_vegetable_peels": breakfast_vegetable_peels,
-                "lunch_students": lunch_students,
-                "lunch_student_waste": lunch_student_waste,
-                "lunch_counter_waste": lunch_counter_waste,
-                "lunch_vegetable_peels": lunch_vegetable_peels,
-                "snacks_students": snacks_students,
-                "snacks_student_waste": snacks_student_waste,
-                "snacks_counter_waste": snacks_counter_waste,
-                "snacks_vegetable_peels": snacks_vegetable_peels,
-                "dinner_students": dinner_students,
-                "dinner_student_waste": dinner_student_waste,
-                "dinner_counter_waste": dinner_counter_waste,
-                "dinner_vegetable_peels": dinner_vegetable_peels,
+                **meal_values,
                 "mess_dry_waste": mess_dry_waste,
-                "total_students": total_students,
-                "total_mess_waste": total_mess_waste,
                 "remarks": remarks
             }
             
@@ -2112,7 +2333,7 @@ def show_pho_supervisor_form(username: str):
                 st.success("✅ Mess waste data submitted successfully!")
                 if uploaded_files:
                     st.success(f"📸 {len(uploaded_files)} images uploaded successfully!")
-                clear_form_data('mess_form_data')  # Clear saved form data
+                clear_form_data(MESS_FORM_KEYS)  # Reset the form for the next entry
                 time.sleep(2)
                 st.rerun()
             else:
@@ -2121,27 +2342,11 @@ def show_pho_supervisor_form(username: str):
     with tab2:
         st.subheader("📝 Hostel Waste Collection")
         
-        # Auto-save indicator
-        if st.session_state.get('waste_form_data'):
-            st.info("💾 Form data auto-saved")
-        
-        # Load saved form data
-        saved_data = load_form_data('waste_form_data', {
-            'submission_date': date.today(),
-            'hostel': user_hostel if user_hostel else '2',
-            'dry_waste': 0.0,
-            'wet_waste': 0.0,
-            'e_waste': 0.0,
-            'biomedical_waste': 0.0,
-            'hazardous_waste': 0.0,
-            'remarks': ''
-        })
-        
         col1, col2 = st.columns(2)
         with col1:
             submission_date = st.date_input(
                 "📅 Collection Date",
-                value=saved_data.get('submission_date', date.today()),
+                value=date.today(),
                 key="waste_submission_date"
             )
             
@@ -2149,14 +2354,14 @@ def show_pho_supervisor_form(username: str):
                 "🗑️ Dry Waste (kg)",
                 min_value=0.0,
                 step=0.1,
-                value=saved_data.get('dry_waste', 0.0),
+                value=0.0,
                 key="waste_dry_waste"
             )
             wet_waste = st.number_input(
                 "💧 Wet Waste (kg)",
                 min_value=0.0,
                 step=0.1,
-                value=saved_data.get('wet_waste', 0.0),
+                value=0.0,
                 key="waste_wet_waste"
             )
         
@@ -2165,14 +2370,14 @@ def show_pho_supervisor_form(username: str):
                 "⚡ E-Waste (kg)",
                 min_value=0.0,
                 step=0.1,
-                value=saved_data.get('e_waste', 0.0),
+                value=0.0,
                 key="waste_e_waste"
             )
             biomedical_waste = st.number_input(
                 "🏥 Biomedical Waste (kg)",
                 min_value=0.0,
                 step=0.1,
-                value=saved_data.get('biomedical_waste', 0.0),
+                value=0.0,
                 key="waste_biomedical_waste"
             )
         
@@ -2180,7 +2385,7 @@ def show_pho_supervisor_form(username: str):
                 "☢️ Hazardous Waste (kg)",
                 min_value=0.0,
                 step=0.1,
-                value=saved_data.get('hazardous_waste', 0.0),
+                value=0.0,
                 key="waste_hazardous_waste"
             )
         
@@ -2202,23 +2407,11 @@ def show_pho_supervisor_form(username: str):
             cols = st.columns(min(len(hostel_uploaded_files), 3))
             for idx, uploaded_file in enumerate(hostel_uploaded_files):
                 with cols[idx % 3]:
-                    st.image(uploaded_file, caption=uploaded_file.name, width=200)
+                    st.image(image_preview(uploaded_file), caption=uploaded_file.name, width=200)
                     st.write(f"Size: {uploaded_file.size} bytes")
         
-        # Auto-save form data
-        current_form_data = {
-            'submission_date': submission_date,
-            'hostel': user_hostel,
-            'dry_waste': dry_waste,
-            'wet_waste': wet_waste,
-            'e_waste': e_waste,
-            'biomedical_waste': biomedical_waste,
-            'hazardous_waste': hazardous_waste
-        }
-        save_form_data('waste_form_data', current_form_data)
-        
         # Real-time calculations
-        total_waste = dry_waste + wet_waste + e_waste + biomedical_waste + hazardous_waste
+        total_waste = math.fsum([dry_waste, wet_waste, e_waste, biomedical_waste, hazardous_waste])
         
         # Display total
         st.markdown("---")
@@ -2226,7 +2419,7 @@ def show_pho_supervisor_form(username: str):
         
         remarks = st.text_area(
             "📝 Remarks (optional)",
-            value=saved_data.get('remarks', ''),
+            value='',
             placeholder="Any additional notes about hostel waste collection...",
             key="waste_remarks"
         )
@@ -2249,7 +2442,7 @@ def show_pho_supervisor_form(username: str):
                 st.success("✅ Hostel waste data submitted successfully!")
                 if hostel_uploaded_files:
                     st.success(f"📸 {len(hostel_uploaded_files)} images uploaded successfully!")
-                clear_form_data('waste_form_data')  # Clear saved form data
+                clear_form_data(HOSTEL_FORM_KEYS)  # Reset the form for the next entry
                 time.sleep(2)
                 st.rerun()
             else:
@@ -2260,241 +2453,183 @@ def show_pho_supervisor_form(username: str):
         st.subheader("📋 My Submissions")
         
         # Load collector's data from database
-        conn = get_db_connection()
-        if conn:
-            try:
-                cursor = conn.cursor(cursor_factory=RealDictCursor)
-                
-                # Get verified submissions
-                cursor.execute("""
-                    SELECT 'mess_waste' as type, submission_date as date, hostel, total_mess_waste as total_waste, status, verified_at
-                    FROM mess_waste_submissions 
-                    WHERE submitted_by = %s AND status = 'verified'
-                    UNION ALL
-                    SELECT 'hostel_waste' as type, submission_date as date, hostel, (dry_waste + wet_waste + e_waste + biomedical_waste + hazardous_waste) as total_waste, status, verified_at
-                    FROM hostel_waste_submissions 
-                    WHERE submitted_by = %s AND status = 'verified'
-                    ORDER BY date DESC
-                """, (username, username))
-                verified_data = cursor.fetchall()
-                
-                # Get pending submissions
-                cursor.execute("""
-                    SELECT 'mess_waste' as type, submission_date as date, hostel, total_mess_waste as total_waste, status, submitted_at
-                    FROM mess_waste_submissions 
-                    WHERE submitted_by = %s AND status = 'pending'
-                    UNION ALL
-                    SELECT 'hostel_waste' as type, submission_date as date, hostel, (dry_waste + wet_waste + e_waste + biomedical_waste + hazardous_waste) as total_waste, status, submitted_at
-                    FROM hostel_waste_submissions 
-                    WHERE submitted_by = %s AND status = 'pending'
-                    ORDER BY date DESC
-                """, (username, username))
-                pending_data = cursor.fetchall()
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown("### ✅ Verified Submissions")
-                    if verified_data:
-                        verified_df = pd.DataFrame([dict(row) for row in verified_data])
-                        st.dataframe(verified_df, use_container_width=True)
-                        
-                        # Download verified data
-                        csv = verified_df.to_csv(index=False)
-                        st.download_button(
-                            label="📥 Download Verified Data",
-                            data=csv,
-                            file_name=f"verified_data_{username}_{datetime.now().strftime('%Y%m%d')}.csv",
-                            mime="text/csv"
-                        )
-                    else:
-                        st.info("No verified submissions found.")
-                
-                with col2:
-                    st.markdown("### ⏳ Pending Submissions")
-                    if pending_data:
-                        pending_df = pd.DataFrame([dict(row) for row in pending_data])
-                        st.dataframe(pending_df, use_container_width=True)
-                        
-                        # Download pending data
-                        csv = pending_df.to_csv(index=False)
-                        st.download_button(
-                            label="📥 Download Pending Data",
-                            data=csv,
-                            file_name=f"pending_data_{username}_{datetime.now().strftime('%Y%m%d')}.csv",
-                            mime="text/csv"
-                        )
-                    else:
-                        st.info("No pending submissions found.")
-                        
-            except Exception as e:
-                st.error(f"Error loading submissions: {e}")
-            finally:
-                if cursor:
-                    cursor.close()
-                if conn:
-                    conn.close()
-
-
-def update_submission_with_edits(submission_id, submission_type, edited_data, pho_username):
-    """Update submission with edited data and mark as verified"""
-    conn = get_db_connection()
-    if not conn:
-        return False
+        try:
+            submissions_df = load_user_submissions(username)
+            
+            list_columns = ['type', 'date', 'hostel', 'total_waste', 'status']
+            verified_df = submissions_df.loc[submissions_df['status'] == 'verified', list_columns + ['verified_at']]
+            pending_df = submissions_df.loc[submissions_df['status'] == 'pending', list_columns + ['submitted_at']]
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.markdown("### ✅ Verified Submissions")
+                if not verified_df.empty:
+                    st.dataframe(dataframe_page(verified_df, key=f"verified_page_{username}"), use_container_width=True)
+                    
+                    # Download verified data
+                    csv = dataframe_csv(verified_df)
+                    st.download_button(
+                        label="📥 Download Verified Data",
+                        data=csv,
+                        file_name=f"verified_data_{username}_{datetime.now().strftime('%Y%m%d')}.csv",
+                        mime="text/csv"
+                    )
+                else:
+                    st.info("No verified submissions found.")
+            
+            with col2:
+                st.markdown("### ⏳ Pending Submissions")
+                if not pending_df.empty:
+                    st.dataframe(dataframe_page(pending_df, key=f"pending_page_{username}"), use_container_width=True)
+                    
+                    # Download pending data
+                    csv = dataframe_csv(pending_df)
+                    st.download_button(
+                        label="📥 Download Pending Data",
+                        data=csv,
+                        file_name=f"pending_data_{username}_{datetime.now().strftime('%Y%m%d')}.csv",
+                        mime="text/csv"
+                    )
+                else:
+                    st.info("No pending submissions found.")
+                    
+        except Exception as e:
+            st.error(f"Error loading submissions: {e}")
+
+
+def _edit_verify_sql(submission_type, values):
+    """UPDATE ... FROM (VALUES `values`) applying PHO edits, feeding the master upsert"""
+    columns = EDITABLE_COLUMNS[submission_type]
+    return f"""
+        WITH verified AS (
+            UPDATE {SUBMISSION_TABLES[submission_type]} AS s
+            SET {", ".join(f"{col} = v.{col}" for col in columns)},
+                status = 'verified', verified_by = v.verified_by, verified_at = v.verified_at
+            FROM (VALUES {values}) AS v(submission_id, verified_by, verified_at, {", ".join(columns)})
+            WHERE s.submission_id = v.submission_id AND s.status = 'pending'
+            RETURNING s.*
+        )
+        {MASTER_UPSERTS[submission_type]()}
+    """
+
+def update_submissions_with_edits(edits, submission_type, pho_username):
+    """Apply PHO edits, mark the rows verified and fold them into master data in one statement
+
+    ``edits`` is a list of ``(submission_id, edited_data)`` pairs; all rows go out as a
+    single UPDATE ... FROM (VALUES ...) feeding the same master upsert as verify_submissions.
+    """
+    columns = EDITABLE_COLUMNS[submission_type]
+    timestamp = datetime.now()
+    rows = [
+        (submission_id, pho_username, timestamp, *(edited_data[col] for col in columns))
+        for submission_id, edited_data in edits
+    ]
+    # VALUES rows carry no column types, so cast each field to its target type
+    template = "(%s::integer, %s, %s::timestamp, " + ", ".join(
+        "%s::integer" if col.endswith("_students") else "%s::numeric" for col in columns
+    ) + ")"
     
     try:
-        cursor = conn.cursor()
-        timestamp = datetime.now()
-        
-        if submission_type == 'mess_waste':
-            # Update mess waste submission with edited data
-            cursor.execute("""
-                UPDATE mess_waste_submissions 
-                SET breakfast_students = %s, breakfast_student_waste = %s, breakfast_counter_waste = %s, breakfast_vegetable_peels = %s,
-                    lunch_students = %s, lunch_student_waste = %s, lunch_counter_waste = %s, lunch_vegetable_peels = %s,
-                    snacks_students = %s, snacks_student_waste = %s, snacks_counter_waste = %s, snacks_vegetable_peels = %s,
-                    dinner_students = %s, dinner_student_waste = %s, dinner_counter_waste = %s, dinner_vegetable_peels = %s,
-                    mess_dry_waste = %s, total_students = %s, total_mess_waste = %s,
-                    status = 'verified', verified_by = %s, verified_at = %s
-                WHERE submission_id = %s
-            """, (
-                edited_data['breakfast_students'], edited_data['breakfast_student_waste'], edited_data['breakfast_counter_waste'], edited_data['breakfast_vegetable_peels'],
-                edited_data['lunch_students'], edited_data['lunch_student_waste'], edited_data['lunch_counter_waste'], edited_data['lunch_vegetable_peels'],
-                edited_data['snacks_students'], edited_data['snacks_student_waste'], edited_data['snacks_counter_waste'], edited_data['snacks_vegetable_peels'],
-                edited_data['dinner_students'], edited_data['dinner_student_waste'], edited_data['dinner_counter_waste'], edited_data['dinner_vegetable_peels'],
-                edited_data['mess_dry_waste'], edited_data['total_students'], edited_data['total_mess_waste'],
-                pho_username, timestamp, submission_id
-            ))
-            
-        else:
-            # Update hostel waste submission with edited data
-            cursor.execute("""
-                UPDATE hostel_waste_submissions 
-                SET dry_waste = %s, wet_waste = %s, e_waste = %s, biomedical_waste = %s, hazardous_waste = %s, total_waste = %s,
-                    status = 'verified', verified_by = %s, verified_at = %s
-                WHERE submission_id = %s
-            """, (
-                edited_data['dry_waste'], edited_data['wet_waste'], edited_data['e_waste'],
-                edited_data['biomedical_waste'], edited_data['hazardous_waste'], edited_data['total_waste'],
-                pho_username, timestamp, submission_id
-            ))
-        
-        conn.commit()
+        with db_cursor() as cursor:
+            if len(rows) == 1:
+                # The PHO form edits one record at a time: parse and plan that once per connection
+                execute_prepared(cursor, f"edit_verify_{submission_type}", _edit_verify_sql(submission_type, template), rows[0])
+            else:
+                execute_values(cursor, _edit_verify_sql(submission_type, "%s"), rows, template=template)
         
         # Clear cache
-        load_pending_data_for_pho.clear()
-        load_master_data.clear()
+        clear_submission_caches()
+        clear_master_caches()
         
         return True
         
     except Exception as e:
         st.error(f"Error updating submission: {e}")
         return False
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+
+def update_submission_with_edits(submission_id, submission_type, edited_data, pho_username):
+    """Update submission with edited data and mark as verified"""
+    return update_submissions_with_edits([(submission_id, edited_data)], submission_type, pho_username)
 
 # NEW: PHO Edit Functions
+# Edit form inputs: (column suffix, label, step) per meal, and (column, label) for hostel waste
+EDIT_MEAL_FIELDS = [
+    ("students", "Students", 1),
+    ("student_waste", "Student Waste (kg)", 0.1),
+    ("counter_waste", "Counter Waste (kg)", 0.1),
+    ("vegetable_peels", "Vegetable Peels (kg)", 0.1),
+]
+EDIT_HOSTEL_FIELDS = [
+    ("dry_waste", "Dry Waste (kg)"),
+    ("wet_waste", "Wet Waste (kg)"),
+    ("e_waste", "E-Waste (kg)"),
+    ("biomedical_waste", "Biomedical Waste (kg)"),
+    ("hazardous_waste", "Hazardous Waste (kg)"),
+]
+
+# Submission columns a PHO edit can change, per submission type
+EDITABLE_COLUMNS = {
+    "mess_waste": [f"{meal}_{field}" for meal in MEALS for field, *_ in EDIT_MEAL_FIELDS] + ["mess_dry_waste"],
+    "hostel_waste": [column for column, _ in EDIT_HOSTEL_FIELDS],
+}
+
+def _edit_defaults(record_data, submission_type):
+    """Typed starting values for the edit form, built once per record and kept in session state"""
+    state_key = f"_edit_defaults_{submission_type}_{record_data['submission_id']}"
+    if state_key not in st.session_state:
+        st.session_state[state_key] = {
+            column: (int if column.endswith("_students") else float)(record_data.get(column) or 0)
+            for column in EDITABLE_COLUMNS[submission_type]
+        }
+    return state_key, st.session_state[state_key]
+
+# A fragment: interactions inside the form rerun only this function; saving or
+# cancelling calls st.rerun(), which still refreshes the whole dashboard
+@st.fragment
 def show_edit_form(record_data, submission_type, pho_username):
     """Show edit form for PHO to modify submissions"""
     st.markdown("### ✏️ Edit Submission")
+    defaults_key, defaults = _edit_defaults(record_data, submission_type)
     
     with st.form("edit_submission_form"):
+        values = {}
         if submission_type == 'mess_waste':
             st.markdown("#### Edit Mess Waste Data")
             
-            # Create editable fields for mess waste
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("**Breakfast**")
-                breakfast_students = st.number_input("Students", value=record_data.get('breakfast_students', 0), key="edit_breakfast_students")
-                breakfast_student_waste = st.number_input("Student Waste (kg)", value=float(record_data.get('breakfast_student_waste', 0)), step=0.1, key="edit_breakfast_student_waste")
-                breakfast_counter_waste = st.number_input("Counter Waste (kg)", value=float(record_data.get('breakfast_counter_waste', 0)), step=0.1, key="edit_breakfast_counter_waste")
-                breakfast_vegetable_peels = st.number_input("Vegetable Peels (kg)", value=float(record_data.get('breakfast_vegetable_peels', 0)), step=0.1, key="edit_breakfast_vegetable_peels")
-                
-                st.markdown("**Lunch**")
-                lunch_students = st.number_input("Students", value=record_data.get('lunch_students', 0), key="edit_lunch_students")
-                lunch_student_waste = st.number_input("Student Waste (kg)", value=float(record_data.get('lunch_student_waste', 0)), step=0.1, key="edit_lunch_student_waste")
-                lunch_counter_waste = st.number_input("Counter Waste (kg)", value=float(record_data.get('lunch_counter_waste', 0)), step=0.1, key="edit_lunch_counter_waste")
-                lunch_vegetable_peels = st.number_input("Vegetable Peels (kg)", value=float(record_data.get('lunch_vegetable_peels', 0)), step=0.1, key="edit_lunch_vegetable_peels")
-            
-            with col2:
-                st.markdown("**Snacks**")
-                snacks_students = st.number_input("Students", value=record_data.get('snacks_students', 0), key="edit_snacks_students")
-                snacks_student_waste = st.number_input("Student Waste (kg)", value=float(record_data.get('snacks_student_waste', 0)), step=0.1, key="edit_snacks_student_waste")
-                snacks_counter_waste = st.number_input("Counter Waste (kg)", value=float(record_data.get('snacks_counter_waste', 0)), step=0.1, key="edit_snacks_counter_waste")
-                snacks_vegetable_peels = st.number_input("Vegetable Peels (kg)", value=float(record_data.get('snacks_vegetable_peels', 0)), step=0.1, key="edit_snacks_vegetable_peels")
-                
-                st.markdown("**Dinner**")
-                dinner_students = st.number_input("Students", value=record_data.get('dinner_students', 0), key="edit_dinner_students")
-                dinner_student_waste = st.number_input("Student Waste (kg)", value=float(record_data.get('dinner_student_waste', 0)), step=0.1, key="edit_dinner_student_waste")
-                dinner_counter_waste = st.number_input("Counter Waste (kg)", value=float(record_data.get('dinner_counter_waste', 0)), step=0.1, key="edit_dinner_counter_waste")
-                dinner_vegetable_peels = st.number_input("Vegetable Peels (kg)", value=float(record_data.get('dinner_vegetable_peels', 0)), step=0.1, key="edit_dinner_vegetable_peels")
+            # Create editable fields for mess waste, two meals per column
+            for col, meals in zip(st.columns(2), (MEALS[:2], MEALS[2:])):
+                with col:
+                    for meal in meals:
+                        st.markdown(f"**{meal.capitalize()}**")
+                        for field, label, step in EDIT_MEAL_FIELDS:
+                            column = f"{meal}_{field}"
+                            values[column] = st.number_input(label, value=defaults[column], step=step, key=f"edit_{column}")
             
-            mess_dry_waste = st.number_input("Mess Dry Waste (kg)", value=float(record_data.get('mess_dry_waste', 0)), step=0.1, key="edit_mess_dry_waste")
+            values['mess_dry_waste'] = st.number_input("Mess Dry Waste (kg)", value=defaults['mess_dry_waste'], step=0.1, key="edit_mess_dry_waste")
             
         else:  # hostel_waste
             st.markdown("#### Edit Hostel Waste Data")
             
-            col1, col2 = st.columns(2)
-            with col1:
-                dry_waste = st.number_input("Dry Waste (kg)", value=float(record_data.get('dry_waste', 0)), step=0.1, key="edit_dry_waste")
-                wet_waste = st.number_input("Wet Waste (kg)", value=float(record_data.get('wet_waste', 0)), step=0.1, key="edit_wet_waste")
-                e_waste = st.number_input("E-Waste (kg)", value=float(record_data.get('e_waste', 0)), step=0.1, key="edit_e_waste")
-            with col2:
-                biomedical_waste = st.number_input("Biomedical Waste (kg)", value=float(record_data.get('biomedical_waste', 0)), step=0.1, key="edit_biomedical_waste")
-                hazardous_waste = st.number_input("Hazardous Waste (kg)", value=float(record_data.get('hazardous_waste', 0)), step=0.1, key="edit_hazardous_waste")
+            for col, fields in zip(st.columns(2), (EDIT_HOSTEL_FIELDS[:3], EDIT_HOSTEL_FIELDS[3:])):
+                with col:
+                    for column, label in fields:
+                        values[column] = st.number_input(label, value=defaults[column], step=0.1, key=f"edit_{column}")
         
         edit_reason = st.text_area("Reason for Edit", placeholder="Explain why this data is being modified...")
         
         col1, col2 = st.columns(2)
         with col1:
             if st.form_submit_button("💾 Save Changes", type="primary"):
-                # Prepare edited data
-                if submission_type == 'mess_waste':
-                    edited_data = {
-                        'breakfast_students': breakfast_students,
-                        'breakfast_student_waste': breakfast_student_waste,
-                        'breakfast_counter_waste': breakfast_counter_waste,
-                        'breakfast_vegetable_peels': breakfast_vegetable_peels,
-                        'lunch_students': lunch_students,
-                        'lunch_student_waste': lunch_student_waste,
-                        'lunch_counter_waste': lunch_counter_waste,
-                        'lunch_vegetable_peels': lunch_vegetable_peels,
-                        'snacks_students': snacks_students,
-                        'snacks_student_waste': snacks_student_waste,
-                        'snacks_counter_waste': snacks_counter_waste,
-                        'snacks_vegetable_peels': snacks_vegetable_peels,
-                        'dinner_students': dinner_students,
-                        'dinner_student_waste': dinner_student_waste,
-                        'dinner_counter_waste': dinner_counter_waste,
-                        'dinner_vegetable_peels': dinner_vegetable_peels,
-                        'mess_dry_waste': mess_dry_waste,
-                        'total_students': breakfast_students + lunch_students + snacks_students + dinner_students,
-                        'total_mess_waste': (breakfast_student_waste + breakfast_counter_waste + breakfast_vegetable_peels +
-                                           lunch_student_waste + lunch_counter_waste + lunch_vegetable_peels +
-                                           snacks_student_waste + snacks_counter_waste + snacks_vegetable_peels +
-                                           dinner_student_waste + dinner_counter_waste + dinner_vegetable_peels +
-                                           mess_dry_waste)
-                    }
-                else:
-                    edited_data = {
-                        'dry_waste': dry_waste,
-                        'wet_waste': wet_waste,
-                        'e_waste': e_waste,
-                        'biomedical_waste': biomedical_waste,
-                        'hazardous_waste': hazardous_waste,
-                        'total_waste': dry_waste + wet_waste + e_waste + biomedical_waste + hazardous_waste
-                    }
+                # Totals are generated columns, so only the entered fields are saved
+                edited_data = dict(values)
                 
                 # Save edit and approve
                 if save_pho_edit(record_data['submission_id'], submission_type, record_data, edited_data, pho_username, edit_reason):
                     if update_submission_with_edits(record_data['submission_id'], submission_type, edited_data, pho_username):
                         st.success("✅ Changes saved and submission approved!")
                         st.session_state['edit_record'] = None
+                        st.session_state.pop(defaults_key, None)
                         st.rerun()
                     else:
                         st.error("❌ Error updating submission")
@@ -2504,10 +2639,52 @@ def show_edit_form(record_data, submission_type, pho_username):
         with col2:
             if st.form_submit_button("❌ Cancel"):
                 st.session_state['edit_record'] = None
+                st.session_state.pop(defaults_key, None)
                 st.rerun()
 
 
 
+# Columns shown for each pending submission in the verification tables
+PENDING_REVIEW_COLUMNS = {
+    "mess_waste": EDITABLE_COLUMNS["mess_waste"] + ["total_students", "total_mess_waste"],
+    "hostel_waste": EDITABLE_COLUMNS["hostel_waste"] + ["total_waste"],
+}
+
+def show_pending_group(records, submission_type, images_by_id, group_key):
+    """One hostel/date group of pending submissions as a single table with a verify checkbox per row"""
+    table = pd.DataFrame(records).reindex(
+        columns=["submission_id", *PENDING_REVIEW_COLUMNS[submission_type], "remarks", "submitted_by", "submitted_at"]
+    )
+    table.insert(0, "verify", False)
+    edited = st.data_editor(
+        table,
+        hide_index=True,
+        use_container_width=True,
+        column_config={"verify": st.column_config.CheckboxColumn("✅ Verify")},
+        disabled=[col for col in table.columns if col != "verify"],
+        key=f"pending_{group_key}"
+    )
+    selected = [rec for rec, checked in zip(records, edited["verify"]) if checked]
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button(f"✅ Verify Selected ({len(selected)})", key=f"verify_{group_key}", type="primary", disabled=not selected):
+            st.session_state['verify_record'] = selected
+            st.session_state['verify_key'] = group_key
+            st.rerun()
+    with col2:
+        edit_id = st.selectbox("Submission to edit", table["submission_id"], key=f"edit_pick_{group_key}")
+        if st.button("✏️ Edit & Verify", key=f"edit_{group_key}"):
+            st.session_state['edit_record'] = next(rec for rec in records if rec['submission_id'] == edit_id)
+            st.rerun()
+    
+    for rec in records:
+        images = images_by_id.get(rec['submission_id'], [])
+        if images:
+            st.caption(f"Submission #{rec['submission_id']}")
+            display_submission_images(rec['submission_id'], submission_type, images)
+
+
 # -----------------------------------------------------------------------------
 # ⚕️ PHO DASHBOARD (IMPROVED)
 # -----------------------------------------------------------------------------
@@ -2527,99 +2704,40 @@ def show_pho_dashboard(username: str):
         
         # Handle edit/verify states first
         if st.session_state.get('edit_record'):
-            show_edit_form(st.session_state['edit_record'], 'mess_waste', username)
+            # Mess and hostel ids overlap, so the record's own type picks the table
+            show_edit_form(st.session_state['edit_record'], st.session_state['edit_record']['data_type'], username)
             return
         if st.session_state.get('verify_record'):
-            record = st.session_state['verify_record']
-            approve_submission(record, username)
-            st.success("✅ Data verified successfully!")
+            if isinstance(st.session_state['verify_record'], list):
+                approve_all_collections(st.session_state['verify_record'], username)
+                st.success("✅ Selected submissions verified successfully!")
+            else:
+                approve_submission(st.session_state['verify_record'], username)
+                st.success("✅ Data verified successfully!")
             st.session_state['verify_record'] = None
             st.session_state['verify_key'] = None
             time.sleep(1)
             st.rerun()
         
-        # Load and filter data
-        data_by_hostel_date = load_pending_data_for_pho()
-        mess_data = {k: v for k, v in data_by_hostel_date.items() if 'mess_waste' in k}
+        # Load this tab's pending submissions
+        mess_data = load_pending_data_for_pho('mess_waste')
         
         if not mess_data:
             st.info("📜 No pending mess waste verifications at this time.")
             return
         
-        # Display mess waste submissions
+        # Fetch images for every listed submission in one query
+        mess_images = load_submission_images(
+            [rec['submission_id'] for records in mess_data.values() for rec in records], 'mess_waste'
+        )
+        
+        # Display mess waste submissions, one table per hostel and date
         for key, records in mess_data.items():
-            key_parts = key.rsplit('_', 1)  # Split from right, only once
-            hostel_date = key_parts[0]
-            waste_type = key_parts[1]
-            hostel_date_parts = hostel_date.split('_', 1)
-            hostel = hostel_date_parts[0]
-            date_str = hostel_date_parts[1]
+            hostel_date = key.rsplit('_', 1)[0]  # Split from right, only once
+            hostel, date_str = hostel_date.split('_', 1)
             
             with st.expander(f"🍽️ Mess Waste - Hostel {hostel} - 📅 {date_str}", expanded=False):
-                for idx, rec in enumerate(records):
-                    st.markdown("#### Submission")
-                    
-                    # Display meal-wise data in 4 columns
-                    col1, col2, col3, col4 = st.columns(4)
-                    
-                    with col1:
-                        st.write("**🌅 Breakfast**")
-                        st.write(f"Students: {rec.get('breakfast_students', 0)}")
-                        st.write(f"Student Waste: {rec.get('breakfast_student_waste', 0)} kg")
-                        st.write(f"Counter Waste: {rec.get('breakfast_counter_waste', 0)} kg")
-                        st.write(f"Vegetable Peels: {rec.get('breakfast_vegetable_peels', 0)} kg")
-                    
-                    with col2:
-                        st.write("**🍽️ Lunch**")
-                        st.write(f"Students: {rec.get('lunch_students', 0)}")
-                        st.write(f"Student Waste: {rec.get('lunch_student_waste', 0)} kg")
-                        st.write(f"Counter Waste: {rec.get('lunch_counter_waste', 0)} kg")
-                        st.write(f"Vegetable Peels: {rec.get('lunch_vegetable_peels', 0)} kg")
-                    
-                    with col3:
-                        st.write("**🍪 Snacks**")
-                        st.write(f"Students: {rec.get('snacks_students', 0)}")
-                        st.write(f"Student Waste: {rec.get('snacks_student_waste', 0)} kg")
-                        st.write(f"Counter Waste: {rec.get('snacks_counter_waste', 0)} kg")
-                        st.write(f"Vegetable Peels: {rec.get('snacks_vegetable_peels', 0)} kg")
-                    
-                    with col4:
-                        st.write("**🌙 Dinner**")
-                        st.write(f"Students: {rec.get('dinner_students', 0)}")
-                        st.write(f"Student Waste: {rec.get('dinner_student_waste', 0)} kg")
-                        st.write(f"Counter Waste: {rec.get('dinner_counter_waste', 0)} kg")
-                        st.write(f"Vegetable Peels: {rec.get('dinner_vegetable_peels', 0)} kg")
-                    
-                    # Totals
-                    st.markdown("### 📊 Totals")
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric("Total Students", rec.get('total_students', 0))
-                    with col2:
-                        st.metric("Total Mess Waste", f"{rec.get('total_mess_waste', 0)} kg")
-                    with col3:
-                        st.metric("Mess Dry Waste", f"{rec.get('mess_dry_waste', 0)} kg")
-                    
-                    st.write(f"**Remarks:** {rec.get('remarks', 'N/A')}")
-                    
-                    display_submission_images(rec['submission_id'], 'mess_waste')
-                    
-                    st.write(f"**Submitted by:** {rec.get('submitted_by', 'N/A')}")
-                    st.write(f"**Submitted at:** {rec.get('submitted_at', 'N/A')}")
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button("✅ Verify Submission", key=f"verify_mess_{hostel}_{date_str}_{rec['submission_id']}", type="primary"):
-                            st.session_state['verify_record'] = rec
-                            st.session_state['verify_key'] = (hostel, date_str, 'mess_waste', rec['submission_id'])
-                            st.rerun()
-                    with col2:
-                        if st.button("✏️ Edit & Verify", key=f"edit_mess_{hostel}_{date_str}_{rec['submission_id']}"):
-                            st.session_state['edit_record'] = rec
-                            st.rerun()
-                    
-                    if idx < len(records) - 1:
-                        st.markdown("---")
+                show_pending_group(records, 'mess_waste', mess_images, f"mess_{hostel}_{date_str}")
 
 
 
@@ -2628,12 +2746,12 @@ def show_pho_dashboard(username: str):
         
         # Handle edit/verify states first
         if st.session_state.get('edit_record'):
-            show_edit_form(st.session_state['edit_record'], 'hostel_waste', username)
+            show_edit_form(st.session_state['edit_record'], st.session_state['edit_record']['data_type'], username)
             return
         if st.session_state.get('verify_record'):
             if isinstance(st.session_state['verify_record'], list):
                 approve_all_collections(st.session_state['verify_record'], username)
-                st.success("✅ All collections verified successfully!")
+                st.success("✅ Selected submissions verified successfully!")
             else:
                 approve_submission(st.session_state['verify_record'], username)
                 st.success("✅ Data verified successfully!")
@@ -2642,88 +2760,49 @@ def show_pho_dashboard(username: str):
             time.sleep(1)
             st.rerun()
         
-        # Load and filter data
-        data_by_hostel_date = load_pending_data_for_pho()
-        hostel_data = {k: v for k, v in data_by_hostel_date.items() if 'hostel_waste' in k}
+        # Load this tab's pending submissions
+        hostel_data = load_pending_data_for_pho('hostel_waste')
         
         if not hostel_data:
             st.info("📜 No pending hostel waste verifications at this time.")
             return
         
-        # Display hostel waste submissions
+        # Fetch images for every listed submission in one query
+        hostel_images = load_submission_images(
+            [rec['submission_id'] for records in hostel_data.values() for rec in records], 'hostel_waste'
+        )
+        
+        # Display hostel waste submissions, one table per hostel and date
         for key, records in hostel_data.items():
-            key_parts = key.rsplit('_', 1)  # Split from right, only once
-            hostel_date = key_parts[0]
-            waste_type = key_parts[1]
-            hostel_date_parts = hostel_date.split('_', 1)
-            hostel = hostel_date_parts[0]
-            date_str = hostel_date_parts[1]
+            hostel_date = key.rsplit('_', 1)[0]  # Split from right, only once
+            hostel, date_str = hostel_date.split('_', 1)
             
             with st.expander(f"🏠 Hostel Waste - Hostel {hostel} - 📅 {date_str}", expanded=False):
-                for idx, rec in enumerate(records):
-                    st.markdown("#### Submission")
-                    
-                    # Display hostel waste specific data in 2 columns
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.write(f"**Dry Waste:** {rec.get('dry_waste', 0)} kg")
-                        st.write(f"**Wet Waste:** {rec.get('wet_waste', 0)} kg")
-                        st.write(f"**E-Waste:** {rec.get('e_waste', 0)} kg")
-                    
-                    with col2:
-                        st.write(f"**Biomedical Waste:** {rec.get('biomedical_waste', 0)} kg")
-                        st.write(f"**Hazardous Waste:** {rec.get('hazardous_waste', 0)} kg")
-                        st.write(f"**Total Waste:** {rec.get('total_waste', 0)} kg")
-                    
-                    st.write(f"**Remarks:** {rec.get('remarks', 'N/A')}")
-                    
-                    display_submission_images(rec['submission_id'], 'hostel_waste')
-                    
-                    st.write(f"**Submitted by:** {rec.get('submitted_by', 'N/A')}")
-                    st.write(f"**Submitted at:** {rec.get('submitted_at', 'N/A')}")
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.button("✅ Verify Submission", key=f"verify_hostel_{hostel}_{date_str}_{rec['submission_id']}", type="primary"):
-                            st.session_state['verify_record'] = rec
-                            st.session_state['verify_key'] = (hostel, date_str, 'hostel_waste', rec['submission_id'])
-                            st.rerun()
-                    with col2:
-                        if st.button("✏️ Edit & Verify", key=f"edit_hostel_{hostel}_{date_str}_{rec['submission_id']}"):
-                            st.session_state['edit_record'] = rec
-                            st.rerun()
-                    
-                    if idx < len(records) - 1:
-                        st.markdown("---")
+                show_pending_group(records, 'hostel_waste', hostel_images, f"hostel_{hostel}_{date_str}")
 
 
 
     with tab3:
         st.subheader("📋 Master Data")
-        engine = get_sqlalchemy_engine()
-        if engine:
-            try:
-                hostels = ["All"] + get_dynamic_hostels()
-                selected_hostel = st.selectbox("Filter by Hostel", hostels, key="pho_master_hostel_tab")
-                query = "SELECT * FROM master_waste_data WHERE hostel = %(hostel)s" if selected_hostel != "All" else "SELECT * FROM master_waste_data"
-                params = {'hostel': selected_hostel} if selected_hostel != "All" else {}
-                master_df = pd.read_sql(query, engine, params=params)
-                if not master_df.empty:
-                    st.dataframe(master_df, use_container_width=True)
-                    csv = master_df.to_csv(index=False)
-                    st.download_button(
-                        label="📥 Download Master Data",
-                        data=csv,
-                        file_name=f"pho_master_data_{datetime.now().strftime('%Y%m%d')}.csv",
-                        mime="text/csv"
-                    )
-                else:
-                    st.info("No master data found for the selected filters.")
-            except Exception as e:
-                st.error(f"Error loading master data: {e}")
-            finally:
-                engine.dispose()
+        try:
+            hostels = ["All"] + get_dynamic_hostels()
+            selected_hostel = st.selectbox("Filter by Hostel", hostels, key="pho_master_hostel_tab")
+            # Reuse the cached master frame the dashboards load instead of re-reading the table
+            master_df = load_master_data()
+            if selected_hostel != "All" and not master_df.empty:
+                master_df = master_df[master_df["hostel"] == selected_hostel]
+            if not master_df.empty:
+                st.dataframe(dataframe_page(master_df, key=f"pho_master_page_{selected_hostel}"), use_container_width=True)
+                st.download_button(
+                    label="📥 Download Master Data",
+                    data=export_master_csv(selected_hostel if selected_hostel != "All" else None),
+                    file_name=f"pho_master_data_{datetime.now().strftime('%Y%m%d')}.csv",
+                    mime="text/csv"
+                )
+            else:
+                st.info("No master data found for the selected filters.")
+        except Exception as e:
+            st.error(f"Error loading master data: {e}")
 
     with tab4:
         st.subheader("📊 PHO Dashboard")
@@ -2782,366 +2861,397 @@ def show_waste_details_view(username: str):
 # -----------------------------------------------------------------------------
 # 👤 ADMIN DASHBOARD (IMPROVED)
 # -----------------------------------------------------------------------------
-def show_admin_dashboard(username: str):
-    st.header("👤 Administrator Dashboard")
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "📊 Dashboard", "👥 User Management", "📋 Waste Data", "✏️ PHO Edits", "🗄️ Data Storage"
-    ])
-
-    with tab1:
-        st.subheader("📊 System Dashboard")
-        df = load_master_data()
-        show_dashboard_content(df, "Admin_")
-
-    with tab2:
-        st.subheader("User Management")
-        st.markdown("### ➕ Add New User")
-        with st.form("add_user_form"):
+@st.fragment
+def _admin_dashboard_tab():
+    """System-wide dashboard over the master table"""
+    st.subheader("📊 System Dashboard")
+    df = load_master_data()
+    show_dashboard_content(df, "Admin_")
+
+
+@st.fragment
+def _admin_users_tab():
+    """Add and delete users"""
+    st.subheader("User Management")
+    st.markdown("### ➕ Add New User")
+    with st.form("add_user_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            new_username = st.text_input("Username")
+            new_name = st.text_input("Full Name")
+        with col2:
+            new_role = st.selectbox("Role", ["pho_supervisor", "pho"])
+            new_password = st.text_input("Password", type="password")
+        if st.form_submit_button("Add User"):
+            if new_username and new_name and new_password:
+                if new_role == "pho" and not new_username.startswith("pho_supervisor_"):
+                    formatted_username = f"pho_supervisor_{new_username}"
+                else:
+                    formatted_username = new_username
+                if add_user(formatted_username, new_name, new_password, new_role):
+                    st.success(f"✅ User {formatted_username} added successfully! New hostel '{get_hostel_from_username(formatted_username)}' is now active everywhere.")
+                    st.rerun()
+                else:
+                    st.error("❌ Failed to add user")
+            else:
+                st.error("❌ Please fill all fields")
+    st.markdown("---")
+    users_df, usernames = get_all_users()
+    if usernames:
+        st.dataframe(users_df, use_container_width=True)
+        st.markdown("### 🗑️ Delete User")
+        user_to_delete = st.selectbox("Select user to delete", usernames)
+        @st.dialog("Confirm User Deletion")
+        def confirm_delete_user(user_to_delete):
+            st.warning(f"Are you sure you want to delete user '{user_to_delete}'? This cannot be undone.")
             col1, col2 = st.columns(2)
             with col1:
-                new_username = st.text_input("Username")
-                new_name = st.text_input("Full Name")
-            with col2:
-                new_role = st.selectbox("Role", ["pho_supervisor", "pho"])
-                new_password = st.text_input("Password", type="password")
-            if st.form_submit_button("Add User"):
-                if new_username and new_name and new_password:
-                    if new_role == "pho" and not new_username.startswith("pho_supervisor_"):
-                        formatted_username = f"pho_supervisor_{new_username}"
-                    else:
-                        formatted_username = new_username
-                    if add_user(formatted_username, new_name, new_password, new_role):
-                        st.success(f"✅ User {formatted_username} added successfully! New hostel '{get_hostel_from_username(formatted_username)}' is now active everywhere.")
+                if st.button("Confirm Delete", type="primary"):
+                    if delete_user(user_to_delete):
+                        st.success(f"✅ User {user_to_delete} deleted successfully!")
                         st.rerun()
                     else:
-                        st.error("❌ Failed to add user")
-                else:
-                    st.error("❌ Please fill all fields")
-        st.markdown("---")
-        users = get_all_users()
-        if users:
-            users_df = pd.DataFrame(users)
-            st.dataframe(users_df, use_container_width=True)
-            st.markdown("### 🗑️ Delete User")
-            user_to_delete = st.selectbox("Select user to delete", [u["username"] for u in users])
-            @st.dialog("Confirm User Deletion")
-            def confirm_delete_user(user_to_delete):
-                st.warning(f"Are you sure you want to delete user '{user_to_delete}'? This cannot be undone.")
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button("Confirm Delete", type="primary"):
-                        if delete_user(user_to_delete):
-                            st.success(f"✅ User {user_to_delete} deleted successfully!")
-                            st.rerun()
-                        else:
-                            st.error("❌ Failed to delete user")
-                with col2:
-                    if st.button("Cancel"):
-                        st.rerun()
+                        st.error("❌ Failed to delete user")
+            with col2:
+                if st.button("Cancel"):
+                    st.rerun()
 
-            if st.button("Delete User", type="secondary"):
-                if user_to_delete != "admin":
-                    confirm_delete_user(user_to_delete)
-                else:
-                    st.error("❌ Cannot delete admin user")
+        if st.button("Delete User", type="secondary"):
+            if user_to_delete != "admin":
+                confirm_delete_user(user_to_delete)
+            else:
+                st.error("❌ Cannot delete admin user")
 
-        else:
-            st.info("No users found")
+    else:
+        st.info("No users found")
 
-    with tab3:
-        st.subheader("📊 Waste Data Overview")
-        df = load_master_data()
-        if not df.empty:
-            col1, col2, col3 = st.columns(3)
-            hostels = ["All"] + get_dynamic_hostels()
-            selected_hostel = st.selectbox("Filter by Hostel", hostels, key="admin_waste_hostel")
-            date_range = st.date_input("Filter by Date Range", [df["date"].min(), df["date"].max()], key="admin_waste_date")
-            filtered_df = df.copy()
-            if selected_hostel != "All":
-                filtered_df = filtered_df[filtered_df["hostel"] == selected_hostel]
-            if len(date_range) == 2:
-                filtered_df = filtered_df[
-                    (pd.to_datetime(filtered_df["date"]) >= pd.to_datetime(date_range[0])) &
-                    (pd.to_datetime(filtered_df["date"]) <= pd.to_datetime(date_range[1]))
-                ]
 
+@st.fragment
+def _admin_waste_tab():
+    """Master waste data with hostel and date filters"""
+    st.subheader("📊 Waste Data Overview")
+    if st.button("🔄 Rebuild master data from verified submissions", key="admin_rebuild_master"):
+        rebuilt = rebuild_master_data()
+        if rebuilt is not None:
+            st.success(f"✅ Master data rebuilt ({rebuilt} hostel-days)")
+    try:
+        first_date, last_date = query_master_date_bounds()
+    except Exception as e:
+        st.error(f"Error loading master data: {e}")
+        first_date = last_date = None
+    if first_date:
+        col1, col2, col3 = st.columns(3)
+        hostels = ["All"] + get_dynamic_hostels()
+        selected_hostel = st.selectbox("Filter by Hostel", hostels, key="admin_waste_hostel")
+        date_range = st.date_input("Filter by Date Range", [first_date, last_date], key="admin_waste_date")
+        start, end = date_range if len(date_range) == 2 else (None, None)
+        hostel = None if selected_hostel == "All" else selected_hostel
+
+        # The summary needs three numbers, so Postgres computes them; rows are
+        # only pulled once the admin asks to see or download them
+        st.markdown("### 📈 Data Summary")
+        try:
+            record_count, total_mess, total_hostel = query_master_aggregates(hostel, start, end)
+        except Exception as e:
+            st.error(f"Error loading master data: {e}")
+            record_count, total_mess, total_hostel = 0, 0.0, 0.0
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Records", record_count)
+        with col2:
+            st.metric("Total Mess Waste", f"{total_mess:.1f} kg")
+        with col3:
+            st.metric("Total Hostel Waste", f"{total_hostel:.1f} kg")
+
+        if st.toggle("📄 Show records and download", key="admin_waste_show_rows"):
+            filtered_df = load_master_data_filtered(hostel, start, end)
             st.dataframe(filtered_df, use_container_width=True)
-            csv = filtered_df.to_csv(index=False)
+            csv = dataframe_csv(filtered_df)
             st.download_button(
                 label="📥 Download Waste Data",
                 data=csv,
                 file_name=f"admin_waste_data_{datetime.now().strftime('%Y%m%d')}.csv",
                 mime="text/csv"
             )
-            st.markdown("### 📈 Data Summary")
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total Records", len(filtered_df))
-            with col2:
-                total_mess = filtered_df["total_mess_waste"].sum() if "total_mess_waste" in filtered_df.columns else 0
-                st.metric("Total Mess Waste", f"{total_mess:.1f} kg")
-            with col3:
-                total_hostel = filtered_df["total_hostel_waste"].sum() if "total_hostel_waste" in filtered_df.columns else 0
-                st.metric("Total Hostel Waste", f"{total_hostel:.1f} kg")
-        else:
-            st.info("No waste data available.")
+    else:
+        st.info("No waste data available.")
 
-    with tab4:
-        st.subheader("📝 PHO Edit History")
+
+@st.fragment
+def _admin_edits_tab():
+    """PHO edit history, filters and export"""
+    st.subheader("📝 PHO Edit History")
+    
+    # Load PHO edits data
+    edits_df, edit_hostels, edit_editors = get_pho_edits_data()
+    
+    if not edits_df.empty:
+        # Summary metrics; one value_counts pass gives both per-type counts
+        type_counts = edits_df['submission_type'].value_counts()
+        col1, col2, col3, col4 = st.columns(4)
         
-        # Load PHO edits data
-        edits_df = get_pho_edits_data()
+        with col1:
+            st.metric("Total Edits", len(edits_df))
         
-        if not edits_df.empty:
-            # Summary metrics
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.metric("Total Edits", len(edits_df))
-            
-            with col2:
-                mess_edits = len(edits_df[edits_df['submission_type'] == 'mess_waste'])
-                st.metric("Mess Waste Edits", mess_edits)
-            
-            with col3:
-                hostel_edits = len(edits_df[edits_df['submission_type'] == 'hostel_waste'])
-                st.metric("Hostel Waste Edits", hostel_edits)
-            
-            with col4:
-                unique_editors = edits_df['edited_by'].nunique()
-                st.metric("Active Editors", unique_editors)
-            
-            st.markdown("---")
-            
-            # Filters
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                submission_type_filter = st.selectbox(
-                    "Filter by Type",
-                    ["All", "mess_waste", "hostel_waste"],
-                    key="edit_type_filter"
-                )
-            
-            with col2:
-                hostel_filter = st.selectbox(
-                    "Filter by Hostel",
-                    ["All"] + sorted(edits_df['hostel'].dropna().unique().tolist()),
-                    key="edit_hostel_filter"
-                )
-            
-            with col3:
-                editor_filter = st.selectbox(
-                    "Filter by Editor",
-                    ["All"] + sorted(edits_df['edited_by'].unique().tolist()),
-                    key="edit_editor_filter"
-                )
-            
-            # Apply filters
-            filtered_df = edits_df.copy()
-            
-            if submission_type_filter != "All":
-                filtered_df = filtered_df[filtered_df['submission_type'] == submission_type_filter]
-            
-            if hostel_filter != "All":
-                filtered_df = filtered_df[filtered_df['hostel'] == hostel_filter]
-            
-            if editor_filter != "All":
-                filtered_df = filtered_df[filtered_df['edited_by'] == editor_filter]
-            
-            st.markdown(f"**Showing {len(filtered_df)} of {len(edits_df)} edits**")
+        with col2:
+            mess_edits = int(type_counts.get('mess_waste', 0))
+            st.metric("Mess Waste Edits", mess_edits)
+        
+        with col3:
+            hostel_edits = int(type_counts.get('hostel_waste', 0))
+            st.metric("Hostel Waste Edits", hostel_edits)
+        
+        with col4:
+            unique_editors = len(edit_editors)
+            st.metric("Active Editors", unique_editors)
+        
+        st.markdown("---")
+        
+        # Filters
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            submission_type_filter = st.selectbox(
+                "Filter by Type",
+                ["All", "mess_waste", "hostel_waste"],
+                key="edit_type_filter"
+            )
+        
+        with col2:
+            hostel_filter = st.selectbox(
+                "Filter by Hostel",
+                ["All"] + edit_hostels,
+                key="edit_hostel_filter"
+            )
+        
+        with col3:
+            editor_filter = st.selectbox(
+                "Filter by Editor",
+                ["All"] + edit_editors,
+                key="edit_editor_filter"
+            )
+        
+        # Apply filters as one combined mask; .loc already returns a new frame
+        mask = pd.Series(True, index=edits_df.index)
+        
+        if submission_type_filter != "All":
+            mask &= edits_df['submission_type'].eq(submission_type_filter)
+        
+        if hostel_filter != "All":
+            mask &= edits_df['hostel'].eq(hostel_filter)
+        
+        if editor_filter != "All":
+            mask &= edits_df['edited_by'].eq(editor_filter)
+        
+        filtered_df = edits_df.loc[mask]
+        
+        st.markdown(f"**Showing {len(filtered_df)} of {len(edits_df)} edits**")
+        
+        if not filtered_df.empty:
+            # One table for the summary; the detailed comparison is only
+            # rendered for the edit picked below
+            st.dataframe(
+                filtered_df[['edit_id', 'submission_type', 'submission_id', 'hostel',
+                             'submission_date', 'edited_by', 'edited_at_str', 'reason']]
+                .rename(columns={'edited_at_str': 'edited_at'}),
+                use_container_width=True,
+                hide_index=True
+            )
             
-            if not filtered_df.empty:
-                # Display edits with comparison
-                for _, edit_record in filtered_df.iterrows():
-                    # Edit header
-                    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
-                    
-                    with col1:
-                        st.write(f"**{edit_record['submission_type'].replace('_', ' ').title()}** - Submission #{edit_record['submission_id']}")
-                    
-                    with col2:
-                        st.write(f"**Hostel:** {edit_record['hostel']}")
-                    
-                    with col3:
-                        st.write(f"**Date:** {edit_record['submission_date']}")
-                    
-                    with col4:
-                        st.write(f"**Edited:** {edit_record['edited_at'].strftime('%Y-%m-%d %H:%M')}")
-                    
-                    # Show detailed comparison
-                    show_edit_comparison(edit_record)
-                    
-                    st.markdown("---")
-            else:
-                st.info("No edits found matching the selected filters.")
+            chosen_edit = st.selectbox(
+                "Inspect edit",
+                filtered_df['edit_id'].tolist(),
+                key="edit_inspect_id"
+            )
+            edit_record = filtered_df[filtered_df['edit_id'] == chosen_edit].iloc[0]
+            st.write(f"**{edit_record['submission_type'].replace('_', ' ').title()}** - Submission #{edit_record['submission_id']}")
+            show_edit_comparison(edit_record)
+        else:
+            st.info("No edits found matching the selected filters.")
+        
+        # Export functionality
+        st.markdown("### 📥 Export Edit History")
+        
+        if st.button("Download Edit History CSV", use_container_width=True):
+            # Parse the JSON columns once each, then diff the pre-parsed pairs
+            originals = filtered_df['original_data'].map(_json_field)
+            editeds = filtered_df['edited_data'].map(_json_field)
+            # Changed keys come precomputed from the query
+            changes = [
+                '; '.join(f"{key}: {original.get(key)} → {edited.get(key)}" for key in (changed_fields or []))
+                or 'No changes detected'
+                for original, edited, changed_fields in zip(originals, editeds, filtered_df['changed_fields'])
+            ]
             
-            # Export functionality
-            st.markdown("### 📥 Export Edit History")
+            export_df_final = pd.DataFrame({
+                'Edit ID': filtered_df['edit_id'].values,
+                'Submission Type': filtered_df['submission_type'].values,
+                'Submission ID': filtered_df['submission_id'].values,
+                'Hostel': filtered_df['hostel'].values,
+                'Submission Date': filtered_df['submission_date'].values,
+                'Edited By': filtered_df['edited_by'].values,
+                'Edited At': filtered_df['edited_at'].values,
+                'Reason': filtered_df['reason'].fillna('No reason provided').replace('', 'No reason provided').values,
+                'Changes Made': changes
+            })
             
-            if st.button("Download Edit History CSV", use_container_width=True):
-                # Prepare data for export
-                export_df = filtered_df.copy()
-                
-                # Flatten JSON data for CSV export
-                export_rows = []
-                for _, row in export_df.iterrows():
-                    try:
-                        original = json.loads(row['original_data'])
-                        edited = json.loads(row['edited_data'])
-                        
-                        # Find changes
-                        changes = []
-                        for key, value in edited.items():
-                            if value != original.get(key):
-                                changes.append(f"{key}: {original.get(key)} → {value}")
-                        
-                        export_row = {
-                            'Edit ID': row['edit_id'],
-                            'Submission Type': row['submission_type'],
-                            'Submission ID': row['submission_id'],
-                            'Hostel': row['hostel'],
-                            'Submission Date': row['submission_date'],
-                            'Edited By': row['edited_by'],
-                            'Edited At': row['edited_at'],
-                            'Reason': row['reason'] or 'No reason provided',
-                            'Changes Made': '; '.join(changes) if changes else 'No changes detected'
-                        }
-                        export_rows.append(export_row)
-                        
-                    except Exception as e:
-                        st.error(f"Error processing edit {row['edit_id']}: {e}")
+            if not export_df_final.empty:
+                csv = dataframe_csv(export_df_final)
                 
-                if export_rows:
-                    export_df_final = pd.DataFrame(export_rows)
-                    csv = export_df_final.to_csv(index=False)
-                    
+                st.download_button(
+                    label="💾 Download CSV",
+                    data=csv,
+                    file_name=f"pho_edit_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                    mime="text/csv",
+                    use_container_width=True
+                )
+    else:
+        st.info("📝 No PHO edits found in the system.")
+        st.write("PHO edits will appear here when PHO officers modify submitted data.")
+        
+        # Show example of what edits look like
+        with st.expander("ℹ️ About PHO Edits"):
+            st.write("""
+            **PHO Edit Tracking includes:**
+            - Original submitted data
+            - Modified data after PHO review
+            - Timestamp and editor information
+            - Reason for modification
+            - Side-by-side comparison view
+            - Export functionality for audit trails
+            """)
+
+
+@st.fragment
+def _admin_storage_tab():
+    """Supabase bucket usage, downloads and deletes"""
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### 🍽️ Mess Images Storage")
+        
+        # Get storage info
+        mess_size, mess_count, mess_recent = get_supabase_storage_usage('mess-images')
+        mess_size_mb = mess_size / 1024 / 1024
+        
+        st.metric("Storage Used", f"{mess_size_mb:.2f} MB")
+        st.metric("Total Files", mess_count)
+        
+        # Show recent files
+        if mess_recent:
+            st.write("**Recent Files:**")
+            for file in mess_recent:
+                st.write(f"📸 {file['name']} ({file['size']/1024:.1f} KB)")
+        
+        # Download button
+        if st.button("📥 Download All Mess Images", use_container_width=True):
+            with st.spinner("Creating ZIP file..."):
+                zip_data = download_supabase_images('mess-images')
+                if zip_data:
                     st.download_button(
-                        label="💾 Download CSV",
-                        data=csv,
-                        file_name=f"pho_edit_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv",
+                        label="💾 Download ZIP File",
+                        data=zip_data,
+                        file_name=f"mess_images_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
+                        mime="application/zip",
                         use_container_width=True
                     )
-        else:
-            st.info("📝 No PHO edits found in the system.")
-            st.write("PHO edits will appear here when PHO officers modify submitted data.")
-            
-            # Show example of what edits look like
-            with st.expander("ℹ️ About PHO Edits"):
-                st.write("""
-                **PHO Edit Tracking includes:**
-                - Original submitted data
-                - Modified data after PHO review
-                - Timestamp and editor information
-                - Reason for modification
-                - Side-by-side comparison view
-                - Export functionality for audit trails
-                """)
+        
+        # Delete: acknowledgement and action submit together in one rerun
+        with st.form("delete_mess_images_form", clear_on_submit=True):
+            confirmed = st.checkbox("⚠️ I understand this will permanently delete all mess images", key="delete_mess_confirm")
+            if st.form_submit_button("🗑️ Delete All Mess Images", type="secondary", use_container_width=True):
+                if not confirmed:
+                    st.warning("Tick the confirmation box to delete")
+                else:
+                    with st.spinner("Deleting images..."):
+                        if delete_supabase_images('mess-images'):
+                            st.success("✅ All mess images deleted successfully!")
+                            time.sleep(1)
+                            st.rerun()
+                        else:
+                            st.error("❌ Failed to delete images")
+    
+    with col2:
+        st.markdown("### 🏠 Hostel Images Storage")
+        
+        # Get storage info
+        hostel_size, hostel_count, hostel_recent = get_supabase_storage_usage('hostel-images')
+        hostel_size_mb = hostel_size / 1024 / 1024
+        
+        st.metric("Storage Used", f"{hostel_size_mb:.2f} MB")
+        st.metric("Total Files", hostel_count)
+        
+        # Show recent files
+        if hostel_recent:
+            st.write("**Recent Files:**")
+            for file in hostel_recent:
+                st.write(f"📸 {file['name']} ({file['size']/1024:.1f} KB)")
+        
+        # Download button
+        if st.button("📥 Download All Hostel Images", use_container_width=True):
+            with st.spinner("Creating ZIP file..."):
+                zip_data = download_supabase_images('hostel-images')
+                if zip_data:
+                    st.download_button(
+                        label="💾 Download ZIP File",
+                        data=zip_data,
+                        file_name=f"hostel_images_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
+                        mime="application/zip",
+                        use_container_width=True
+                    )
+        
+        # Delete: acknowledgement and action submit together in one rerun
+        with st.form("delete_hostel_images_form", clear_on_submit=True):
+            confirmed = st.checkbox("⚠️ I understand this will permanently delete all hostel images", key="delete_hostel_confirm")
+            if st.form_submit_button("🗑️ Delete All Hostel Images", type="secondary", use_container_width=True):
+                if not confirmed:
+                    st.warning("Tick the confirmation box to delete")
+                else:
+                    with st.spinner("Deleting images..."):
+                        if delete_supabase_images('hostel-images'):
+                            st.success("✅ All hostel images deleted successfully!")
+                            time.sleep(1)
+                            st.rerun()
+                        else:
+                            st.error("❌ Failed to delete images")
+    
+    # Overall storage summary
+    st.markdown("---")
+    st.markdown("### 📊 Total Storage Summary")
+    total_size_mb = mess_size_mb + hostel_size_mb
+    total_files = mess_count + hostel_count
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Storage", f"{total_size_mb:.2f} MB")
+    with col2:
+        st.metric("Total Files", total_files)
+    with col3:
+        if st.button("🔗 Open Supabase Dashboard"):
+            st.write(f"Go to: https://supabase.com/dashboard/project/{supabase_project_ref()}/storage/buckets")
+
 
+def show_admin_dashboard(username: str):
+    st.header("👤 Administrator Dashboard")
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+        "📊 Dashboard", "👥 User Management", "📋 Waste Data", "✏️ PHO Edits", "🗄️ Data Storage"
+    ])
+
+    with tab1:
+        _admin_dashboard_tab()
+
+    with tab2:
+        _admin_users_tab()
+
+    with tab3:
+        _admin_waste_tab()
+
+    with tab4:
+        _admin_edits_tab()
 
     with tab5:
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("### 🍽️ Mess Images Storage")
-            
-            # Get storage info
-            mess_size, mess_files = get_supabase_storage_usage('mess-images')
-            mess_size_mb = mess_size / 1024 / 1024
-            
-            st.metric("Storage Used", f"{mess_size_mb:.2f} MB")
-            st.metric("Total Files", len(mess_files))
-            
-            # Show recent files
-            if mess_files:
-                st.write("**Recent Files:**")
-                recent_files = sorted(mess_files, key=lambda x: x.get('created', ''), reverse=True)[:5]
-                for file in recent_files:
-                    st.write(f"📸 {file['name']} ({file['size']/1024:.1f} KB)")
-            
-            # Download button
-            if st.button("📥 Download All Mess Images", use_container_width=True):
-                with st.spinner("Creating ZIP file..."):
-                    zip_data = download_supabase_images('mess-images')
-                    if zip_data:
-                        st.download_button(
-                            label="💾 Download ZIP File",
-                            data=zip_data,
-                            file_name=f"mess_images_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
-                            mime="application/zip",
-                            use_container_width=True
-                        )
-            
-            # Delete button
-            if st.button("🗑️ Delete All Mess Images", type="secondary", use_container_width=True):
-                if st.checkbox("⚠️ I understand this will permanently delete all mess images", key="delete_mess_confirm"):
-                    if st.button("🗑️ Confirm Delete All", type="secondary", key="confirm_delete_mess"):
-                        with st.spinner("Deleting images..."):
-                            if delete_supabase_images('mess-images'):
-                                st.success("✅ All mess images deleted successfully!")
-                                time.sleep(1)
-                                st.rerun()
-                            else:
-                                st.error("❌ Failed to delete images")
-        
-        with col2:
-            st.markdown("### 🏠 Hostel Images Storage")
-            
-            # Get storage info
-            hostel_size, hostel_files = get_supabase_storage_usage('hostel-images')
-            hostel_size_mb = hostel_size / 1024 / 1024
-            
-            st.metric("Storage Used", f"{hostel_size_mb:.2f} MB")
-            st.metric("Total Files", len(hostel_files))
-            
-            # Show recent files
-            if hostel_files:
-                st.write("**Recent Files:**")
-                recent_files = sorted(hostel_files, key=lambda x: x.get('created', ''), reverse=True)[:5]
-                for file in recent_files:
-                    st.write(f"📸 {file['name']} ({file['size']/1024:.1f} KB)")
-            
-            # Download button
-            if st.button("📥 Download All Hostel Images", use_container_width=True):
-                with st.spinner("Creating ZIP file..."):
-                    zip_data = download_supabase_images('hostel-images')
-                    if zip_data:
-                        st.download_button(
-                            label="💾 Download ZIP File",
-                            data=zip_data,
-                            file_name=f"hostel_images_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
-                            mime="application/zip",
-                            use_container_width=True
-                        )
-            
-            # Delete button
-            if st.button("🗑️ Delete All Hostel Images", type="secondary", use_container_width=True):
-                if st.checkbox("⚠️ I understand this will permanently delete all hostel images", key="delete_hostel_confirm"):
-                    if st.button("🗑️ Confirm Delete All", type="secondary", key="confirm_delete_hostel"):
-                        with st.spinner("Deleting images..."):
-                            if delete_supabase_images('hostel-images'):
-                                st.success("✅ All hostel images deleted successfully!")
-                                time.sleep(1)
-                                st.rerun()
-                            else:
-                                st.error("❌ Failed to delete images")
-        
-        # Overall storage summary
-        st.markdown("---")
-        st.markdown("### 📊 Total Storage Summary")
-        total_size_mb = mess_size_mb + hostel_size_mb
-        total_files = len(mess_files) + len(hostel_files)
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Total Storage", f"{total_size_mb:.2f} MB")
-        with col2:
-            st.metric("Total Files", total_files)
-        with col3:
-            supabase_url = st.secrets.get("SUPABASE_URL", "").replace("https://", "").split(".")[0]
-            if st.button("🔗 Open Supabase Dashboard"):
-                st.write(f"Go to: https://supabase.com/dashboard/project/{supabase_url}/storage/buckets")
+        _admin_storage_tab()
+
 
 # -----------------------------------------------------------------------------
 # 🏠 MAIN APPLICATION
@@ -3152,18 +3262,16 @@ def main():
         st.error("❌ Failed to initialize database. Please check your PostgreSQL connection.")
         st.info("💡 Make sure PostgreSQL is running and the database 'waste_management' exists.")
         st.stop()
+    if not has_supabase_config():
+        st.error("❌ Supabase credentials not found! Add SUPABASE_URL and SUPABASE_ANON_KEY to your Streamlit secrets.")
+        st.stop()
     check_session_validity()
     if not st.session_state.get("authentication_status"):
         show_login_form()
         return
     with st.sidebar:
         st.markdown(f"### 👋 Welcome, {st.session_state.name}")
-        role_names = {
-            "admin": "Administrator",
-            "pho_supervisor": "PHO Supervisor", 
-            "pho": "PHO"
-        }
-        st.markdown(f"**Role:** {role_names.get(st.session_state.role, st.session_state.role)}")
+        st.markdown(f"**Role:** {ROLE_NAMES.get(st.session_state.role, st.session_state.role)}")
         if st.session_state.role == "pho_supervisor":
             user_hostel = get_hostel_from_username(st.session_state.username)
             if user_hostel:
@@ -1,7 +1,11 @@
 import psycopg2
+from psycopg2.extras import execute_values
 import bcrypt
-import random
-from datetime import datetime, timedelta
+import csv
+import io
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
 import os
 from dotenv import load_dotenv
 
@@ -17,6 +21,13 @@ DB_CONFIG = dict(
     port=os.getenv("DB_PORT")
 )
 
+# Seed passwords are throwaway test values, so hash them at bcrypt's minimum cost;
+# set SEED_MODE=0 to hash at the app's production cost instead
+BCRYPT_ROUNDS = 4 if os.getenv("SEED_MODE", "1") != "0" else 12
+
+# Set SEED_KEEP_SCHEMA=1 to empty existing tables instead of dropping and recreating them
+KEEP_SCHEMA = os.getenv("SEED_KEEP_SCHEMA") == "1"
+
 PHO_SUPERVISORS = [
     ("pho_supervisor_2", "2"),
     ("pho_supervisor_10", "10"),
@@ -25,49 +36,172 @@ PHO_SUPERVISORS = [
     ("pho_supervisor_18", "18"),
 ]
 
-def random_float(a, b, digits=2):
-    return round(random.uniform(a, b), digits)
+DAYS = 60  # 2 months of daily records per hostel
+
+# Per meal: (share of students, waste-per-student multiplier,
+# (student, counter, peels) split of that waste, +/- headcount jitter)
+MEAL_PROFILES = {
+    "breakfast": (0.25, 1.0, (0.7, 0.2, 0.1), 5),
+    "lunch": (0.30, 1.2, (0.6, 0.25, 0.15), 5),      # higher
+    "snacks": (0.20, 0.6, (0.8, 0.15, 0.05), 3),     # lower
+    "dinner": (0.25, 1.1, (0.65, 0.25, 0.1), 5),
+}
+
+# Hostel waste categories as (share of the hostel base, +/- variation)
+HOSTEL_WASTE_PROFILE = [(0.5, 0.3), (0.3, 0.2), (0.1, 0.05), (0.05, 0.02), (0.05, 0.02)]
+
+HOSTEL_BASE_VALUES = {
+    "2": {"students": 180, "mess_base": 25, "hostel_base": 8},
+    "10": {"students": 200, "mess_base": 28, "hostel_base": 9},
+    "11": {"students": 190, "mess_base": 26, "hostel_base": 8.5},
+    "12-13-14": {"students": 450, "mess_base": 65, "hostel_base": 20},
+    "18": {"students": 210, "mess_base": 30, "hostel_base": 10}
+}
+
+HOSTEL_WASTE_COLUMNS = ["dry_waste", "wet_waste", "e_waste", "biomedical_waste", "hazardous_waste"]
+
+# Set SEED_RANDOM_STATE to an integer for a repeatable dataset; unset draws fresh data
+rng = np.random.default_rng(int(os.environ["SEED_RANDOM_STATE"]) if os.getenv("SEED_RANDOM_STATE") else None)
+
+def meal_waste(students, waste_per_student, meal):
+    """Student, counter and peel waste arrays for one meal over the whole series"""
+    _, multiplier, split, _ = MEAL_PROFILES[meal]
+    waste = students * (waste_per_student * multiplier)
+    return [np.round(waste * part, 2) for part in split]
+
+def hostel_waste(base):
+    """Dry, wet, e-, biomedical and hazardous waste arrays for one hostel over the whole series"""
+    return [
+        np.round(base * share + rng.uniform(-spread, spread, size=DAYS), 2)
+        for share, spread in HOSTEL_WASTE_PROFILE
+    ]
+
+def series_days(today):
+    """The DAYS consecutive dates ending today"""
+    start_date = today - timedelta(days=DAYS - 1)
+    return [start_date + timedelta(days=i) for i in range(DAYS)]
+
+def generate_hostel_series():
+    """Every waste column per hostel for the whole period, keyed by column name"""
+    series = {}
+    for _, hostel in PHO_SUPERVISORS:
+        base_vals = HOSTEL_BASE_VALUES[hostel]
+
+        # Consistent student counts and waste per student with small daily variation
+        total_students = base_vals["students"] + rng.integers(-10, 11, size=DAYS)
+        waste_per_student = rng.uniform(0.08, 0.12, size=DAYS)
+
+        # Distribute students across meals, then split each meal's waste
+        columns = {}
+        for meal, (share, _, _, jitter) in MEAL_PROFILES.items():
+            students = (total_students * share + rng.integers(-jitter, jitter + 1, size=DAYS)).astype(int)
+            columns[f"{meal}_students"] = students
+            columns.update(zip(
+                (f"{meal}_student_waste", f"{meal}_counter_waste", f"{meal}_vegetable_peels"),
+                meal_waste(students, waste_per_student, meal)
+            ))
+        columns["mess_dry_waste"] = np.round(base_vals["mess_base"] * 0.15 + rng.uniform(-0.5, 0.5, size=DAYS), 2)
+        columns.update(zip(HOSTEL_WASTE_COLUMNS, hostel_waste(base_vals["hostel_base"])))
+
+        series[hostel] = {name: column.tolist() for name, column in columns.items()}
+    return series
+
+# Every possible collection time (06:00-09:59), built once and sampled by index
+COLLECTION_TIMES = [time(hour, minute) for hour in range(6, 10) for minute in range(60)]
+
+def random_times(n):
+    """n random collection times between 06:00 and 09:59"""
+    return [COLLECTION_TIMES[i] for i in rng.integers(0, len(COLLECTION_TIMES), size=n).tolist()]
+
+def review_status(days, today, now):
+    """(status, verified_by, verified_at) per day: older entries verified, recent ones pending"""
+    cutoff = today - timedelta(days=3)
+    verified_lags = rng.integers(0, 4, size=len(days)).tolist()
+    return [
+        ("verified", "pho", now - timedelta(days=lag)) if day < cutoff else ("pending", None, None)
+        for day, lag in zip(days, verified_lags)
+    ]
+
+MESS_SUBMISSION_COLUMNS = [
+    "hostel", "submission_date", "collection_time",
+    "breakfast_students", "breakfast_student_waste", "breakfast_counter_waste", "breakfast_vegetable_peels",
+    "lunch_students", "lunch_student_waste", "lunch_counter_waste", "lunch_vegetable_peels",
+    "snacks_students", "snacks_student_waste", "snacks_counter_waste", "snacks_vegetable_peels",
+    "dinner_students", "dinner_student_waste", "dinner_counter_waste", "dinner_vegetable_peels",
+    "mess_dry_waste",
+    "remarks", "status", "submitted_by", "submitted_at", "verified_by", "verified_at",
+]
 
-def random_int(a, b):
-    return random.randint(a, b)
+HOSTEL_SUBMISSION_COLUMNS = [
+    "hostel", "submission_date", "collection_time",
+    "dry_waste", "wet_waste", "e_waste", "biomedical_waste", "hazardous_waste",
+    "remarks", "status", "submitted_by", "submitted_at", "verified_by", "verified_at",
+]
 
-def random_time():
-    hour = random_int(6, 9)
-    minute = random_int(0, 59)
-    return f"{hour:02d}:{minute:02d}"
+MASTER_COLUMNS = [
+    "hostel", "date",
+    "breakfast_student_waste", "breakfast_counter_waste", "breakfast_vegetable_peels",
+    "lunch_student_waste", "lunch_counter_waste", "lunch_vegetable_peels",
+    "snacks_student_waste", "snacks_counter_waste", "snacks_vegetable_peels",
+    "dinner_student_waste", "dinner_counter_waste", "dinner_vegetable_peels",
+    "total_students", "mess_dry_waste",
+    "dry_waste", "wet_waste", "e_waste", "biomedical_waste", "hazardous_waste",
+]
 
-def create_all_tables():
+# Seeded value columns of each submission table: everything between the identifying
+# hostel/date/time columns and the review metadata
+MESS_VALUE_COLUMNS = MESS_SUBMISSION_COLUMNS[3:-6]
+HOSTEL_VALUE_COLUMNS = HOSTEL_SUBMISSION_COLUMNS[3:-6]
+
+def copy_rows(cur, table, columns, rows):
+    """Bulk load rows with a single COPY; SERIAL and generated columns are left to the server"""
+    buffer = io.StringIO()
+    # csv writes None as an empty field, which NULL '' maps back to NULL
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cur.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT CSV, NULL '')",
+        buffer
+    )
+
+def create_all_tables(cur):
     """Create all tables with correct schema"""
     print("🔧 Creating database tables...")
-    conn = psycopg2.connect(**DB_CONFIG)
-    cur = conn.cursor()
 
     # Drop existing tables
     tables_to_drop = [
         "pho_edits", "submission_images", "master_waste_data", 
         "mess_waste_submissions", "hostel_waste_submissions", "users"
     ]
-    
-    for table in tables_to_drop:
-        cur.execute(f"DROP TABLE IF EXISTS {table} CASCADE;")
-        print(f"  Dropped {table}")
 
-    # Create users table
-    cur.execute("""
+    if KEEP_SCHEMA:
+        cur.execute(
+            "SELECT bool_and(to_regclass(name) IS NOT NULL) FROM unnest(%s::text[]) AS name",
+            (tables_to_drop,)
+        )
+        if cur.fetchone()[0]:
+            # Reseeding a warm database: one TRUNCATE, no catalog churn, grants kept
+            cur.execute(f"TRUNCATE {', '.join(tables_to_drop)} RESTART IDENTITY CASCADE;")
+            print(f"  Emptied {', '.join(tables_to_drop)}")
+            print("✅ Existing tables reused")
+            return
+    drop_sql = f"DROP TABLE IF EXISTS {', '.join(tables_to_drop)} CASCADE;"
+
+    # Drop and recreate every table in a single round-trip
+    cur.execute(drop_sql + """
+    -- Users table
     CREATE TABLE users (
         username VARCHAR PRIMARY KEY,
         name VARCHAR NOT NULL,
         password_hash VARCHAR NOT NULL,
         role VARCHAR NOT NULL
     );
-    """)
 
-    # Create mess waste submissions table
-    cur.execute("""
+    -- Mess waste submissions table
     CREATE TABLE mess_waste_submissions (
         submission_id SERIAL PRIMARY KEY,
         hostel VARCHAR NOT NULL,
-        submission_date DATE NOT NULL,
+        submission_date DATE NOT NULL DEFAULT CURRENT_DATE,
         collection_time TIME NOT NULL,
         breakfast_students INTEGER DEFAULT 0,
         breakfast_student_waste FLOAT DEFAULT 0,
@@ -86,8 +220,16 @@ def create_all_tables():
         dinner_counter_waste FLOAT DEFAULT 0,
         dinner_vegetable_peels FLOAT DEFAULT 0,
         mess_dry_waste FLOAT DEFAULT 0,
-        total_students INTEGER DEFAULT 0,
-        total_mess_waste FLOAT DEFAULT 0,
+        total_students INTEGER GENERATED ALWAYS AS (
+            breakfast_students + lunch_students + snacks_students + dinner_students
+        ) STORED,
+        total_mess_waste FLOAT GENERATED ALWAYS AS (
+            breakfast_student_waste + breakfast_counter_waste + breakfast_vegetable_peels +
+            lunch_student_waste + lunch_counter_waste + lunch_vegetable_peels +
+            snacks_student_waste + snacks_counter_waste + snacks_vegetable_peels +
+            dinner_student_waste + dinner_counter_waste + dinner_vegetable_peels +
+            mess_dry_waste
+        ) STORED,
         remarks TEXT,
         status VARCHAR DEFAULT 'pending',
         submitted_by VARCHAR NOT NULL,
@@ -95,21 +237,21 @@ def create_all_tables():
         verified_by VARCHAR,
         verified_at TIMESTAMP
     );
-    """)
 
-    # Create hostel waste submissions table
-    cur.execute("""
+    -- Hostel waste submissions table
     CREATE TABLE hostel_waste_submissions (
         submission_id SERIAL PRIMARY KEY,
         hostel VARCHAR NOT NULL,
-        submission_date DATE NOT NULL,
+        submission_date DATE NOT NULL DEFAULT CURRENT_DATE,
         collection_time TIME NOT NULL,
         dry_waste FLOAT DEFAULT 0,
         wet_waste FLOAT DEFAULT 0,
         e_waste FLOAT DEFAULT 0,
         biomedical_waste FLOAT DEFAULT 0,
         hazardous_waste FLOAT DEFAULT 0,
-        total_waste FLOAT DEFAULT 0,
+        total_waste FLOAT GENERATED ALWAYS AS (
+            dry_waste + wet_waste + e_waste + biomedical_waste + hazardous_waste
+        ) STORED,
         remarks TEXT,
         status VARCHAR DEFAULT 'pending',
         submitted_by VARCHAR NOT NULL,
@@ -117,10 +259,8 @@ def create_all_tables():
         verified_by VARCHAR,
         verified_at TIMESTAMP
     );
-    """)
 
-    # Create master waste data table
-    cur.execute("""
+    -- Master waste data table
     CREATE TABLE master_waste_data (
         id SERIAL PRIMARY KEY,
         hostel VARCHAR NOT NULL,
@@ -139,21 +279,50 @@ def create_all_tables():
         dinner_vegetable_peels FLOAT DEFAULT 0,
         total_students INTEGER DEFAULT 0,
         mess_dry_waste FLOAT DEFAULT 0,
-        total_mess_waste FLOAT DEFAULT 0,
-        total_mess_waste_no_peels FLOAT DEFAULT 0,
-        per_capita_mess_waste FLOAT DEFAULT 0,
-        per_capita_mess_waste_no_peels FLOAT DEFAULT 0,
+        total_mess_waste FLOAT GENERATED ALWAYS AS (
+            breakfast_student_waste + breakfast_counter_waste + breakfast_vegetable_peels +
+            lunch_student_waste + lunch_counter_waste + lunch_vegetable_peels +
+            snacks_student_waste + snacks_counter_waste + snacks_vegetable_peels +
+            dinner_student_waste + dinner_counter_waste + dinner_vegetable_peels +
+            mess_dry_waste
+        ) STORED,
+        total_mess_waste_no_peels FLOAT GENERATED ALWAYS AS (
+            breakfast_student_waste + breakfast_counter_waste +
+            lunch_student_waste + lunch_counter_waste +
+            snacks_student_waste + snacks_counter_waste +
+            dinner_student_waste + dinner_counter_waste +
+            mess_dry_waste
+        ) STORED,
+        per_capita_mess_waste FLOAT GENERATED ALWAYS AS (
+            COALESCE((
+                breakfast_student_waste + breakfast_counter_waste + breakfast_vegetable_peels +
+                lunch_student_waste + lunch_counter_waste + lunch_vegetable_peels +
+                snacks_student_waste + snacks_counter_waste + snacks_vegetable_peels +
+                dinner_student_waste + dinner_counter_waste + dinner_vegetable_peels +
+                mess_dry_waste
+            ) / NULLIF(total_students, 0), 0)
+        ) STORED,
+        per_capita_mess_waste_no_peels FLOAT GENERATED ALWAYS AS (
+            COALESCE((
+                breakfast_student_waste + breakfast_counter_waste +
+                lunch_student_waste + lunch_counter_waste +
+                snacks_student_waste + snacks_counter_waste +
+                dinner_student_waste + dinner_counter_waste +
+                mess_dry_waste
+            ) / NULLIF(total_students, 0), 0)
+        ) STORED,
         dry_waste FLOAT DEFAULT 0,
         wet_waste FLOAT DEFAULT 0,
         e_waste FLOAT DEFAULT 0,
         biomedical_waste FLOAT DEFAULT 0,
         hazardous_waste FLOAT DEFAULT 0,
-        total_hostel_waste FLOAT DEFAULT 0
+        total_hostel_waste FLOAT GENERATED ALWAYS AS (
+            dry_waste + wet_waste + e_waste + biomedical_waste + hazardous_waste
+        ) STORED,
+        UNIQUE (date, hostel)
     );
-    """)
 
-    # Create submission images table
-    cur.execute("""
+    -- Submission images table
     CREATE TABLE submission_images (
         id SERIAL PRIMARY KEY,
         submission_type VARCHAR NOT NULL,
@@ -163,10 +332,8 @@ def create_all_tables():
         file_size INTEGER,
         uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     );
-    """)
 
-    # Create pho edits table
-    cur.execute("""
+    -- PHO edits table
     CREATE TABLE pho_edits (
         edit_id SERIAL PRIMARY KEY,
         submission_type VARCHAR NOT NULL,
@@ -179,16 +346,15 @@ def create_all_tables():
     );
     """)
 
-    conn.commit()
-    cur.close()
-    conn.close()
+    print(f"  Dropped {', '.join(tables_to_drop)}")
     print("✅ All tables created successfully")
 
-def create_default_users():
+def hash_password(password):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
+
+def create_default_users(cur):
     """Create all default users with hashed passwords"""
     print("👥 Creating default users...")
-    conn = psycopg2.connect(**DB_CONFIG)
-    cur = conn.cursor()
 
     users = [
         ("admin", "Admin User", "adminpass", "admin"),
@@ -201,336 +367,106 @@ def create_default_users():
         ("pho_supervisor_18", "PHO Supervisor 18", "phosuppass18", "pho_supervisor"),
     ]
 
-    for username, name, password, role in users:
-        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-        cur.execute(
-            "INSERT INTO users (username, name, password_hash, role) VALUES (%s, %s, %s, %s)",
-            (username, name, hashed.decode('utf-8'), role)
-        )
-        print(f"  Created user: {username} ({role})")
+    # bcrypt releases the GIL while hashing, so threads hash on all cores
+    with ThreadPoolExecutor(max_workers=len(users)) as executor:
+        hashes = list(executor.map(hash_password, [password for _, _, password, _ in users]))
+
+    execute_values(
+        cur,
+        "INSERT INTO users (username, name, password_hash, role) VALUES %s",
+        [(username, name, hashed, role) for (username, name, _, role), hashed in zip(users, hashes)]
+    )
+    print(f"  Created users: {', '.join(f'{username} ({role})' for username, _, _, role in users)}")
 
-    conn.commit()
-    cur.close()
-    conn.close()
     print("✅ Default users created successfully")
 
-def generate_mess_submissions():
+def generate_mess_submissions(cur, series):
     """Generate 2 months of mess waste submissions"""
     print("🍽️ Generating mess waste submissions...")
-    conn = psycopg2.connect(**DB_CONFIG)
-    cur = conn.cursor()
 
-    today = datetime.now().date()
-    start_date = today - timedelta(days=59)  # 2 months
+    now = datetime.now()
+    today = now.date()
+    days = series_days(today)
     mess_rows = []
 
-    hostel_base_values = {
-        "2": {"students": 180},
-        "10": {"students": 200},
-        "11": {"students": 190},
-        "12-13-14": {"students": 450},
-        "18": {"students": 210}
-    }
-
     for supervisor, hostel in PHO_SUPERVISORS:
-        base_vals = hostel_base_values[hostel]
-        print(f"  Generating data for Hostel {hostel}...")
-        
-        for i in range(60):  # 60 days = 2 months
-            day = start_date + timedelta(days=i)
-
-            # Generate consistent student counts with small variation
-            total_students = base_vals["students"] + random.randint(-10, 10)
-            
-            # Distribute students across meals
-            breakfast_students = int(total_students * 0.25 + random.randint(-5, 5))
-            lunch_students = int(total_students * 0.30 + random.randint(-5, 5))
-            snacks_students = int(total_students * 0.20 + random.randint(-3, 3))
-            dinner_students = int(total_students * 0.25 + random.randint(-5, 5))
-
-            # Generate consistent waste per student
-            waste_per_student = random.uniform(0.08, 0.12)
-            
-            # Breakfast waste
-            breakfast_student_waste = round(breakfast_students * waste_per_student * 0.7, 2)
-            breakfast_counter_waste = round(breakfast_students * waste_per_student * 0.2, 2)
-            breakfast_vegetable_peels = round(breakfast_students * waste_per_student * 0.1, 2)
-
-            # Lunch waste (higher)
-            lunch_waste_per_student = waste_per_student * 1.2
-            lunch_student_waste = round(lunch_students * lunch_waste_per_student * 0.6, 2)
-            lunch_counter_waste = round(lunch_students * lunch_waste_per_student * 0.25, 2)
-            lunch_vegetable_peels = round(lunch_students * lunch_waste_per_student * 0.15, 2)
-
-            # Snacks waste (lower)
-            snacks_waste_per_student = waste_per_student * 0.6
-            snacks_student_waste = round(snacks_students * snacks_waste_per_student * 0.8, 2)
-            snacks_counter_waste = round(snacks_students * snacks_waste_per_student * 0.15, 2)
-            snacks_vegetable_peels = round(snacks_students * snacks_waste_per_student * 0.05, 2)
-
-            # Dinner waste
-            dinner_waste_per_student = waste_per_student * 1.1
-            dinner_student_waste = round(dinner_students * dinner_waste_per_student * 0.65, 2)
-            dinner_counter_waste = round(dinner_students * dinner_waste_per_student * 0.25, 2)
-            dinner_vegetable_peels = round(dinner_students * dinner_waste_per_student * 0.1, 2)
-
-            # Dry waste
-            mess_dry_waste = round(random.uniform(2, 8), 2)
-            
-            # Calculate total
-            total_mess_waste = round(
-                breakfast_student_waste + breakfast_counter_waste + breakfast_vegetable_peels +
-                lunch_student_waste + lunch_counter_waste + lunch_vegetable_peels +
-                snacks_student_waste + snacks_counter_waste + snacks_vegetable_peels +
-                dinner_student_waste + dinner_counter_waste + dinner_vegetable_peels +
-                mess_dry_waste, 2
-            )
-
-            # Status: older entries verified, recent ones pending
-            if day < today - timedelta(days=3):
-                status = "verified"
-                verified_by = "pho"
-                verified_at = datetime.now() - timedelta(days=random_int(0, 3))
-            else:
-                status = "pending"
-                verified_by = None
-                verified_at = None
-
-            mess_rows.append((
-                hostel, day, random_time(),
-                breakfast_students, breakfast_student_waste, breakfast_counter_waste, breakfast_vegetable_peels,
-                lunch_students, lunch_student_waste, lunch_counter_waste, lunch_vegetable_peels,
-                snacks_students, snacks_student_waste, snacks_counter_waste, snacks_vegetable_peels,
-                dinner_students, dinner_student_waste, dinner_counter_waste, dinner_vegetable_peels,
-                mess_dry_waste, total_students, total_mess_waste,
-                "Routine collection", status, supervisor, datetime.now(), verified_by, verified_at
-            ))
-
-    # Insert in batches to avoid timeout
-    batch_size = 50
-    for i in range(0, len(mess_rows), batch_size):
-        batch = mess_rows[i:i+batch_size]
-        cur.executemany("""
-        INSERT INTO mess_waste_submissions (
-            hostel, submission_date, collection_time,
-            breakfast_students, breakfast_student_waste, breakfast_counter_waste, breakfast_vegetable_peels,
-            lunch_students, lunch_student_waste, lunch_counter_waste, lunch_vegetable_peels,
-            snacks_students, snacks_student_waste, snacks_counter_waste, snacks_vegetable_peels,
-            dinner_students, dinner_student_waste, dinner_counter_waste, dinner_vegetable_peels,
-            mess_dry_waste, total_students, total_mess_waste,
-            remarks, status, submitted_by, submitted_at, verified_by, verified_at
-        ) VALUES (
-            %s, %s, %s,
-            %s, %s, %s, %s,
-            %s, %s, %s, %s,
-            %s, %s, %s, %s,
-            %s, %s, %s, %s,
-            %s, %s, %s,
-            %s, %s, %s, %s, %s, %s
-        );
-        """, batch)
-        conn.commit()
-        print(f"  Inserted batch {i//batch_size + 1}/{(len(mess_rows)-1)//batch_size + 1}")
-
-    cur.close()
-    conn.close()
+        columns = [series[hostel][name] for name in MESS_VALUE_COLUMNS]
+        # Collection times and review status are drawn for the whole series up front
+        mess_rows += [
+            (hostel, day, collection_time, *values, "Routine collection", status, supervisor, now, verified_by, verified_at)
+            for day, collection_time, (status, verified_by, verified_at), *values
+            in zip(days, random_times(DAYS), review_status(days, today, now), *columns)
+        ]
+
+    # One streamed COPY instead of batched INSERT round-trips
+    copy_rows(cur, "mess_waste_submissions", MESS_SUBMISSION_COLUMNS, mess_rows)
     print(f"✅ Generated {len(mess_rows)} mess waste submissions")
 
-def generate_hostel_submissions():
+def generate_hostel_submissions(cur, series):
     """Generate 2 months of hostel waste submissions"""
     print("🏠 Generating hostel waste submissions...")
-    conn = psycopg2.connect(**DB_CONFIG)
-    cur = conn.cursor()
 
-    today = datetime.now().date()
-    start_date = today - timedelta(days=59)
+    now = datetime.now()
+    today = now.date()
+    days = series_days(today)
     hostel_rows = []
 
-    hostel_base_values = {
-        "2": {"base": 8},
-        "10": {"base": 9},
-        "11": {"base": 8.5},
-        "12-13-14": {"base": 20},
-        "18": {"base": 10}
-    }
-
     for supervisor, hostel in PHO_SUPERVISORS:
-        base_vals = hostel_base_values[hostel]
-        print(f"  Generating data for Hostel {hostel}...")
-        
-        for i in range(60):
-            day = start_date + timedelta(days=i)
-
-            # Generate consistent hostel waste with small variation
-            hostel_base = base_vals["base"]
-            dry_waste = round(hostel_base * 0.5 + random.uniform(-0.3, 0.3), 2)
-            wet_waste = round(hostel_base * 0.3 + random.uniform(-0.2, 0.2), 2)
-            e_waste = round(hostel_base * 0.1 + random.uniform(-0.05, 0.05), 2)
-            biomedical = round(hostel_base * 0.05 + random.uniform(-0.02, 0.02), 2)
-            hazardous = round(hostel_base * 0.05 + random.uniform(-0.02, 0.02), 2)
-            total_waste = round(dry_waste + wet_waste + e_waste + biomedical + hazardous, 2)
-
-            # Status: older entries verified, recent ones pending
-            if day < today - timedelta(days=3):
-                status = "verified"
-                verified_by = "pho"
-                verified_at = datetime.now() - timedelta(days=random_int(0, 3))
-            else:
-                status = "pending"
-                verified_by = None
-                verified_at = None
-
-            hostel_rows.append((
-                hostel, day, random_time(),
-                dry_waste, wet_waste, e_waste, biomedical, hazardous, total_waste,
-                "Routine", status, supervisor, datetime.now(), verified_by, verified_at
-            ))
-
-    # Insert in batches
-    batch_size = 50
-    for i in range(0, len(hostel_rows), batch_size):
-        batch = hostel_rows[i:i+batch_size]
-        cur.executemany("""
-        INSERT INTO hostel_waste_submissions (
-            hostel, submission_date, collection_time,
-            dry_waste, wet_waste, e_waste, biomedical_waste, hazardous_waste, total_waste,
-            remarks, status, submitted_by, submitted_at, verified_by, verified_at
-        ) VALUES (
-            %s, %s, %s,
-            %s, %s, %s, %s, %s, %s,
-            %s, %s, %s, %s, %s, %s
-        );
-        """, batch)
-        conn.commit()
-        print(f"  Inserted batch {i//batch_size + 1}/{(len(hostel_rows)-1)//batch_size + 1}")
-
-    cur.close()
-    conn.close()
+        columns = [series[hostel][name] for name in HOSTEL_VALUE_COLUMNS]
+        # Collection times and review status are drawn for the whole series up front
+        hostel_rows += [
+            (hostel, day, collection_time, *values, "Routine", status, supervisor, now, verified_by, verified_at)
+            for day, collection_time, (status, verified_by, verified_at), *values
+            in zip(days, random_times(DAYS), review_status(days, today, now), *columns)
+        ]
+
+    # One streamed COPY instead of batched INSERT round-trips
+    copy_rows(cur, "hostel_waste_submissions", HOSTEL_SUBMISSION_COLUMNS, hostel_rows)
     print(f"✅ Generated {len(hostel_rows)} hostel waste submissions")
 
-def generate_master_data():
-    """Generate 2 months of master data for dashboard"""
+def generate_master_data(cur):
+    """Derive 2 months of master data for the dashboard from the seeded submissions"""
     print("📊 Generating master waste data...")
-    conn = psycopg2.connect(**DB_CONFIG)
-    cur = conn.cursor()
 
-    today = datetime.now().date()
-    start_date = today - timedelta(days=59)
-    master_rows = []
-
-    hostel_base_values = {
-        "2": {"students": 180, "mess_base": 25, "hostel_base": 8},
-        "10": {"students": 200, "mess_base": 28, "hostel_base": 9},
-        "11": {"students": 190, "mess_base": 26, "hostel_base": 8.5},
-        "12-13-14": {"students": 450, "mess_base": 65, "hostel_base": 20},
-        "18": {"students": 210, "mess_base": 30, "hostel_base": 10}
-    }
+    # Master rows are exactly the mess and hostel figures for each hostel-day, so
+    # Postgres joins them server-side instead of the script computing and sending
+    # a third copy (totals and per-capita figures are generated columns). Like the
+    # app, master holds verified submissions only: approving a pending one adds its
+    # figures onto the master row, so seeding pending days here would count them twice
+    cur.execute(f"""
+        INSERT INTO master_waste_data ({', '.join(MASTER_COLUMNS)})
+        SELECT hostel, submission_date, {', '.join(MASTER_COLUMNS[2:])}
+        FROM mess_waste_submissions
+        JOIN hostel_waste_submissions USING (hostel, submission_date)
+        WHERE mess_waste_submissions.status = 'verified'
+          AND hostel_waste_submissions.status = 'verified'
+    """)
+    print(f"✅ Generated {cur.rowcount} master data entries")
 
-    for supervisor, hostel in PHO_SUPERVISORS:
-        base_vals = hostel_base_values[hostel]
-        print(f"  Generating master data for Hostel {hostel}...")
-        
-        for i in range(60):
-            day = start_date + timedelta(days=i)
-
-            # Generate consistent data
-            total_students = base_vals["students"] + random.randint(-10, 10)
-            waste_per_student = random.uniform(0.08, 0.12)
-            
-            # Breakfast
-            breakfast_students = int(total_students * 0.25)
-            breakfast_student_waste = round(breakfast_students * waste_per_student * 0.7, 2)
-            breakfast_counter_waste = round(breakfast_students * waste_per_student * 0.2, 2)
-            breakfast_vegetable_peels = round(breakfast_students * waste_per_student * 0.1, 2)
-
-            # Lunch
-            lunch_students = int(total_students * 0.30)
-            lunch_waste_per_student = waste_per_student * 1.2
-            lunch_student_waste = round(lunch_students * lunch_waste_per_student * 0.6, 2)
-            lunch_counter_waste = round(lunch_students * lunch_waste_per_student * 0.25, 2)
-            lunch_vegetable_peels = round(lunch_students * lunch_waste_per_student * 0.15, 2)
-
-            # Snacks
-            snacks_students = int(total_students * 0.20)
-            snacks_waste_per_student = waste_per_student * 0.6
-            snacks_student_waste = round(snacks_students * snacks_waste_per_student * 0.8, 2)
-            snacks_counter_waste = round(snacks_students * snacks_waste_per_student * 0.15, 2)
-            snacks_vegetable_peels = round(snacks_students * snacks_waste_per_student * 0.05, 2)
-
-            # Dinner
-            dinner_students = int(total_students * 0.25)
-            dinner_waste_per_student = waste_per_student * 1.1
-            dinner_student_waste = round(dinner_students * dinner_waste_per_student * 0.65, 2)
-            dinner_counter_waste = round(dinner_students * dinner_waste_per_student * 0.25, 2)
-            dinner_vegetable_peels = round(dinner_students * dinner_waste_per_student * 0.1, 2)
-
-            # Mess totals
-            mess_dry_waste = round(base_vals["mess_base"] * 0.15 + random.uniform(-0.5, 0.5), 2)
-            total_mess_waste = round(
-                breakfast_student_waste + breakfast_counter_waste + breakfast_vegetable_peels +
-                lunch_student_waste + lunch_counter_waste + lunch_vegetable_peels +
-                snacks_student_waste + snacks_counter_waste + snacks_vegetable_peels +
-                dinner_student_waste + dinner_counter_waste + dinner_vegetable_peels +
-                mess_dry_waste, 2
-            )
-
-            # Per capita calculations
-            veg_peels_total = breakfast_vegetable_peels + lunch_vegetable_peels + snacks_vegetable_peels + dinner_vegetable_peels
-            total_mess_waste_no_peels = round(total_mess_waste - veg_peels_total, 2)
-            per_capita_mess_waste = round(total_mess_waste / total_students, 3) if total_students > 0 else 0
-            per_capita_mess_waste_no_peels = round(total_mess_waste_no_peels / total_students, 3) if total_students > 0 else 0
-
-            # Hostel waste
-            hostel_base = base_vals["hostel_base"]
-            dry_waste = round(hostel_base * 0.5 + random.uniform(-0.3, 0.3), 2)
-            wet_waste = round(hostel_base * 0.3 + random.uniform(-0.2, 0.2), 2)
-            e_waste = round(hostel_base * 0.1 + random.uniform(-0.05, 0.05), 2)
-            biomedical = round(hostel_base * 0.05 + random.uniform(-0.02, 0.02), 2)
-            hazardous = round(hostel_base * 0.05 + random.uniform(-0.02, 0.02), 2)
-            total_hostel_waste = round(dry_waste + wet_waste + e_waste + biomedical + hazardous, 2)
-
-            master_rows.append((
-                hostel, day,
-                breakfast_student_waste, breakfast_counter_waste, breakfast_vegetable_peels,
-                lunch_student_waste, lunch_counter_waste, lunch_vegetable_peels,
-                snacks_student_waste, snacks_counter_waste, snacks_vegetable_peels,
-                dinner_student_waste, dinner_counter_waste, dinner_vegetable_peels,
-                total_students, mess_dry_waste, total_mess_waste, total_mess_waste_no_peels,
-                per_capita_mess_waste, per_capita_mess_waste_no_peels,
-                dry_waste, wet_waste, e_waste, biomedical, hazardous, total_hostel_waste
-            ))
+def seed_database(cur):
+    """Run every setup phase on one cursor"""
+    # Step 1: Create tables
+    create_all_tables(cur)
+    print()
+    
+    # Step 2: Create users
+    create_default_users(cur)
+    print()
+    
+    # The waste figures are computed once and shared by both submission tables
+    series = generate_hostel_series()
 
-    # Insert in batches
-    batch_size = 50
-    for i in range(0, len(master_rows), batch_size):
-        batch = master_rows[i:i+batch_size]
-        cur.executemany("""
-        INSERT INTO master_waste_data (
-            hostel, date,
-            breakfast_student_waste, breakfast_counter_waste, breakfast_vegetable_peels,
-            lunch_student_waste, lunch_counter_waste, lunch_vegetable_peels,
-            snacks_student_waste, snacks_counter_waste, snacks_vegetable_peels,
-            dinner_student_waste, dinner_counter_waste, dinner_vegetable_peels,
-            total_students, mess_dry_waste, total_mess_waste, total_mess_waste_no_peels,
-            per_capita_mess_waste, per_capita_mess_waste_no_peels,
-            dry_waste, wet_waste, e_waste, biomedical_waste, hazardous_waste, total_hostel_waste
-        ) VALUES (
-            %s, %s,
-            %s, %s, %s,
-            %s, %s, %s,
-            %s, %s, %s,
-            %s, %s, %s,
-            %s, %s, %s, %s,
-            %s, %s,
-            %s, %s, %s, %s, %s, %s
-        );
-        """, batch)
-        conn.commit()
-        print(f"  Inserted batch {i//batch_size + 1}/{(len(master_rows)-1)//batch_size + 1}")
-
-    cur.close()
-    conn.close()
-    print(f"✅ Generated {len(master_rows)} master data entries")
+    # Step 3: Generate mess waste submissions
+    generate_mess_submissions(cur, series)
+    print()
+    
+    # Step 4: Generate hostel waste submissions
+    generate_hostel_submissions(cur, series)
+    print()
+    
+    # Step 5: Generate master data
+    generate_master_data(cur)
+    print()
 
 def main():
     """Run complete data generation"""
@@ -538,25 +474,14 @@ def main():
     print("=" * 60)
     
     try:
-        # Step 1: Create tables
-        create_all_tables()
-        print()
-        
-        # Step 2: Create users
-        create_default_users()
-        print()
-        
-        # Step 3: Generate mess waste submissions
-        generate_mess_submissions()
-        print()
-        
-        # Step 4: Generate hostel waste submissions
-        generate_hostel_submissions()
-        print()
-        
-        # Step 5: Generate master data
-        generate_master_data()
-        print()
+        # One connection for every phase; the whole seed commits as a single
+        # transaction, so a failure part-way leaves the database untouched
+        conn = psycopg2.connect(**DB_CONFIG)
+        try:
+            with conn, conn.cursor() as cur:
+                seed_database(cur)
+        finally:
+            conn.close()
         
         print("=" * 60)
         print("✅ Complete sample data generation finished!")
@@ -564,7 +489,7 @@ def main():
         print("- 8 users created (admin, PHOs, PHO supervisors)")
         print("- 300 mess waste submissions (60 days × 5 hostels)")
         print("- 300 hostel waste submissions (60 days × 5 hostels)")
-        print("- 300 master data entries (60 days × 5 hostels)")
+        print("- 280 master data entries (verified days only: 56 days × 5 hostels)")
         print("- Recent 3 days: pending submissions")
         print("- Older entries: verified submissions")
         print()